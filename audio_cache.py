@@ -0,0 +1,236 @@
+"""
+Cache disque de l'audio des titres les plus joués
+Un titre joué AUDIO_CACHE_MIN_PLAYS fois est transcodé en Opus en arrière-plan ;
+les lectures suivantes partent du fichier local au lieu de l'URL distante signée.
+Fichiers nommés par identifiant de contenu (extracteur + id), budget disque en LRU.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+import ffmpeg_supervisor
+
+# Configuration du logging
+logger = logging.getLogger(__name__)
+
+# Extension des fichiers du cache
+CACHE_EXTENSION = ".opus"
+
+# Débit de l'Opus transcodé (celui d'un salon vocal Discord)
+OPUS_BITRATE = "128k"
+
+# Délai maximal d'un téléchargement (un titre anormalement long est abandonné)
+DOWNLOAD_TIMEOUT = 600.0
+
+# Téléchargements simultanés (le cache ne doit pas concurrencer la lecture)
+MAX_CONCURRENT_DOWNLOADS = 1
+
+# Titres dont les lectures sont comptées (les moins récemment joués sont oubliés)
+MAX_PLAY_COUNTS = 10000
+
+_SAFE_ID_PATTERN = re.compile(r"[^A-Za-z0-9_.-]")
+
+# État du cache (event loop du bot uniquement)
+_DIRECTORY: Optional[str] = None
+_MAX_BYTES = 0
+_MIN_PLAYS = 3
+_VOLUME = 1.0
+_ENTRIES: "OrderedDict[str, int]" = OrderedDict()  # {content_id: taille} du moins au plus récent
+_PLAY_COUNTS: "OrderedDict[str, int]" = OrderedDict()  # {content_id: lectures} du moins au plus récent
+_DOWNLOADS: Dict[str, asyncio.Task] = {}
+_DOWNLOAD_SEMAPHORE: Optional[asyncio.Semaphore] = None
+_STATS = {"hits": 0, "stored": 0, "evicted": 0, "failed": 0}
+
+def configure(directory: Optional[str], max_bytes: int, min_plays: int = 3, volume: float = 1.0) -> bool:
+    """
+    Activer le cache dans directory (désactivé si vide) et indexer les fichiers existants
+    volume est appliqué à l'encodage : les fichiers se relisent sans filtre (copie Opus).
+    """
+    global _DIRECTORY, _MAX_BYTES, _MIN_PLAYS, _VOLUME
+
+    if not directory or max_bytes <= 0:
+        _DIRECTORY = None
+        return False
+
+    os.makedirs(directory, exist_ok=True)
+    _DIRECTORY = directory
+    _MAX_BYTES = max_bytes
+    _MIN_PLAYS = max(1, min_plays)
+    _VOLUME = volume
+
+    # Les fichiers d'une exécution précédente, du moins au plus récemment joué
+    _ENTRIES.clear()
+    files = []
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if name.endswith(".part"):
+            # Téléchargement interrompu
+            _remove(path)
+        elif name.endswith(CACHE_EXTENSION):
+            stat = os.stat(path)
+            files.append((stat.st_mtime, name[:-len(CACHE_EXTENSION)], stat.st_size))
+    for _, content_id, size in sorted(files):
+        _ENTRIES[content_id] = size
+
+    _evict()
+    logger.info(f"💽 Cache audio: {len(_ENTRIES)} titres, {total_bytes() // (1024 * 1024)} Mo / {_MAX_BYTES // (1024 * 1024)} Mo")
+    return True
+
+def is_enabled() -> bool:
+    """Indiquer si le cache audio est actif"""
+    return _DIRECTORY is not None
+
+def content_id(audio_info: Dict[str, Any]) -> Optional[str]:
+    """Identifiant stable du contenu (extracteur + id vidéo), indépendant de la requête tapée"""
+    if audio_info.get("id"):
+        prefix = audio_info.get("extractor_key") or audio_info.get("source") or "media"
+        raw = f"{prefix}-{audio_info['id']}".lower()
+    elif audio_info.get("webpage_url"):
+        raw = "url-" + hashlib.sha1(audio_info["webpage_url"].encode("utf-8")).hexdigest()
+    else:
+        return None
+    return _SAFE_ID_PATTERN.sub("_", raw)
+
+def _path(cid: str) -> str:
+    return os.path.join(_DIRECTORY, cid + CACHE_EXTENSION)
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def total_bytes() -> int:
+    """Place occupée par le cache"""
+    return sum(_ENTRIES.values())
+
+def _evict() -> None:
+    """Supprimer les titres les moins récemment joués jusqu'à repasser sous le budget"""
+    while _ENTRIES and total_bytes() > _MAX_BYTES:
+        cid, _ = _ENTRIES.popitem(last=False)
+        _remove(_path(cid))
+        _STATS["evicted"] += 1
+        logger.debug(f"💽 Cache audio: {cid} évincé")
+
+def lookup(audio_info: Dict[str, Any]) -> Optional[str]:
+    """Chemin du fichier local de ce titre, None s'il n'est pas (encore) en cache"""
+    if not is_enabled():
+        return None
+    cid = content_id(audio_info)
+    if cid is None or cid not in _ENTRIES:
+        return None
+
+    path = _path(cid)
+    if not os.path.exists(path):
+        # Supprimé à la main
+        del _ENTRIES[cid]
+        return None
+
+    _ENTRIES.move_to_end(cid)
+    try:
+        # La date de modification sert d'ordre LRU au redémarrage
+        os.utime(path)
+    except OSError:
+        pass
+    _STATS["hits"] += 1
+    return path
+
+def record_play(audio_info: Dict[str, Any]) -> None:
+    """Compter une lecture distante ; au seuil, télécharger le titre en arrière-plan"""
+    if not is_enabled() or not audio_info.get("url"):
+        return
+    # Direct ou durée inconnue : le téléchargement ne se terminerait pas (ou serait inutilisable)
+    if audio_info.get("is_live") or not audio_info.get("duration"):
+        return
+    cid = content_id(audio_info)
+    if cid is None or cid in _ENTRIES or cid in _DOWNLOADS:
+        return
+
+    _PLAY_COUNTS[cid] = _PLAY_COUNTS.get(cid, 0) + 1
+    _PLAY_COUNTS.move_to_end(cid)
+    while len(_PLAY_COUNTS) > MAX_PLAY_COUNTS:
+        _PLAY_COUNTS.popitem(last=False)
+    if _PLAY_COUNTS[cid] >= _MIN_PLAYS:
+        task = asyncio.create_task(_download(cid, audio_info["url"]))
+        _DOWNLOADS[cid] = task
+        task.add_done_callback(lambda _: _DOWNLOADS.pop(cid, None))
+
+async def _abort(process: asyncio.subprocess.Process, part_path: str) -> None:
+    """Tuer un ffmpeg de téléchargement et supprimer son fichier partiel"""
+    if process.returncode is None:
+        process.kill()
+        await process.wait()
+    _remove(part_path)
+
+async def _download(cid: str, url: str) -> None:
+    """Transcoder le flux distant en Opus dans un fichier temporaire, puis le publier"""
+    global _DOWNLOAD_SEMAPHORE
+
+    if _DOWNLOAD_SEMAPHORE is None:
+        _DOWNLOAD_SEMAPHORE = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+
+    async with _DOWNLOAD_SEMAPHORE:
+        final_path = _path(cid)
+        part_path = final_path + ".part"
+        # 🎛️ Compté par le superviseur FFmpeg comme les sources de lecture (plafond, mesures)
+        process = await ffmpeg_supervisor.open_process("cache", cid, "download", lambda: asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-loglevel", "error", "-y",
+            "-reconnect", "1", "-reconnect_streamed", "1", "-reconnect_delay_max", "30",
+            "-i", url,
+            "-vn", "-filter:a", f"volume={_VOLUME}",
+            "-c:a", "libopus", "-b:a", OPUS_BITRATE, "-ar", "48000", "-ac", "2", "-f", "opus", part_path,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL,
+            start_new_session=True
+        ))
+
+        try:
+            await asyncio.wait_for(process.wait(), DOWNLOAD_TIMEOUT)
+        except asyncio.CancelledError:
+            await _abort(process, part_path)
+            raise
+        except asyncio.TimeoutError:
+            await _abort(process, part_path)
+            _STATS["failed"] += 1
+            logger.warning(f"⚠️ Cache audio: téléchargement trop long pour {cid}")
+            return
+        finally:
+            ffmpeg_supervisor.close_source(process)
+
+        if process.returncode != 0 or not os.path.exists(part_path):
+            _remove(part_path)
+            _STATS["failed"] += 1
+            logger.warning(f"⚠️ Cache audio: téléchargement échoué pour {cid}")
+            return
+
+        os.replace(part_path, final_path)
+        _ENTRIES[cid] = os.path.getsize(final_path)
+        _ENTRIES.move_to_end(cid)
+        _PLAY_COUNTS.pop(cid, None)
+        _STATS["stored"] += 1
+        logger.info(f"💽 Cache audio: {cid} enregistré ({_ENTRIES[cid] // 1024} Ko)")
+        _evict()
+
+def cancel_downloads() -> None:
+    """Annuler les téléchargements en cours (arrêt du bot)"""
+    for task in list(_DOWNLOADS.values()):
+        try:
+            task.cancel()
+        except RuntimeError:
+            # Event loop déjà fermée
+            pass
+
+def cache_status() -> Dict[str, Any]:
+    """État du cache pour /debug"""
+    return {
+        "enabled": is_enabled(),
+        "entries": len(_ENTRIES),
+        "bytes": total_bytes(),
+        "max_bytes": _MAX_BYTES,
+        "downloads": len(_DOWNLOADS),
+        **_STATS
+    }
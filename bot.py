@@ -7,6 +7,8 @@ from collections import deque, defaultdict
 import asyncio
 import logging
 import subprocess
+import signal
+import time
 from datetime import datetime, timedelta
 import aiohttp
 import json
@@ -16,7 +18,18 @@ import spotipy
 from spotipy.oauth2 import SpotifyClientCredentials
 import tempfile
 import urllib.parse
-from config_manager import get_guild_config, update_guild_config, get_voice_temp_settings, load_all_data, save_all_data, auto_save_data
+from config_manager import aget_guild_config, aupdate_guild_config, aload_all_data, aauto_save_data, arecord_journal
+from config_manager import arecord_journal_deletes, auto_save_data
+from config_manager import start_background_writer, stop_background_writer, aflush_pending_saves, set_storage_backend, set_snapshot_format
+from config_manager import set_tracker_persistence, aget_security_settings, SecuritySettings
+import ytdlp_pool
+import extraction_cache
+import extraction_scheduler
+import playlist_import
+import audio_cache
+import ffmpeg_supervisor
+import radio_hub
+import radio_health
 
 # Configuration du logging
 logging.basicConfig(
@@ -35,6 +48,14 @@ BOT_TOKEN = os.getenv('DISCORD_TOKEN')
 OWNER_ID = int(os.getenv('OWNER_ID', 0))
 SPOTIFY_CLIENT_ID = os.getenv('SPOTIFY_CLIENT_ID', '')
 SPOTIFY_CLIENT_SECRET = os.getenv('SPOTIFY_CLIENT_SECRET', '')
+SAVE_INTERVAL = float(os.getenv('SAVE_INTERVAL', 5))  # secondes entre deux écritures groupées
+STORAGE_BACKEND = os.getenv('STORAGE_BACKEND', 'json')  # json ou sqlite
+SNAPSHOT_FORMAT = os.getenv('SNAPSHOT_FORMAT', 'json')  # json (lisible) ou binary (compact)
+PERSIST_TRACKERS = os.getenv('PERSIST_TRACKERS', 'true').lower() in ('1', 'true', 'yes', 'on')
+TRACKER_IDLE_TTL = float(os.getenv('TRACKER_IDLE_TTL', 600))  # secondes d'inactivité avant éviction
+TRACKER_MAX_KEYS = int(os.getenv('TRACKER_MAX_KEYS', 10000))  # clés max par tracker
+TRACKER_SWEEP_INTERVAL = float(os.getenv('TRACKER_SWEEP_INTERVAL', 60))  # secondes entre deux balayages
+RAID_MODE_DURATION = float(os.getenv('RAID_MODE_DURATION', 600))  # secondes de mode raid après la dernière vague
 
 if not BOT_TOKEN:
     logger.error("❌ DISCORD_TOKEN manquant")
@@ -44,6 +65,16 @@ if not OWNER_ID:
     logger.error("❌ OWNER_ID manquant")
     exit(1)
 
+# Backend de stockage des configurations (migration JSON → SQLite automatique)
+if not set_storage_backend(STORAGE_BACKEND):
+    logger.warning("⚠️ Backend de stockage invalide, utilisation du JSON")
+    set_storage_backend("json")
+
+if not set_snapshot_format(SNAPSHOT_FORMAT):
+    set_snapshot_format("json")
+
+set_tracker_persistence(PERSIST_TRACKERS)
+
 # Configuration du bot
 SONG_QUEUES = {}
 LOOP_MODES = {}
@@ -73,24 +104,15 @@ RAID_PROTECTION = {}
 JOIN_TRACKER = defaultdict(list)
 MESSAGE_TRACKER = defaultdict(list)
 
-# Configuration par défaut pour la sécurité - DÉSACTIVÉE par défaut
-DEFAULT_SECURITY_CONFIG = {
-    "enabled": False,
-    "max_joins_per_minute": 5,
-    "max_messages_per_minute": 35,
-    "auto_ban_suspicious": False,
-    "log_channel_id": None,
-    "whitelist": [],
-    "blacklist": [],
-    "raid_mode": False,
-    "max_warns": 3,
-    "timeout_duration": 300,  # 5 minutes
-    "delete_spam_messages": False,
-    "anti_spam_enabled": False,
-    "anti_raid_enabled": False,
-    "new_account_threshold": 7,  # jours
-    "punishment_type": "timeout"  # timeout, kick, ban
-}
+# Mode raid déclenché automatiquement : {guild_id: fin (time.monotonic())}, jamais écrit dans la config
+RAID_MODE_UNTIL = {}
+
+# Seule la dernière minute compte pour l'anti-raid / anti-spam
+TRACKER_WINDOW = 60
+TRACKER_SWEEPER_TASK = None
+
+# Configuration par défaut pour la sécurité - DÉSACTIVÉE par défaut (schéma dans config_manager)
+DEFAULT_SECURITY_CONFIG = SecuritySettings.default_dict()
 
 intents = discord.Intents.default()
 intents.message_content = True
@@ -105,31 +127,17 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 # FONCTIONS UTILITAIRES DE SÉCURITÉ
 # ============================
 
-def get_security_config(guild_id):
-    """Récupère la configuration de sécurité d'un serveur avec sauvegarde persistante"""
-    from config_manager import get_guild_config
-    
-    config = get_guild_config(guild_id)
-    security_config = config.get("security_settings", {})
-    
-    # Si pas de config existante, utiliser les valeurs par défaut et sauvegarder
-    if not security_config:
-        security_config = DEFAULT_SECURITY_CONFIG.copy()
-        update_guild_config(guild_id, "security_settings", security_config)
-    
-    return security_config
+async def get_security_config(guild_id):
+    """Récupère la configuration de sécurité d'un serveur (champs complétés au chargement, lecture par attribut)"""
+    return await aget_security_settings(guild_id)
 
-def update_security_config(guild_id, key, value):
+async def update_security_config(guild_id, key, value):
     """Mettre à jour la configuration de sécurité avec sauvegarde"""
-    from config_manager import update_guild_config
-    
-    # Mettre à jour dans la mémoire
-    if guild_id not in SECURITY_CONFIG:
-        SECURITY_CONFIG[guild_id] = DEFAULT_SECURITY_CONFIG.copy()
-    SECURITY_CONFIG[guild_id][key] = value
+    # Sauvegarder de façon persistante (la section typée en cache est mise à jour)
+    await aupdate_guild_config(guild_id, "security_settings", key, value)
     
-    # Sauvegarder de façon persistante
-    update_guild_config(guild_id, "security_settings", key, value)
+    # Garder une référence pour les statistiques
+    SECURITY_CONFIG[guild_id] = await get_security_config(guild_id)
     
     logger.info(f"🔒 Config sécurité sauvegardée - Guild: {guild_id}, {key}: {value}")
     return True
@@ -156,13 +164,12 @@ def is_admin(user):
     
     return False
 
-def is_suspicious_account(member):
+def is_suspicious_account(member, config):
     """Détecte si un compte est suspect"""
-    config = get_security_config(member.guild.id)
     
     # Compte trop récent
     account_age = (datetime.now() - member.created_at).days
-    if account_age < config["new_account_threshold"]:
+    if account_age < config.new_account_threshold:
         return True, f"Compte créé il y a {account_age} jour(s)"
     
     # Pas d'avatar
@@ -226,12 +233,12 @@ def split_long_message(message, max_length=4000):
 
 async def log_action(guild, action_type, moderator, target, reason, duration=None):
     """Log une action de modération"""
-    config = get_security_config(guild.id)
+    config = await get_security_config(guild.id)
     
-    if not config["log_channel_id"]:
+    if not config.log_channel_id:
         return
     
-    log_channel = guild.get_channel(config["log_channel_id"])
+    log_channel = guild.get_channel(config.log_channel_id)
     if not log_channel:
         return
     
@@ -255,35 +262,112 @@ async def log_action(guild, action_type, moderator, target, reason, duration=Non
     except Exception as e:
         logger.error(f"❌ Erreur log modération: {e}")
 
+# ============================
+# RÉTENTION DES TRACKERS
+# ============================
+
+def prune_tracker_window(timestamps, now):
+    """Garder uniquement les horodatages de la fenêtre courante"""
+    return [t for t in timestamps if (now - t).total_seconds() < TRACKER_WINDOW]
+
+def evict_tracker_keys(tracker, now=None):
+    """Retirer les clés inactives depuis TRACKER_IDLE_TTL puis appliquer TRACKER_MAX_KEYS"""
+    now = now or datetime.now()
+    
+    evicted = [
+        key for key, timestamps in tracker.items()
+        if not timestamps or (now - timestamps[-1]).total_seconds() >= TRACKER_IDLE_TTL
+    ]
+    for key in evicted:
+        del tracker[key]
+    
+    overflow = len(tracker) - TRACKER_MAX_KEYS
+    if overflow > 0:
+        # Descendre 10% sous la limite pour ne pas trier à chaque nouvelle clé
+        overflow += TRACKER_MAX_KEYS // 10
+        oldest = sorted(tracker.items(), key=lambda item: item[1][-1])[:overflow]
+        for key, _ in oldest:
+            del tracker[key]
+            evicted.append(key)
+    
+    return evicted
+
+async def sweep_trackers():
+    """Évincer les clés inactives de JOIN_TRACKER et MESSAGE_TRACKER"""
+    for section, tracker in (("join_tracker", JOIN_TRACKER), ("message_tracker", MESSAGE_TRACKER)):
+        evicted = evict_tracker_keys(tracker)
+        if evicted:
+            # Des entrées "delete" écrites d'un bloc : la section n'est jamais réécrite en entier,
+            # la compaction du journal intègre ces suppressions au snapshot
+            await arecord_journal_deletes(section, evicted)
+            logger.debug(f"🧹 {len(evicted)} clé(s) retirée(s) de {section}")
+
+async def tracker_sweeper_loop():
+    """Tâche de fond : balayage périodique des trackers et sauvegarde du classement des méthodes"""
+    while not bot.is_closed():
+        await asyncio.sleep(TRACKER_SWEEP_INTERVAL)
+        try:
+            await sweep_trackers()
+            # 💾 Classement appris conservé entre les redémarrages (une écriture par intervalle au plus)
+            await persist_method_stats()
+        except Exception as e:
+            logger.error(f"❌ Erreur balayage des trackers: {e}")
+
 # ============================
 # SYSTÈME ANTI-RAID
 # ============================
 
+def activate_raid_mode(guild_id):
+    """Activer (ou prolonger) le mode raid d'un serveur ; True s'il n'était pas déjà actif"""
+    was_active = is_raid_mode_active(guild_id)
+    RAID_MODE_UNTIL[guild_id] = time.monotonic() + RAID_MODE_DURATION
+    return not was_active
+
+def is_raid_mode_active(guild_id, config=None):
+    """Mode raid en cours : forcé dans la configuration ou déclenché il y a moins de RAID_MODE_DURATION"""
+    if config is not None and config.raid_mode:
+        return True
+    until = RAID_MODE_UNTIL.get(guild_id)
+    if until is None:
+        return False
+    if time.monotonic() >= until:
+        del RAID_MODE_UNTIL[guild_id]
+        logger.info(f"🟢 Mode raid terminé (serveur {guild_id})")
+        return False
+    return True
+
+def active_raid_modes():
+    """Serveurs actuellement en mode raid déclenché"""
+    return [guild_id for guild_id in list(RAID_MODE_UNTIL) if is_raid_mode_active(guild_id)]
+
 async def check_raid_protection(member):
     """Vérifie et applique la protection anti-raid"""
     guild = member.guild
-    config = get_security_config(guild.id)
+    config = await get_security_config(guild.id)
     
-    if not config["anti_raid_enabled"]:
+    if not config.anti_raid_enabled:
         return
     
     now = datetime.now()
     guild_id = guild.id
     
+    # Limite de taille atteinte : évincer avant d'ajouter une nouvelle clé
+    if guild_id not in JOIN_TRACKER and len(JOIN_TRACKER) >= TRACKER_MAX_KEYS:
+        await sweep_trackers()
+    
     # Ajouter à la liste des joins récents
     JOIN_TRACKER[guild_id].append(now)
     
     # Nettoyer les anciens joins (plus de 1 minute)
-    JOIN_TRACKER[guild_id] = [
-        join_time for join_time in JOIN_TRACKER[guild_id]
-        if (now - join_time).seconds < 60
-    ]
+    JOIN_TRACKER[guild_id] = prune_tracker_window(JOIN_TRACKER[guild_id], now)
+    
+    # 📜 Journaliser la fenêtre courante (coût constant, pas de réécriture complète)
+    await arecord_journal("join_tracker", guild_id, "set", JOIN_TRACKER[guild_id])
     
     recent_joins = len(JOIN_TRACKER[guild_id])
     
-    # Si trop de joins récents, activer le mode raid
-    if recent_joins > config["max_joins_per_minute"]:
-        config["raid_mode"] = True
+    # Si trop de joins récents, activer le mode raid (prolongé tant que la vague continue)
+    if recent_joins > config.max_joins_per_minute and activate_raid_mode(guild_id):
         logger.warning(f"🚨 Mode raid activé sur {guild.name} - {recent_joins} joins en 1 minute")
         
         # Notifier les modérateurs
@@ -299,8 +383,8 @@ async def check_raid_protection(member):
                 break
     
     # Si en mode raid, vérifier si le compte est suspect
-    if config["raid_mode"] and config["auto_ban_suspicious"]:
-        is_suspect, reason = is_suspicious_account(member)
+    if is_raid_mode_active(guild_id, config) and config.auto_ban_suspicious:
+        is_suspect, reason = is_suspicious_account(member, config)
         
         if is_suspect:
             try:
@@ -322,41 +406,45 @@ async def check_message_spam(message):
     if not guild:
         return
     
-    config = get_security_config(guild.id)
+    config = await get_security_config(guild.id)
     
-    if not config["anti_spam_enabled"]:
+    if not config.anti_spam_enabled:
         return
     
     user_id = message.author.id
     now = datetime.now()
     
+    # Limite de taille atteinte : évincer avant d'ajouter une nouvelle clé
+    if user_id not in MESSAGE_TRACKER and len(MESSAGE_TRACKER) >= TRACKER_MAX_KEYS:
+        await sweep_trackers()
+    
     # Ajouter le message à la liste
     MESSAGE_TRACKER[user_id].append(now)
     
     # Nettoyer les anciens messages (plus de 1 minute)
-    MESSAGE_TRACKER[user_id] = [
-        msg_time for msg_time in MESSAGE_TRACKER[user_id]
-        if (now - msg_time).seconds < 60
-    ]
+    MESSAGE_TRACKER[user_id] = prune_tracker_window(MESSAGE_TRACKER[user_id], now)
+    
+    # Pas de journal par message : la fenêtre d'une minute ne survit pas utilement à un
+    # redémarrage (seules les évictions du balayage sont journalisées)
     
     recent_messages = len(MESSAGE_TRACKER[user_id])
     
     # Si trop de messages récents
-    if recent_messages > config["max_messages_per_minute"]:
+    if recent_messages > config.max_messages_per_minute:
         # Supprimer les messages spam si activé
-        if config["delete_spam_messages"]:
+        if config.delete_spam_messages:
             try:
                 await message.delete()
             except:
                 pass
         
         # Punir l'utilisateur selon la configuration
-        punishment = config["punishment_type"]
+        punishment = config.punishment_type
         reason = f"Spam détecté - {recent_messages} messages en 1 minute"
         
         try:
             if punishment == "timeout":
-                timeout_until = datetime.now() + timedelta(seconds=config["timeout_duration"])
+                timeout_until = datetime.now() + timedelta(seconds=config.timeout_duration)
                 await message.author.timeout(timeout_until, reason=reason)
                 
             elif punishment == "kick":
@@ -454,15 +542,367 @@ async def search_spotify_metadata(query):
     
     return None
 
+# ============================
+# CACHE D'EXTRACTION ET COUPE-CIRCUIT
+# ============================
+
+# Cache des résultats (LRU), cache des échecs et coupe-circuits par extracteur : module extraction_cache
+extraction_cache.configure(
+    cache_max=int(os.getenv('EXTRACTION_CACHE_MAX', 1000)),  # entrées (LRU)
+    cache_ttl=float(os.getenv('EXTRACTION_CACHE_TTL', 7 * 24 * 3600)),  # secondes (métadonnées)
+    negative_ttl=float(os.getenv('NEGATIVE_CACHE_TTL', 300)),  # secondes avant de réessayer une requête
+    failure_threshold=int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', 5)),  # pannes d'extracteur consécutives avant coupure
+    cooldown=float(os.getenv('CIRCUIT_COOLDOWN', 120))  # secondes sans essayer l'extracteur
+)
+CIRCUIT_RESUME_POLL = 5.0  # secondes entre deux vérifications pendant l'essai de remise en service
+
+# Reprises de file prévues après une coupure : {guild_id: Task}
+CIRCUIT_RESUMES = {}
+
+def format_circuit_status():
+    """État des coupe-circuits pour /debug"""
+    lines = []
+    for breaker in extraction_cache.circuit_status():
+        if breaker["state"] == "open":
+            state = f"🔴 coupé ({breaker['retry_in']:.0f}s)"
+        elif breaker["state"] == "half_open":
+            state = "🟠 essai en cours" if breaker["probing"] else "🟠 à l'essai"
+        else:
+            state = f"🟢 {breaker['failures']} échec(s)"
+        lines.append(f"{breaker['source']}: {state} • {breaker['trips']} coupure(s)")
+    lines.append(f"Échecs en cache: {extraction_cache.failure_count()}")
+    return "\n".join(lines)
+
 # ============================
 # YT-DLP DIRECT - MÉTHODES ROBUSTES (identique)
 # ============================
 
-async def extract_with_ytdlp(query, source_type="youtube"):
-    """Extraction directe avec yt-dlp - MULTIPLE MÉTHODES"""
+# ============================
+# CLASSEMENT ADAPTATIF DES MÉTHODES
+# ============================
+
+# {source_type: {méthode: {"success", "latency", "attempts", "updated"}}} - persisté dans global_data
+METHOD_STATS = {}
+METHOD_STATS_DIRTY = False  # modifié depuis la dernière sauvegarde (écrite par le balayage périodique)
+METHOD_STATS_ALPHA = float(os.getenv('METHOD_STATS_ALPHA', 0.2))  # poids de la dernière tentative
+METHOD_STATS_HALF_LIFE = float(os.getenv('METHOD_STATS_HALF_LIFE', 6 * 3600))  # secondes avant d'oublier la moitié
+METHOD_PRIOR_SUCCESS = 0.5  # score d'une méthode jamais essayée (ou oubliée)
+
+def decayed_method_success(stats, now=None):
+    """Taux de réussite lissé, ramené vers le score neutre avec l'âge (une méthode cassée finit par être réessayée)"""
+    now = now or time.time()
+    if METHOD_STATS_HALF_LIFE <= 0:
+        return stats["success"]
+    age = max(0.0, now - stats.get("updated", now))
+    weight = 0.5 ** (age / METHOD_STATS_HALF_LIFE)
+    return METHOD_PRIOR_SUCCESS + (stats["success"] - METHOD_PRIOR_SUCCESS) * weight
+
+def record_method_result(source_type, method, success, latency):
+    """Mettre à jour la moyenne glissante (réussite, latence) d'une méthode pour une source"""
+    global METHOD_STATS_DIRTY
+    now = time.time()
+    methods = METHOD_STATS.setdefault(source_type, {})
+    stats = methods.get(method) or {"success": METHOD_PRIOR_SUCCESS, "latency": None, "attempts": 0, "updated": now}
+    
+    current = decayed_method_success(stats, now)
+    stats["success"] = current + METHOD_STATS_ALPHA * ((1.0 if success else 0.0) - current)
+    if success:
+        previous = stats["latency"]
+        stats["latency"] = latency if previous is None else previous + METHOD_STATS_ALPHA * (latency - previous)
+    stats["attempts"] += 1
+    stats["updated"] = now
+    methods[method] = stats
+    METHOD_STATS_DIRTY = True
+
+def rank_extraction_methods(extraction_methods, source_type):
+    """Trier les méthodes : meilleur taux de réussite d'abord, puis la plus rapide (ordre d'origine sinon)"""
+    stats = METHOD_STATS.get(source_type, {})
+    now = time.time()
+    
+    def sort_key(method):
+        method_stats = stats.get(method[0])
+        if not method_stats:
+            return (-METHOD_PRIOR_SUCCESS, YTDLP_TIMEOUT)
+        latency = method_stats["latency"] if method_stats["latency"] is not None else YTDLP_TIMEOUT
+        return (-round(decayed_method_success(method_stats, now), 2), latency)
+    
+    return sorted(extraction_methods, key=sort_key)
+
+def snapshot_method_stats(method_stats=None):
+    """Copie de METHOD_STATS pour la sauvegarde (le thread d'écriture ne voit pas les mutations suivantes)"""
+    method_stats = METHOD_STATS if method_stats is None else method_stats
+    return {source: {name: dict(stats) for name, stats in methods.items()} for source, methods in method_stats.items()}
+
+async def persist_method_stats():
+    """Sauvegarder le classement appris s'il a changé (appelé par le balayage périodique)"""
+    global METHOD_STATS_DIRTY
+    if METHOD_STATS_DIRTY:
+        METHOD_STATS_DIRTY = False
+        await aauto_save_data(method_stats=snapshot_method_stats())
+
+def format_method_ranking(source_type, limit=None):
+    """Classement lisible des méthodes pour /stats et /debug"""
+    stats = METHOD_STATS.get(source_type, {})
+    if not stats:
+        return "Aucune donnée"
+    now = time.time()
+    ranked = sorted(stats.items(), key=lambda item: -decayed_method_success(item[1], now))
+    lines = []
+    for position, (name, method_stats) in enumerate(ranked[:limit], 1):
+        latency = f"{method_stats['latency']:.1f}s" if method_stats["latency"] is not None else "—"
+        lines.append(f"{position}. `{name}` {decayed_method_success(method_stats, now) * 100:.0f}% • {latency}")
+    return "\n".join(lines)
+
+# Course entre méthodes d'extraction
+YTDLP_RACE_WIDTH = int(os.getenv('YTDLP_RACE_WIDTH', 3))  # méthodes lancées en parallèle (K)
+YTDLP_HEDGE_DELAY = float(os.getenv('YTDLP_HEDGE_DELAY', 2.0))  # secondes avant de lancer la suivante (0 = toutes d'un coup)
+YTDLP_TIMEOUT = float(os.getenv('YTDLP_TIMEOUT', 30))  # délai maximal pour l'ensemble de l'extraction
+EXTRACTION_BACKEND = os.getenv('EXTRACTION_BACKEND', 'pool')  # pool (workers yt-dlp chauds) ou subprocess
+# Extractions simultanées maximum (chacune lance jusqu'à YTDLP_RACE_WIDTH tentatives)
+EXTRACTION_MAX_CONCURRENT = int(os.getenv('EXTRACTION_MAX_CONCURRENT', 4))
+extraction_scheduler.configure(max_concurrent=EXTRACTION_MAX_CONCURRENT)
+# Workers du pool : de quoi mener toutes les courses autorisées en pleine largeur
+YTDLP_POOL_SIZE = int(os.getenv('YTDLP_POOL_SIZE', EXTRACTION_MAX_CONCURRENT * YTDLP_RACE_WIDTH))
+YTDLP_OUTPUT_LIMIT = 64 * 1024  # octets de sortie acceptés d'un processus yt-dlp
+YTDLP_STDERR_LIMIT = 4096  # octets de fin de stderr gardés (message d'erreur)
+
+# Cache disque des titres souvent joués (désactivé si AUDIO_CACHE_DIR est vide)
+AUDIO_CACHE_DIR = os.getenv('AUDIO_CACHE_DIR', '')
+AUDIO_CACHE_MAX_MB = int(os.getenv('AUDIO_CACHE_MAX_MB', 2048))  # budget disque (LRU)
+AUDIO_CACHE_MIN_PLAYS = int(os.getenv('AUDIO_CACHE_MIN_PLAYS', 3))  # lectures avant mise en cache
+
+# Seuls les champs utiles sont imprimés (--dump-json sort tout le tableau formats, des centaines de Ko)
+YTDLP_PRINT_TEMPLATE = "%(.{" + ",".join(ytdlp_pool.WORKER_FIELDS) + "})j"
+
+def build_ytdlp_command(options, search_query, source_type):
+    """Construire la ligne de commande yt-dlp d'une méthode d'extraction"""
+    cmd = ['yt-dlp', '--print', YTDLP_PRINT_TEMPLATE]
+    for key, value in options.items():
+        if key == 'format':
+            cmd.extend(['-f', str(value)])
+        elif key == 'http_headers':
+            for header_key, header_value in value.items():
+                cmd.extend(['--add-header', f'{header_key}:{header_value}'])
+        elif key == 'extractor_args':
+            for extractor, args in value.items():
+                # Les clients YouTube ne changent rien pour SoundCloud
+                if extractor == 'youtube' and source_type == 'soundcloud':
+                    continue
+                if isinstance(args, dict):
+                    # Syntaxe yt-dlp : "youtube:player_client=android,web"
+                    arg_string = ";".join(
+                        f"{name}={','.join(value) if isinstance(value, list) else value}"
+                        for name, value in args.items()
+                    )
+                    cmd.extend(['--extractor-args', f'{extractor}:{arg_string}'])
+                elif isinstance(args, list):
+                    for arg in args:
+                        cmd.extend(['--extractor-args', f'{extractor}:player_client={arg}'])
+                else:
+                    cmd.extend(['--extractor-args', f'{extractor}:{args}'])
+        elif isinstance(value, bool) and value:
+            cmd.append(f'--{key.replace("_", "-")}')
+        elif not isinstance(value, (bool, dict)):
+            cmd.extend([f'--{key.replace("_", "-")}', str(value)])
+    
+    cmd.append(search_query)
+    return cmd
+
+def kill_process_group(process):
+    """Tuer un processus lancé dans sa propre session, avec ses éventuels enfants"""
+    if process.returncode is not None:
+        return
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+async def read_stderr_tail(stream):
+    """Lire le stderr d'un processus jusqu'au bout en n'en gardant que la fin"""
+    tail = bytearray()
+    while chunk := await stream.read(4096):
+        tail += chunk
+        del tail[:-YTDLP_STDERR_LIMIT]
+    return tail.decode("utf-8", errors="replace")
+
+def ytdlp_error_message(stderr):
+    """Dernière erreur signalée par yt-dlp (ligne ERROR:), sinon dernière ligne de stderr"""
+    lines = [line.strip() for line in stderr.splitlines() if line.strip()]
+    errors = [line for line in lines if line.startswith("ERROR:")]
+    return (errors or lines or ["code de sortie non nul"])[-1]
+
+async def run_ytdlp_attempt(cmd):
+    """
+    Lancer un processus yt-dlp et renvoyer son JSON (None si rien trouvé) ; tué s'il est annulé
+    Lève ytdlp_pool.ExtractionFailed avec l'erreur de yt-dlp si le processus échoue.
+    """
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        # Fin de stderr gardée : le message d'erreur distingue vidéo indisponible et extracteur en panne
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True
+    )
+    stderr_task = asyncio.create_task(read_stderr_tail(process.stderr))
+    
+    try:
+        # Lecture bornée : une sortie anormalement longue coupe la tentative
+        chunks = []
+        size = 0
+        while chunk := await process.stdout.read(16384):
+            size += len(chunk)
+            if size > YTDLP_OUTPUT_LIMIT:
+                logger.warning(f"⚠️ Sortie yt-dlp trop volumineuse (> {YTDLP_OUTPUT_LIMIT} octets), tentative abandonnée")
+                kill_process_group(process)
+                await process.wait()
+                await stderr_task
+                return None
+            chunks.append(chunk)
+        await process.wait()
+        stderr = await stderr_task
+    except asyncio.CancelledError:
+        kill_process_group(process)
+        await process.wait()
+        stderr_task.cancel()
+        raise
+    
+    if stderr:
+        # Avertissements de yt-dlp visibles seulement en debug
+        logger.debug(f"yt-dlp stderr: {stderr}")
+    if process.returncode != 0:
+        raise ytdlp_pool.ExtractionFailed(ytdlp_error_message(stderr))
+    if chunks:
+        try:
+            return json.loads(b"".join(chunks))
+        except json.JSONDecodeError:
+            return None
+    return None
+
+def uses_ytdlp_pool():
+    """Indiquer si les tentatives passent par le pool de workers"""
+    return EXTRACTION_BACKEND == "pool" and ytdlp_pool.is_available()
+
+async def run_extraction_attempt(cmd, options, search_query, priority=None, on_start=None):
+    """
+    Une tentative : dans un worker chaud du pool si possible, sinon via le CLI yt-dlp
+    on_start est appelé quand la tentative démarre vraiment (prise par un worker du pool).
+    """
+    if uses_ytdlp_pool():
+        try:
+            return await ytdlp_pool.extract(
+                search_query, options, YTDLP_TIMEOUT,
+                priority=extraction_scheduler.PRIORITY_PLAY if priority is None else priority, on_start=on_start
+            )
+        except ytdlp_pool.PoolUnavailable:
+            pass
+    if on_start is not None:
+        on_start()
+    return await run_ytdlp_attempt(cmd)
+
+async def race_extraction_methods(extraction_methods, search_query, source_type, request=None):
+    """
+    Lancer les méthodes en course : jusqu'à YTDLP_RACE_WIDTH en même temps, une nouvelle
+    toutes les YTDLP_HEDGE_DELAY secondes (ou dès qu'une échoue). Le premier JSON valide
+    gagne et les processus restants sont tués. L'ensemble est borné par YTDLP_TIMEOUT.
+    Avec le pool, les tentatives gardent la priorité de la demande (request) et une
+    tentative de plus n'est lancée que si un worker est libre.
+    Chaque tentative démarrée (terminée ou coupée par le délai) alimente METHOD_STATS ;
+    sa durée court depuis sa prise en charge par un worker.
+    Retourne (nom de la méthode, info, types d'échec des tentatives) ; info vaut None si
+    aucune n'a réussi (types : voir extraction_cache.FAILURE_*).
+    """
+    # Méthodes identiques pour cette source (ex. clients YouTube sur SoundCloud) : une seule fois
+    commands = []
+    for name, options in extraction_methods:
+        cmd = build_ytdlp_command(options, search_query, source_type)
+        if all(cmd != existing for _, existing, _ in commands):
+            commands.append((name, cmd, options))
+    
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + YTDLP_TIMEOUT
+    width = max(1, YTDLP_RACE_WIDTH)
+    pending = {}
+    started = {}
+    failures = []
+    next_index = 0
+    
+    try:
+        while next_index < len(commands) or pending:
+            # Relance seulement sur un worker libre : pas de tentative en file derrière les autres courses
+            can_launch = next_index < len(commands) and len(pending) < width
+            if can_launch and (not pending or not uses_ytdlp_pool() or ytdlp_pool.idle_workers() > 0):
+                name, cmd, options = commands[next_index]
+                next_index += 1
+                logger.info(f"🔄 Tentative yt-dlp {next_index}/{len(commands)} ({name}): {source_type}")
+                priority = request["priority"] if request else None
+                mark_started = lambda name=name: started.__setitem__(name, loop.time())
+                pending[asyncio.create_task(
+                    run_extraction_attempt(cmd, options, search_query, priority, mark_started)
+                )] = name
+            
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                logger.warning(f"⚠️ Timeout extraction ({YTDLP_TIMEOUT:.0f}s) - méthodes en cours: {sorted(pending.values())}")
+                for name in pending.values():
+                    # Une tentative restée en file n'a rien prouvé sur sa méthode
+                    if name in started:
+                        record_method_result(source_type, name, False, loop.time() - started[name])
+                        failures.append(extraction_cache.FAILURE_TIMEOUT)
+                break
+            
+            # Attendre un résultat, ou le délai de relance si une autre méthode peut démarrer
+            can_hedge = next_index < len(commands) and len(pending) < width
+            timeout = min(YTDLP_HEDGE_DELAY, remaining) if can_hedge else remaining
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            
+            for task in done:
+                name = pending.pop(task)
+                elapsed = loop.time() - started.get(name, loop.time())
+                try:
+                    info = task.result()
+                except ytdlp_pool.ExtractionFailed as e:
+                    logger.warning(f"⚠️ Méthode {name} échouée: {e}")
+                    record_method_result(source_type, name, False, elapsed)
+                    failures.append(extraction_cache.classify_error(str(e)))
+                    continue
+                except asyncio.TimeoutError:
+                    logger.warning(f"⚠️ Méthode {name} trop longue")
+                    record_method_result(source_type, name, False, elapsed)
+                    failures.append(extraction_cache.FAILURE_TIMEOUT)
+                    continue
+                except Exception as e:
+                    logger.warning(f"⚠️ Méthode {name} échouée: {e}")
+                    record_method_result(source_type, name, False, elapsed)
+                    failures.append(extraction_cache.FAILURE_INTERNAL)
+                    continue
+                record_method_result(source_type, name, bool(info), elapsed)
+                if info:
+                    return name, info, failures
+                logger.warning(f"⚠️ Méthode {name} sans résultat")
+                failures.append(extraction_cache.FAILURE_CONTENT)
+    finally:
+        # Tuer les perdants
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    
+    return None, None, failures
+
+async def perform_extraction(query, source_type="youtube", request=None):
+    """Extraction directe avec yt-dlp - MULTIPLE MÉTHODES (passer par extract_with_ytdlp)"""
+    
+    # Métadonnées éventuellement encore en cache (URL de flux expirée)
+    cached = extraction_cache.get_cached(query, source_type)
     
     # Préparer la requête selon la source
-    if source_type == "youtube":
+    if cached and cached.get('webpage_url'):
+        # Métadonnées connues mais URL expirée : aller directement à la page, sans recherche
+        search_query = cached['webpage_url']
+    elif source_type == "youtube":
         if query.startswith("http"):
             search_query = query
         else:
@@ -501,152 +941,501 @@ async def extract_with_ytdlp(query, source_type="youtube"):
         'geo_bypass_country': 'US'
     }
     
-    # Méthodes d'extraction (8 différentes pour plus de robustesse)
+    # Méthodes d'extraction (8 différentes pour plus de robustesse), nommées pour les statistiques
     extraction_methods = [
         # Méthode 1: Standard
-        {**ytdl_options},
+        ("standard", {**ytdl_options}),
         
         # Méthode 2: Android client
-        {**ytdl_options, 'extractor_args': {'youtube': {'player_client': ['android']}}},
+        ("android", {**ytdl_options, 'extractor_args': {'youtube': {'player_client': ['android']}}}),
         
         # Méthode 3: Web + Android
-        {**ytdl_options, 'extractor_args': {'youtube': {'player_client': ['android', 'web']}}},
+        ("android_web", {**ytdl_options, 'extractor_args': {'youtube': {'player_client': ['android', 'web']}}}),
         
         # Méthode 4: TV Embedded
-        {**ytdl_options, 'extractor_args': {'youtube': {'player_client': ['tv_embedded']}}},
+        ("tv_embedded", {**ytdl_options, 'extractor_args': {'youtube': {'player_client': ['tv_embedded']}}}),
         
         # Méthode 5: iOS client
-        {**ytdl_options, 'extractor_args': {'youtube': {'player_client': ['ios']}}},
+        ("ios", {**ytdl_options, 'extractor_args': {'youtube': {'player_client': ['ios']}}}),
         
         # Méthode 6: Age gate bypass
-        {**ytdl_options, 'age_limit': 999},
+        ("age_gate", {**ytdl_options, 'age_limit': 999}),
         
         # Méthode 7: Minimal quality
-        {
+        ("worst", {
             'format': 'worst[ext=webm]/worst',
             'quiet': True,
             'no_warnings': True,
             'extract_flat': False
-        },
+        }),
         
         # Méthode 8: Dernière chance avec proxy bypass
-        {
+        ("combined", {
             'format': 'bestaudio',
             'quiet': True,
             'no_warnings': True,
             'extract_flat': False,
             'geo_bypass': True,
             'extractor_args': {'youtube': {'player_client': ['android', 'web', 'tv_embedded']}}
-        }
+        })
     ]
     
-    for i, options in enumerate(extraction_methods, 1):
-        try:
-            logger.info(f"🔄 Tentative yt-dlp {i}/8: {source_type}")
-            
-            # Commande yt-dlp
-            cmd = ['yt-dlp', '--dump-json']
-            for key, value in options.items():
-                if key == 'format':
-                    cmd.extend(['-f', str(value)])
-                elif key == 'http_headers':
-                    for header_key, header_value in value.items():
-                        cmd.extend(['--add-header', f'{header_key}:{header_value}'])
-                elif key == 'extractor_args':
-                    for extractor, args in value.items():
-                        if isinstance(args, list):
-                            for arg in args:
-                                cmd.extend(['--extractor-args', f'{extractor}:player_client={arg}'])
-                        else:
-                            cmd.extend(['--extractor-args', f'{extractor}:{args}'])
-                elif isinstance(value, bool) and value:
-                    cmd.append(f'--{key.replace("_", "-")}')
-                elif not isinstance(value, (bool, dict)):
-                    cmd.extend([f'--{key.replace("_", "-")}', str(value)])
-            
-            cmd.append(search_query)
-            
-            # Exécuter avec timeout
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            try:
-                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=30)
-                
-                if process.returncode == 0 and stdout:
-                    info = json.loads(stdout.decode())
-                    
-                    # Extraire les informations
-                    title = info.get('title', 'Titre inconnu')
-                    uploader = info.get('uploader', 'Auteur inconnu')
-                    duration = info.get('duration', 0)
-                    url = info.get('url', info.get('webpage_url', ''))
-                    thumbnail = info.get('thumbnail', '')
-                    
-                    logger.info(f"✅ Extraction réussie méthode {i}: {title}")
-                    EXTRACTION_STATS["success"] += 1
-                    
-                    if source_type == "youtube":
-                        EXTRACTION_STATS["youtube"] += 1
-                    elif source_type == "soundcloud":
-                        EXTRACTION_STATS["soundcloud"] += 1
-                    
-                    return {
-                        'title': title,
-                        'uploader': uploader,
-                        'duration': duration,
-                        'url': url,
-                        'thumbnail': thumbnail,
-                        'source': source_type
-                    }
-                
-            except asyncio.TimeoutError:
-                logger.warning(f"⚠️ Timeout méthode {i}")
-                process.kill()
-                continue
-            
-        except Exception as e:
-            logger.warning(f"⚠️ Méthode {i} échouée: {e}")
-            continue
+    # La meilleure méthode du moment passe en premier
+    extraction_methods = rank_extraction_methods(extraction_methods, source_type)
+    
+    # Course entre les méthodes : la première réponse valide gagne, les autres sont tuées
+    method, info, failures = await race_extraction_methods(extraction_methods, search_query, source_type, request)
+    
+    if info:
+        # Extraire les informations
+        # (champs absents renvoyés à null par --print et par le pool)
+        title = info.get('title') or 'Titre inconnu'
+        uploader = info.get('uploader') or 'Auteur inconnu'
+        duration = info.get('duration') or 0
+        url = info.get('url') or info.get('webpage_url') or ''
+        thumbnail = info.get('thumbnail') or ''
+        webpage_url = info.get('webpage_url') or ''
+        
+        logger.info(f"✅ Extraction réussie méthode {method}: {title}")
+        EXTRACTION_STATS["success"] += 1
+        extraction_cache.record_circuit_result(source_type, True)
+        
+        if source_type == "youtube":
+            EXTRACTION_STATS["youtube"] += 1
+        elif source_type == "soundcloud":
+            EXTRACTION_STATS["soundcloud"] += 1
+        
+        audio_info = {
+            'id': info.get('id'),
+            'extractor_key': info.get('extractor_key'),
+            'acodec': info.get('acodec'),
+            'abr': info.get('abr'),
+            'title': title,
+            'uploader': uploader,
+            'duration': duration,
+            'is_live': bool(info.get('is_live')),
+            'url': url,
+            'thumbnail': thumbnail,
+            'webpage_url': webpage_url,
+            'source': source_type
+        }
+        extraction_cache.store(query, source_type, audio_info)
+        return audio_info
     
     # Toutes les méthodes ont échoué
     logger.error(f"❌ Échec extraction {source_type}: {query}")
     EXTRACTION_STATS["failed"] += 1
+    # Délai dépassé (charge) ou incident local : la requête pourra être réessayée tout de suite
+    if not any(kind in (extraction_cache.FAILURE_TIMEOUT, extraction_cache.FAILURE_INTERNAL) for kind in failures):
+        extraction_cache.record_failure(query, source_type)
+    # Seule une panne de l'extracteur (toutes les tentatives) compte pour le coupe-circuit
+    if extraction_cache.is_extractor_outage(failures):
+        extraction_cache.record_circuit_result(source_type, False)
+    return None
+
+# ============================
+# ORDONNANCEUR D'EXTRACTION
+# ============================
+
+# Extractions en vol : {(requête normalisée, source): {"task": Task, "waiters": int, "request": demande de place}}
+IN_FLIGHT_EXTRACTIONS = {}
+
+async def run_scheduled_extraction(query, source_type, request):
+    """Une extraction réelle : place dans l'ordonnanceur puis course yt-dlp"""
+    await extraction_scheduler.acquire_slot(request)
+    try:
+        return await perform_extraction(query, source_type, request)
+    finally:
+        extraction_scheduler.release_slot()
+
+async def extract_with_ytdlp(query, source_type="youtube", guild_id=None, priority=extraction_scheduler.PRIORITY_PLAY):
+    """Extraction yt-dlp : cache d'abord, puis une seule extraction partagée par requête identique"""
+    
+    # ⚡ Déjà résolu récemment : aucun processus yt-dlp, aucune attente
+    cached = extraction_cache.get_cached(query, source_type)
+    if cached and cached['url']:
+        logger.info(f"⚡ Extraction depuis le cache: {cached['title']}")
+        EXTRACTION_STATS["cache_hits"] = EXTRACTION_STATS.get("cache_hits", 0) + 1
+        return cached
+    
+    # 🚫 Échec récent : abandon immédiat, l'appelant passe à la suite
+    if extraction_cache.is_known_failure(query, source_type):
+        logger.info(f"🚫 Échec récent en cache, extraction ignorée: {query}")
+        EXTRACTION_STATS["negative_hits"] = EXTRACTION_STATS.get("negative_hits", 0) + 1
+        return None
+    
+    # 🔗 Même requête déjà en cours (autre utilisateur ou serveur) : attendre son résultat
+    key = extraction_cache.normalize_query(query, source_type)
+    flight = IN_FLIGHT_EXTRACTIONS.get(key)
+    if flight is not None and (flight["task"].done() or flight["task"].cancelling()):
+        # Extraction terminée ou abandonnée : ne jamais s'y joindre
+        flight = None
+    if flight is None:
+        # 🔌 Extracteur en panne : abandon immédiat (une seule extraction d'essai après la coupure)
+        admitted, probe = extraction_cache.circuit_admit(source_type)
+        if not admitted:
+            logger.info(f"🔌 Extracteur {source_type} coupé, extraction ignorée: {query}")
+            EXTRACTION_STATS["short_circuited"] = EXTRACTION_STATS.get("short_circuited", 0) + 1
+            return None
+        request = extraction_scheduler.new_request(guild_id, priority)
+        task = asyncio.create_task(run_scheduled_extraction(query, source_type, request))
+        flight = IN_FLIGHT_EXTRACTIONS[key] = {"task": task, "waiters": 0, "request": request}
+        task.add_done_callback(lambda _, flight=flight: forget_flight(key, flight))
+        if probe:
+            # Essai sans verdict (annulé, vidéo indisponible...) : l'extraction suivante le refera
+            task.add_done_callback(lambda _: extraction_cache.release_circuit_probe(source_type, probe))
+    else:
+        logger.info(f"🔗 Extraction déjà en cours, résultat partagé: {query}")
+        EXTRACTION_STATS["coalesced"] = EXTRACTION_STATS.get("coalesced", 0) + 1
+        # "Jouer maintenant" ne doit pas attendre derrière le préchargement qu'il rejoint
+        extraction_scheduler.raise_priority(flight["request"], priority)
+    
+    task = flight["task"]
+    flight["waiters"] += 1
+    try:
+        # shield : l'annulation d'un appelant ne doit pas priver les autres du résultat
+        result = await asyncio.shield(task)
+    finally:
+        flight["waiters"] -= 1
+        if not flight["waiters"] and not task.done():
+            # Plus personne n'attend cette extraction : un nouvel appel en relancera une
+            task.cancel()
+            forget_flight(key, flight)
+    
+    # Copie par appelant : le résultat est partagé
+    return dict(result) if result else result
+
+def promote_extraction(query, source_type, priority=extraction_scheduler.PRIORITY_PLAY):
+    """Relever la priorité d'une extraction en vol (préchargement devenu lecture immédiate)"""
+    flight = IN_FLIGHT_EXTRACTIONS.get(extraction_cache.normalize_query(query, source_type))
+    if flight is not None:
+        extraction_scheduler.raise_priority(flight["request"], priority)
+
+def forget_flight(key, flight):
+    """Retirer une extraction en vol (seulement si elle n'a pas déjà été remplacée)"""
+    if IN_FLIGHT_EXTRACTIONS.get(key) is flight:
+        del IN_FLIGHT_EXTRACTIONS[key]
+
+def format_scheduler_status():
+    """État de l'ordonnanceur pour /debug"""
+    status = extraction_scheduler.scheduler_status()
+    return (
+        f"En cours: {status['running']}/{status['max_concurrent']}\n"
+        f"En attente: {status['waiting_play']} lecture • {status['waiting_prefetch']} préchargement\n"
+        f"Pic de file: {status['max_queue_depth']} • Attente moy.: {status['average_wait']:.1f}s • "
+        f"Promues: {status['promoted']}\n"
+        f"En vol: {len(IN_FLIGHT_EXTRACTIONS)} • Fusionnées: {EXTRACTION_STATS.get('coalesced', 0)}"
+    )
+
+# ============================
+# PRÉCHARGEMENT DE LA FILE D'ATTENTE
+# ============================
+
+# Prochaines entrées résolues pendant la lecture : {guild_id: {(requête, source): état}}
+PREFETCHED = {}
+PREFETCH_DEPTH = int(os.getenv('PREFETCH_DEPTH', 2))  # entrées résolues à l'avance
+PREFETCH_MAX_AGE = 1800  # secondes de validité d'une URL sans paramètre d'expiration
+
+def queue_entry_key(entry):
+    """Clé d'une entrée de file (tuple, ou liste après rechargement)"""
+    return (entry[0], entry[1])
+
+def prefetched_expired(slot):
+    """Indiquer si l'URL préchargée a expiré (ou est trop ancienne si l'expiration est inconnue)"""
+    expires = extraction_cache.parse_stream_url_expiry(slot["audio_info"].get('url'))
+    if expires is None:
+        return time.time() - slot["resolved_at"] > PREFETCH_MAX_AGE
+    return time.time() >= expires - extraction_cache.STREAM_URL_EXPIRY_MARGIN
+
+async def prefetch_entry(guild_id, key):
+    """Résoudre une entrée de la file en arrière-plan"""
+    try:
+        audio_info = await extract_with_ytdlp(key[0], key[1], guild_id=guild_id, priority=extraction_scheduler.PRIORITY_PREFETCH)
+    except Exception as e:
+        logger.warning(f"⚠️ Préchargement échoué ({key[0]}): {e}")
+        audio_info = None
+    
+    slot = PREFETCHED.get(guild_id, {}).get(key)
+    if slot is not None:
+        slot["audio_info"] = audio_info
+        slot["resolved_at"] = time.time()
+        slot["task"] = None
+    if audio_info:
+        logger.info(f"⏩ Préchargé: {audio_info['title']}")
+    return audio_info
+
+def schedule_prefetch(guild_id):
+    """Lancer la résolution des PREFETCH_DEPTH prochaines entrées (et rafraîchir celles qui ont expiré)"""
+    queue = SONG_QUEUES.get(guild_id) or []
+    upcoming = [queue_entry_key(entry) for entry in list(queue)[:PREFETCH_DEPTH]]
+    slots = PREFETCHED.setdefault(guild_id, {})
+    
+    # Oublier ce qui n'est plus en tête de file
+    for key in list(slots):
+        if key not in upcoming:
+            task = slots.pop(key)["task"]
+            if task is not None:
+                task.cancel()
+    
+    for key in upcoming:
+        slot = slots.get(key)
+        if slot is not None:
+            if slot["task"] is not None or slot["audio_info"] is None:
+                # En cours, ou déjà échoué (l'extraction normale réessaiera)
+                continue
+            if not prefetched_expired(slot):
+                continue
+        slot = {"task": None, "audio_info": None, "resolved_at": 0.0}
+        slots[key] = slot
+        slot["task"] = asyncio.create_task(prefetch_entry(guild_id, key))
+
+async def take_prefetched(guild_id, entry):
+    """audio_info préchargé pour l'entrée qui va être jouée (None s'il faut l'extraire)"""
+    slot = PREFETCHED.get(guild_id, {}).pop(queue_entry_key(entry), None)
+    if slot is None:
+        return None
+    if slot["task"] is not None:
+        # Résolution déjà en cours : l'attendre plutôt que recommencer, en priorité lecture
+        promote_extraction(*queue_entry_key(entry))
+        try:
+            return await slot["task"]
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling():
+                # C'est l'appelant qui est annulé, pas le préchargement
+                raise
+            return None
+    if slot["audio_info"] and not prefetched_expired(slot):
+        return slot["audio_info"]
     return None
 
+def clear_prefetch(guild_id):
+    """Annuler les préchargements d'un serveur (file vidée)"""
+    for slot in PREFETCHED.pop(guild_id, {}).values():
+        if slot["task"] is not None:
+            slot["task"].cancel()
+
+# ============================
+# IMPORT DE PLAYLISTS ET ALBUMS
+# ============================
+
+PLAYLIST_MAX_ENTRIES = int(os.getenv('PLAYLIST_MAX_ENTRIES', 200))  # titres importés au maximum par lien
+PLAYLIST_LINE_LIMIT = 64 * 1024  # taille maximale d'une entrée de --flat-playlist
+
+SPOTIFY_COLLECTION_PATTERN = re.compile(r"open\.spotify\.com/(?:intl-[\w-]+/)?(album|playlist)/([A-Za-z0-9]+)")
+
+# Imports en cours et lectures qu'ils ont lancées : {guild_id: {Task}} (annulés par /stop et /disconnect)
+PLAYLIST_IMPORTS = {}
+
+def queue_entry_label(entry):
+    """Titre affiché d'une entrée de file (les entrées de playlist portent leur titre)"""
+    return entry[2] if len(entry) > 2 and entry[2] else entry[0]
+
+def is_youtube_playlist_url(url):
+    """Lien de playlist YouTube (une vidéo ouverte depuis une playlist reste une vidéo seule)"""
+    if not url.startswith("http") or "list=" not in url:
+        return False
+    return "/playlist" in url or "v=" not in url
+
+def spotify_collection(url):
+    """('album' | 'playlist', id) pour un lien d'album ou de playlist Spotify, None sinon"""
+    match = SPOTIFY_COLLECTION_PATTERN.search(url)
+    return (match.group(1), match.group(2)) if match else None
+
+async def stream_youtube_playlist(url):
+    """Lister une playlist sans résoudre ses vidéos (--flat-playlist), entrée par entrée"""
+    cmd = ['yt-dlp', '--flat-playlist', '--print', '%(.{id,url,title})j', '--playlist-end', str(PLAYLIST_MAX_ENTRIES), url]
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.DEVNULL,
+        start_new_session=True,
+        limit=PLAYLIST_LINE_LIMIT
+    )
+    
+    try:
+        # yt-dlp écrit chaque entrée dès que sa page de playlist est chargée
+        async for line in process.stdout:
+            entry = playlist_import.flat_playlist_entry(line)
+            if entry is not None:
+                yield entry
+    finally:
+        kill_process_group(process)
+        await process.wait()
+
+async def stream_spotify_collection(kind, collection_id):
+    """Pistes d'un album ou d'une playlist Spotify, page par page, en recherches YouTube"""
+    if kind == "album":
+        page = await asyncio.to_thread(spotify_client.album_tracks, collection_id, limit=50)
+    else:
+        page = await asyncio.to_thread(spotify_client.playlist_items, collection_id, limit=100, additional_types=('track',))
+    
+    count = 0
+    while page:
+        for item in page['items']:
+            # Playlist : {"track": {...}} ; album : la piste elle-même
+            track = item.get('track') if kind == "playlist" else item
+            if not track or not track.get('name') or not track.get('artists'):
+                continue
+            artist = track['artists'][0]['name']
+            yield (f"{artist} {track['name']}", "youtube", f"{track['name']} - {artist}")
+            count += 1
+            if count >= PLAYLIST_MAX_ENTRIES:
+                return
+        page = await asyncio.to_thread(spotify_client.next, page) if page.get('next') else None
+
+def track_playlist_task(guild_id, task):
+    """Garder une référence à une tâche d'import (ou à la lecture qu'il lance) jusqu'à sa fin"""
+    tasks = PLAYLIST_IMPORTS.setdefault(guild_id, set())
+    tasks.add(task)
+    task.add_done_callback(tasks.discard)
+    return task
+
+async def ingest_playlist(guild_id, entries, voice_client, channel, label):
+    """Ajouter les titres à la file au fil de l'eau ; le premier démarre la lecture sans attendre la fin"""
+    added = await playlist_import.ingest(
+        SONG_QUEUES.setdefault(guild_id, deque()), entries, label,
+        playing=voice_client.is_playing() or voice_client.is_paused(),
+        start_playback=lambda: track_playlist_task(
+            guild_id, asyncio.create_task(play_next_in_queue(voice_client, channel))
+        ),
+        schedule_prefetch=lambda: schedule_prefetch(guild_id),
+        save=lambda: aauto_save_data(song_queues=SONG_QUEUES),
+        prefetch_depth=PREFETCH_DEPTH
+    )
+    
+    await aauto_save_data(song_queues=SONG_QUEUES)
+    logger.info(f"📥 Playlist importée: {added} titres ({label})")
+    
+    if added:
+        embed = create_embed("📥 Playlist importée", f"**{label}**\n{added} titre(s) ajouté(s) à la queue")
+    else:
+        embed = create_embed("❌ Playlist vide", f"Aucun titre trouvé: `{label}`", 0xff9900)
+    await channel.send(embed=embed)
+
+def start_playlist_import(guild_id, entries, voice_client, channel, label):
+    """Lancer un import de playlist en arrière-plan"""
+    return track_playlist_task(
+        guild_id, asyncio.create_task(ingest_playlist(guild_id, entries, voice_client, channel, label))
+    )
+
+def cancel_playlist_imports(guild_id):
+    """Arrêter les imports en cours d'un serveur (file vidée)"""
+    for task in PLAYLIST_IMPORTS.pop(guild_id, set()):
+        task.cancel()
+
 # ============================
 # LECTURE AUDIO DIRECTE (identique)
 # ============================
 
+# Processus FFmpeg de lecture simultanés (au-delà, les nouvelles sources attendent)
+FFMPEG_MAX_PROCESSES = int(os.getenv('FFMPEG_MAX_PROCESSES', 32))
+
+# Volume de lecture et chemin Opus (FFmpeg fournit directement les paquets Opus à discord.py)
+PLAYBACK_VOLUME = float(os.getenv('PLAYBACK_VOLUME', 0.6))
+OPUS_PASSTHROUGH = os.getenv('OPUS_PASSTHROUGH', 'true').lower() == 'true'
+OPUS_MAX_BITRATE = 128  # kbit/s (ancien -maxrate 128k)
+PLAYBACK_STATS = {"copy": 0, "opus": 0, "pcm": 0}
+
+STREAM_BEFORE_OPTIONS = (
+    '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 30 '
+    '-analyzeduration 1000000 -probesize 1000000 '
+    '-user_agent "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"'
+)
+
+def opus_bitrate(audio_info, voice_client):
+    """Débit d'encodage : celui de la source (sondé par yt-dlp), borné par le salon vocal"""
+    cap = OPUS_MAX_BITRATE
+    channel_bitrate = getattr(voice_client.channel, 'bitrate', None)
+    if channel_bitrate:
+        cap = min(cap, channel_bitrate // 1000)
+    abr = audio_info.get('abr')
+    return max(32, min(int(abr), cap)) if abr else cap
+
+def create_audio_source(voice_client, audio_info, local_path=None):
+    """
+    Source audio d'un titre, de la moins à la plus coûteuse :
+    - fichier du cache audio (volume appliqué une fois à l'encodage) : copie Opus
+    - flux Opus distant (webm/opus) sans changement de volume : copie Opus
+    - autre flux : FFmpeg encode en Opus, discord.py n'encode plus trame par trame
+    Avec OPUS_PASSTHROUGH=false : ancien chemin PCM.
+    (discord.py copie le flux quand codec vaut 'opus', l'encode avec libopus sinon)
+    """
+    if local_path:
+        if OPUS_PASSTHROUGH:
+            PLAYBACK_STATS["copy"] += 1
+            return discord.FFmpegOpusAudio(local_path, codec='opus', options='-vn')
+        PLAYBACK_STATS["pcm"] += 1
+        return discord.FFmpegPCMAudio(local_path, options='-vn')
+    
+    if not OPUS_PASSTHROUGH:
+        PLAYBACK_STATS["pcm"] += 1
+        return discord.FFmpegPCMAudio(
+            audio_info['url'],
+            before_options=STREAM_BEFORE_OPTIONS,
+            options=f'-vn -bufsize 512k -maxrate {OPUS_MAX_BITRATE}k -filter:a volume={PLAYBACK_VOLUME}'
+        )
+    
+    if audio_info.get('acodec') == 'opus' and PLAYBACK_VOLUME == 1.0:
+        PLAYBACK_STATS["copy"] += 1
+        return discord.FFmpegOpusAudio(audio_info['url'], codec='opus', before_options=STREAM_BEFORE_OPTIONS, options='-vn')
+    
+    PLAYBACK_STATS["opus"] += 1
+    volume_filter = f' -filter:a volume={PLAYBACK_VOLUME}' if PLAYBACK_VOLUME != 1.0 else ''
+    return discord.FFmpegOpusAudio(
+        audio_info['url'],
+        bitrate=opus_bitrate(audio_info, voice_client),
+        before_options=STREAM_BEFORE_OPTIONS,
+        options='-vn' + volume_filter
+    )
+
+def release_audio_source(source):
+    """Callback de fin de lecture (thread audio) : rendre la place FFmpeg dans l'event loop"""
+    bot.loop.call_soon_threadsafe(ffmpeg_supervisor.close_source, source)
+
+def is_source_playing(record):
+    """Indiquer si une source suivie par le superviseur est encore celle du salon vocal"""
+    if record["kind"] == "station":
+        # Station radio partagée : elle se ferme seule quand plus personne ne l'écoute
+        return record["source"].is_alive()
+    if record["kind"] == "download":
+        # Téléchargement du cache audio : borné par son propre délai (DOWNLOAD_TIMEOUT)
+        return True
+    guild = bot.get_guild(int(record["guild_id"]))
+    voice_client = guild.voice_client if guild else None
+    return voice_client is not None and voice_client.source is record["source"]
+
 async def play_extracted_audio(voice_client, audio_info, channel):
     """Joue l'audio extrait directement"""
     
+    source = None
     try:
         if not audio_info or not audio_info.get('url'):
             return False
         
-        # Options FFmpeg optimisées
-        ffmpeg_options = {
-            'before_options': (
-                '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 30 '
-                '-analyzeduration 1000000 -probesize 1000000 '
-                '-user_agent "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"'
-            ),
-            'options': '-vn -bufsize 512k -maxrate 128k -filter:a volume=0.6'
-        }
+        # 💽 Titre souvent joué : lecture depuis le fichier local, sinon compter la lecture
+        local_path = audio_cache.lookup(audio_info)
+        if local_path:
+            logger.info(f"💽 Lecture depuis le cache audio: {audio_info['title']}")
+        else:
+            audio_cache.record_play(audio_info)
         
-        source = discord.FFmpegPCMAudio(audio_info['url'], **ffmpeg_options)
+        # 🎛️ Processus FFmpeg suivi par le superviseur (attente si le plafond global est atteint)
+        source = await ffmpeg_supervisor.open_source(
+            str(voice_client.guild.id), audio_info['title'], "track",
+            lambda: create_audio_source(voice_client, audio_info, local_path)
+        )
         
         def after_play(error):
             if error:
                 logger.error(f"Erreur FFmpeg: {error}")
+            release_audio_source(source)
             asyncio.run_coroutine_threadsafe(play_next_in_queue(voice_client, channel), bot.loop)
         
         voice_client.play(source, after=after_play)
         
+        # ⏩ Résoudre les prochaines entrées pendant la lecture
+        schedule_prefetch(str(voice_client.guild.id))
+        
         # Message de succès
         embed = create_embed("🎵 Lecture en cours", f"**{audio_info['title']}**")
         embed.add_field(name="👤 Auteur", value=audio_info['uploader'], inline=True)
@@ -663,6 +1452,10 @@ async def play_extracted_audio(voice_client, audio_info, channel):
         
     except Exception as e:
         logger.error(f"❌ Erreur lecture audio: {e}")
+        if source is not None and voice_client.source is not source:
+            # Jamais jouée : pas de callback after pour la refermer
+            source.cleanup()
+            ffmpeg_supervisor.close_source(source)
         return False
 
 async def play_next_in_queue(voice_client, channel):
@@ -671,28 +1464,41 @@ async def play_next_in_queue(voice_client, channel):
     guild_id = str(voice_client.guild.id)
     
     if guild_id in SONG_QUEUES and SONG_QUEUES[guild_id]:
-        # Récupérer la prochaine chanson
-        query, source_type = SONG_QUEUES[guild_id].popleft()
+        # 🔌 Extracteur en panne : radio tout de suite, sans vider la file titre par titre
+        if extraction_cache.circuit_open(SONG_QUEUES[guild_id][0][1]):
+            embed = create_embed("🔌 Source indisponible", "Extraction temporairement coupée, radio en attendant", 0xff9900)
+            await channel.send(embed=embed)
+            await play_radio_fallback(voice_client, channel)
+            schedule_circuit_resume(voice_client, channel)
+            return
         
-        # Message de progression
-        embed = create_embed("🔍 Extraction suivante...", f"Recherche: `{query}`", 0xffff00)
-        progress_msg = await channel.send(embed=embed)
+        # Récupérer la prochaine chanson
+        entry = SONG_QUEUES[guild_id].popleft()
+        query, source_type = queue_entry_key(entry)
         
-        # Extraire l'audio
-        audio_info = await extract_with_ytdlp(query, source_type)
+        # ⏩ Déjà résolue pendant la lecture précédente : enchaîner sans attente
+        audio_info = await take_prefetched(guild_id, entry)
         
-        # Supprimer le message de progression
-        try:
-            await progress_msg.delete()
-        except:
-            pass
+        if not audio_info:
+            # Message de progression
+            embed = create_embed("🔍 Extraction suivante...", f"Recherche: `{queue_entry_label(entry)}`", 0xffff00)
+            progress_msg = await channel.send(embed=embed)
+            
+            # Extraire l'audio
+            audio_info = await extract_with_ytdlp(query, source_type, guild_id=guild_id)
+            
+            # Supprimer le message de progression
+            try:
+                await progress_msg.delete()
+            except:
+                pass
         
         if audio_info:
             # Jouer l'audio
             await play_extracted_audio(voice_client, audio_info, channel)
         else:
             # Échec, essayer la suivante ou radio
-            embed = create_embed("❌ Extraction échouée", f"Impossible d'extraire: `{query}`", 0xff9900)
+            embed = create_embed("❌ Extraction échouée", f"Impossible d'extraire: `{queue_entry_label(entry)}`", 0xff9900)
             await channel.send(embed=embed)
             
             # Essayer la suivante
@@ -702,26 +1508,121 @@ async def play_next_in_queue(voice_client, channel):
         # Queue vide, jouer radio
         await play_radio_fallback(voice_client, channel)
 
-async def play_radio_fallback(voice_client, channel):
-    """Joue une radio en fallback"""
+async def resume_queue_after_circuit(voice_client, channel):
+    """Reprendre la file gardée dès que l'extracteur de son premier titre peut être réessayé"""
+    guild_id = str(voice_client.guild.id)
+    try:
+        while True:
+            if not voice_client.is_connected() or not SONG_QUEUES.get(guild_id):
+                return
+            source_type = queue_entry_key(SONG_QUEUES[guild_id][0])[1]
+            if not extraction_cache.circuit_open(source_type):
+                break
+            # Coupé : attendre la fin de la coupure ; essai en cours (autre serveur) : son verdict
+            await asyncio.sleep(extraction_cache.circuit_retry_in(source_type) or CIRCUIT_RESUME_POLL)
+        
+        if voice_client.is_playing() or voice_client.is_paused():
+            if not isinstance(voice_client.source, radio_hub.RadioListener):
+                # Un titre a déjà repris : son callback after enchaîne la file
+                return
+            voice_client.stop()
+        
+        logger.info(f"🔌 Reprise de la file après coupure (serveur {guild_id})")
+        # Retirée avant la reprise : si l'extracteur est de nouveau coupé, play_next en prévoit une autre
+        CIRCUIT_RESUMES.pop(guild_id, None)
+        await play_next_in_queue(voice_client, channel)
+    finally:
+        if CIRCUIT_RESUMES.get(guild_id) is asyncio.current_task():
+            del CIRCUIT_RESUMES[guild_id]
+
+def schedule_circuit_resume(voice_client, channel):
+    """Prévoir la reprise de la file d'un serveur passé en radio à cause d'une coupure (une seule par serveur)"""
+    guild_id = str(voice_client.guild.id)
+    task = CIRCUIT_RESUMES.get(guild_id)
+    if task is None or task.done():
+        CIRCUIT_RESUMES[guild_id] = asyncio.create_task(resume_queue_after_circuit(voice_client, channel))
+
+# Stations de fallback (classées par radio_health selon leurs sondes)
+RADIO_STATIONS = [
+    {"name": "FIP Radio France", "url": "https://icecast.radiofrance.fr/fip-hifi.aac"},
+    {"name": "SomaFM Groove Salad", "url": "http://ice1.somafm.com/groovesalad-256-mp3"},
+    {"name": "Swiss Radio", "url": "http://stream.srg-ssr.ch/rsp/aacp_48.aac"},
+    {"name": "Lofi Hip Hop Radio", "url": "http://streams.fluxfm.de/Lofi/mp3-320/audio/"},
+    {"name": "Chill Radio", "url": "http://air.radiorecord.ru:805/chill_320"}
+]
+RADIO_PROBE_INTERVAL = float(os.getenv('RADIO_PROBE_INTERVAL', 300))  # secondes entre deux tournées de sondes
+
+# Radios : une station décodée une fois, partagée par tous les serveurs qui l'écoutent
+RADIO_VOLUME = 0.4
+RADIO_START_TIMEOUT = float(os.getenv('RADIO_START_TIMEOUT', 10))  # secondes pour recevoir la première trame
+RADIO_STATION_LOCK = asyncio.Lock()
+
+def on_radio_station_closed(station):
+    """Station fermée : rendre sa place FFmpeg ; un flux qui n'a rien fourni compte comme un échec"""
+    ffmpeg_supervisor.close_source(station)
+    if station.status()["frames"] == 0:
+        radio_health.record_failure(station.url, "flux vide")
+
+def release_radio_station(station):
+    """Fermeture d'une station (thread lecteur ou minuterie) : traitée dans l'event loop"""
+    try:
+        bot.loop.call_soon_threadsafe(on_radio_station_closed, station)
+    except RuntimeError:
+        # Event loop déjà fermée (arrêt du bot)
+        pass
+
+async def tune_radio_station(radio):
+    """Auditeur de la station partagée, ouverte si aucun serveur ne l'écoute encore"""
+    async with RADIO_STATION_LOCK:
+        station = radio_hub.get_station(radio["url"])
+        if station is not None:
+            try:
+                return station.listen()
+            except RuntimeError:
+                # Fermée à l'instant (plus d'auditeurs) : en rouvrir une
+                pass
+        station = await ffmpeg_supervisor.open_source(
+            "radio", radio["name"], "station",
+            lambda: radio_hub.open_station(radio["name"], radio["url"], RADIO_VOLUME, on_close=release_radio_station)
+        )
+        return station.listen()
+
+async def play_radio_fallback(voice_client, channel, exclude=None):
+    """Joue une radio en fallback (exclude : URL de la station qui vient de s'arrêter)"""
     
-    radios = [
-        {"name": "FIP Radio France", "url": "https://icecast.radiofrance.fr/fip-hifi.aac"},
-        {"name": "SomaFM Groove Salad", "url": "http://ice1.somafm.com/groovesalad-256-mp3"},
-        {"name": "Swiss Radio", "url": "http://stream.srg-ssr.ch/rsp/aacp_48.aac"},
-        {"name": "Lofi Hip Hop Radio", "url": "http://streams.fluxfm.de/Lofi/mp3-320/audio/"},
-        {"name": "Chill Radio", "url": "http://air.radiorecord.ru:805/chill_320"}
-    ]
+    # 📡 Classement des sondes : la plus rapide d'abord, les stations mortes écartées
+    # (toutes mortes : on les essaie quand même, dans l'ordre d'origine)
+    radios = radio_health.ranked_stations(RADIO_STATIONS) or RADIO_STATIONS
+    radios = [radio for radio in radios if radio["url"] != exclude]
     
     for radio in radios:
         try:
-            ffmpeg_options = {
-                'before_options': '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 30',
-                'options': '-vn -filter:a volume=0.4'
-            }
+            # 📡 Lecture depuis le tampon partagé de la station (aucun FFmpeg par serveur)
+            listener = await tune_radio_station(radio)
+            station = listener.station
+            
+            # Annoncer la radio seulement une fois le son arrivé
+            if not await asyncio.to_thread(station.wait_started, RADIO_START_TIMEOUT):
+                listener.cleanup()
+                logger.error(f"❌ Radio {radio['name']} muette après {RADIO_START_TIMEOUT:.0f}s")
+                if station.listeners == 0:
+                    # Fermée tout de suite (pas de persistance) : son callback compte l'échec
+                    await asyncio.to_thread(station.close)
+                continue
+            
+            def after_radio(error, listener=listener, radio=radio):
+                if error:
+                    logger.error(f"Erreur radio: {error}")
+                if listener.station.is_alive():
+                    # Arrêt volontaire (stop, titre suivant, reprise de la file) : rien à enchaîner
+                    return
+                asyncio.run_coroutine_threadsafe(switch_radio_station(voice_client, channel, radio), bot.loop)
             
-            source = discord.FFmpegPCMAudio(radio["url"], **ffmpeg_options)
-            voice_client.play(source)
+            try:
+                voice_client.play(listener, after=after_radio)
+            except Exception:
+                listener.cleanup()
+                raise
             
             embed = create_embed("📻 Radio en cours", f"**{radio['name']}**\nMusique en continu")
             await channel.send(embed=embed)
@@ -731,10 +1632,19 @@ async def play_radio_fallback(voice_client, channel):
             
         except Exception as e:
             logger.error(f"❌ Radio {radio['name']} échouée: {e}")
+            radio_health.record_failure(radio["url"], str(e))
             continue
     
     return False
 
+async def switch_radio_station(voice_client, channel, radio):
+    """Flux de la radio en cours interrompu : passer à la station suivante du classement"""
+    radio_health.record_failure(radio["url"], "flux interrompu")
+    if not voice_client.is_connected() or voice_client.is_playing() or voice_client.is_paused():
+        return
+    logger.warning(f"📻 Radio {radio['name']} interrompue, station suivante")
+    await play_radio_fallback(voice_client, channel, exclude=radio["url"])
+
 # ============================
 # SYSTÈME DE SUPPORT COMPLET (identique)
 # ============================
@@ -985,9 +1895,10 @@ async def on_ready():
         global WARNINGS, SONG_QUEUES, LOOP_MODES, CURRENT_SONGS
         global SUPPORT_CHANNELS, SUPPORT_CONFIG, TEMP_VOCAL_CONFIG, TEMP_VOCAL_CHANNELS
         global RAID_PROTECTION, JOIN_TRACKER, MESSAGE_TRACKER, EXTRACTION_STATS
+        global TRACKER_SWEEPER_TASK, METHOD_STATS
         
         # Charger toutes les données depuis le JSON
-        loaded_data = load_all_data()
+        loaded_data = await aload_all_data()
         
         # Restaurer toutes les variables globales
         WARNINGS = loaded_data["warnings"]
@@ -1001,7 +1912,30 @@ async def on_ready():
         RAID_PROTECTION = loaded_data["raid_protection"]
         JOIN_TRACKER = loaded_data["join_tracker"]
         MESSAGE_TRACKER = loaded_data["message_tracker"]
-        EXTRACTION_STATS = loaded_data["extraction_stats"]
+        # Copies : les statistiques vivantes ne partagent aucun dict avec les données chargées
+        EXTRACTION_STATS = {**EXTRACTION_STATS, **loaded_data["extraction_stats"]}
+        METHOD_STATS = snapshot_method_stats(loaded_data["method_stats"])
+        
+        # Démarrer l'écriture différée (les sauvegardes sont regroupées)
+        start_background_writer(SAVE_INTERVAL)
+        
+        # Balayage périodique des trackers (une seule tâche, même après une reconnexion)
+        if TRACKER_SWEEPER_TASK is None or TRACKER_SWEEPER_TASK.done():
+            TRACKER_SWEEPER_TASK = asyncio.create_task(tracker_sweeper_loop())
+        
+        # Workers yt-dlp chauds (repli automatique sur le CLI si yt_dlp n'est pas importable)
+        if EXTRACTION_BACKEND == "pool":
+            await ytdlp_pool.start_pool(YTDLP_POOL_SIZE)
+        
+        # Suivi des processus FFmpeg de lecture (plafond global, orphelins, CPU/RSS)
+        ffmpeg_supervisor.start_supervisor(is_source_playing, FFMPEG_MAX_PROCESSES)
+        
+        # Sondes de santé des radios (classement utilisé par le fallback)
+        radio_health.start_prober(RADIO_STATIONS, RADIO_PROBE_INTERVAL)
+        
+        # Cache audio local des titres les plus joués
+        # (volume appliqué une fois à l'encodage : les fichiers sont relus en copie Opus)
+        audio_cache.configure(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_MB * 1024 * 1024, AUDIO_CACHE_MIN_PLAYS, PLAYBACK_VOLUME)
         
         print("✅ Toutes les données restaurées depuis la sauvegarde !")
         print(f"📋 Avertissements: {len(WARNINGS)} utilisateurs")
@@ -1065,7 +1999,7 @@ async def on_ready():
     print(f"🎤 Salons vocaux: Création automatique temporaire")
     print(f"🛡️ Modération: Ban/Kick/Timeout/Warn/Clear")
     print(f"🚨 Anti-Raid: Protection automatique avancée")
-    print(f"📻 Radio: 5 stations de fallback")
+    print(f"📻 Radio: {len(RADIO_STATIONS)} stations de fallback")
     print(f"📋 Commandes: /play, /ban, /kick, /timeout, /warn, /clear, /config_security")
     print("=" * 80)
 
@@ -1139,6 +2073,13 @@ async def play(interaction: discord.Interaction, song: str):
     if guild_id not in SONG_QUEUES:
         SONG_QUEUES[guild_id] = deque()
     
+    # 📥 Playlist : listée sans résolution, la file se remplit au fil de l'eau
+    if is_youtube_playlist_url(song):
+        embed = create_embed("📥 Import de playlist...", f"Lien: `{song}`\n\nLes titres sont ajoutés à la queue au fur et à mesure", 0xffff00)
+        await interaction.followup.send(embed=embed)
+        start_playlist_import(guild_id, stream_youtube_playlist(song), voice_client, interaction.channel, song)
+        return
+    
     # Si rien ne joue, jouer immédiatement
     if not voice_client.is_playing() and not voice_client.is_paused():
         # Message de progression
@@ -1146,7 +2087,7 @@ async def play(interaction: discord.Interaction, song: str):
         progress_msg = await interaction.followup.send(embed=embed)
         
         # Extraire l'audio
-        audio_info = await extract_with_ytdlp(song, "youtube")
+        audio_info = await extract_with_ytdlp(song, "youtube", guild_id=guild_id)
         
         # Supprimer le message de progression
         try:
@@ -1174,11 +2115,11 @@ async def play(interaction: discord.Interaction, song: str):
     else:
         # Ajouter à la queue
         SONG_QUEUES[guild_id].append((song, "youtube"))
+        schedule_prefetch(guild_id)
         
         # 💾 SAUVEGARDE AUTOMATIQUE des SONG_QUEUES
-        # Convertir deques en listes pour JSON
-        song_queues_dict = {k: list(v) for k, v in SONG_QUEUES.items()}
-        auto_save_data(song_queues=song_queues_dict)
+        # (les deques sont copiées en listes, les files jamais lues restent telles quelles)
+        await aauto_save_data(song_queues=SONG_QUEUES)
         
         embed = create_embed("📋 Ajouté à la queue", f"**{song}**\nPosition: {len(SONG_QUEUES[guild_id])}")
         await interaction.followup.send(embed=embed)
@@ -1194,9 +2135,16 @@ async def spotify_play(interaction: discord.Interaction, song: str):
         return
     
     search_query = song
+    collection = spotify_collection(song)
     
+    if collection:
+        # Album ou playlist : importé une fois connecté au vocal
+        if not spotify_client:
+            embed = create_embed("❌ Erreur Spotify", "API Spotify non configurée", 0xff0000)
+            await interaction.followup.send(embed=embed)
+            return
     # Si c'est un lien Spotify, convertir
-    if "spotify.com" in song:
+    elif "spotify.com" in song:
         conversion_result = spotify_to_search_query(song)
         if conversion_result:
             search_query, track_info = conversion_result
@@ -1246,10 +2194,20 @@ async def spotify_play(interaction: discord.Interaction, song: str):
     if guild_id not in SONG_QUEUES:
         SONG_QUEUES[guild_id] = deque()
     
+    # 📥 Album / playlist : pistes listées page par page, chacune cherchée sur YouTube à la lecture
+    if collection:
+        kind, collection_id = collection
+        label = f"{'Album' if kind == 'album' else 'Playlist'} Spotify"
+        embed = create_embed(f"📥 Import {label}...", "Les titres sont ajoutés à la queue au fur et à mesure", 0xffff00)
+        await interaction.followup.send(embed=embed)
+        start_playlist_import(guild_id, stream_spotify_collection(kind, collection_id), voice_client, interaction.channel, label)
+        EXTRACTION_STATS["spotify"] += 1
+        return
+    
     # Si rien ne joue, jouer immédiatement
     if not voice_client.is_playing() and not voice_client.is_paused():
         # Extraire l'audio
-        audio_info = await extract_with_ytdlp(search_query, "youtube")
+        audio_info = await extract_with_ytdlp(search_query, "youtube", guild_id=guild_id)
         
         if audio_info:
             # Jouer immédiatement
@@ -1260,6 +2218,7 @@ async def spotify_play(interaction: discord.Interaction, song: str):
     else:
         # Ajouter à la queue
         SONG_QUEUES[guild_id].append((search_query, "youtube"))
+        schedule_prefetch(guild_id)
         
         embed = create_embed("📋 Spotify ajouté", f"**{search_query}**\nPosition: {len(SONG_QUEUES[guild_id])}")
         await interaction.followup.send(embed=embed)
@@ -1297,7 +2256,7 @@ async def soundcloud_play(interaction: discord.Interaction, song: str):
         progress_msg = await interaction.followup.send(embed=embed)
         
         # Extraire l'audio depuis SoundCloud
-        audio_info = await extract_with_ytdlp(song, "soundcloud")
+        audio_info = await extract_with_ytdlp(song, "soundcloud", guild_id=guild_id)
         
         # Supprimer le message de progression
         try:
@@ -1319,6 +2278,7 @@ async def soundcloud_play(interaction: discord.Interaction, song: str):
     else:
         # Ajouter à la queue
         SONG_QUEUES[guild_id].append((song, "soundcloud"))
+        schedule_prefetch(guild_id)
         
         embed = create_embed("📋 SoundCloud ajouté", f"**{song}**\nPosition: {len(SONG_QUEUES[guild_id])}")
         await interaction.followup.send(embed=embed)
@@ -1372,8 +2332,11 @@ async def queue_command(interaction: discord.Interaction):
     
     # Afficher les prochaines chansons
     upcoming = []
-    for i, (query, source) in enumerate(list(queue)[:10], 1):
-        upcoming.append(f"`{i}.` **{query}** ({source})")
+    prefetched = PREFETCHED.get(guild_id, {})
+    for i, entry in enumerate(list(queue)[:10], 1):
+        slot = prefetched.get(queue_entry_key(entry))
+        ready = " ⏩" if slot and slot["audio_info"] else ""
+        upcoming.append(f"`{i}.` **{queue_entry_label(entry)}** ({entry[1]}){ready}")
     
     embed.add_field(
         name="⏭️ À venir",
@@ -1415,6 +2378,8 @@ async def stop(interaction: discord.Interaction):
     guild_id = str(interaction.guild_id)
     if guild_id in SONG_QUEUES:
         SONG_QUEUES[guild_id].clear()
+    cancel_playlist_imports(guild_id)
+    clear_prefetch(guild_id)
     
     # Arrêter la lecture
     if voice_client.is_playing() or voice_client.is_paused():
@@ -1432,6 +2397,8 @@ async def disconnect(interaction: discord.Interaction):
         return
     
     await interaction.guild.voice_client.disconnect()
+    cancel_playlist_imports(str(interaction.guild_id))
+    clear_prefetch(str(interaction.guild_id))
     
     embed = create_embed("📞 Déconnecté", "Bot déconnecté du vocal")
     await interaction.response.send_message(embed=embed)
@@ -1595,7 +2562,7 @@ async def warn_user(interaction: discord.Interaction, user: discord.Member, reas
         await interaction.response.send_message("❌ Impossible d'avertir le propriétaire du bot !", ephemeral=True)
         return
     
-    config = get_security_config(interaction.guild_id)
+    config = await get_security_config(interaction.guild_id)
     
     # Ajouter l'avertissement
     warn_data = {
@@ -1607,16 +2574,16 @@ async def warn_user(interaction: discord.Interaction, user: discord.Member, reas
     WARNINGS[user.id].append(warn_data)
     warn_count = len(WARNINGS[user.id])
     
-    # 💾 SAUVEGARDE AUTOMATIQUE DES WARNINGS
-    auto_save_data(warnings=WARNINGS)
+    # 📜 JOURNALISATION de l'avertissement (une seule ligne ajoutée)
+    await arecord_journal("warnings", user.id, "append", warn_data)
     
     embed = create_embed("⚠️ Utilisateur averti", f"**{user.display_name}** a reçu un avertissement", 0xffa726)
     embed.add_field(name="👮 Modérateur", value=interaction.user.mention, inline=True)
-    embed.add_field(name="📊 Avertissements", value=f"{warn_count}/{config['max_warns']}", inline=True)
+    embed.add_field(name="📊 Avertissements", value=f"{warn_count}/{config.max_warns}", inline=True)
     embed.add_field(name="📋 Raison", value=reason or "Aucune raison spécifiée", inline=False)
     
     # Vérifier si l'utilisateur a atteint le maximum d'avertissements
-    if warn_count >= config['max_warns']:
+    if warn_count >= config.max_warns:
         try:
             timeout_until = datetime.now() + timedelta(seconds=config['timeout_duration'])
             await user.timeout(timeout_until, reason=f"Maximum d'avertissements atteint ({warn_count})")
@@ -1624,8 +2591,8 @@ async def warn_user(interaction: discord.Interaction, user: discord.Member, reas
             
             # Reset les avertissements après punition
             WARNINGS[user.id] = []
-            # 💾 SAUVEGARDE AUTOMATIQUE après reset
-            auto_save_data(warnings=WARNINGS)
+            # 📜 JOURNALISATION du reset
+            await arecord_journal("warnings", user.id, "set", [])
             
         except Exception as e:
             embed.add_field(name="❌ Erreur", value=f"Impossible d'appliquer le timeout automatique: {str(e)}", inline=False)
@@ -1635,7 +2602,7 @@ async def warn_user(interaction: discord.Interaction, user: discord.Member, reas
     # Log l'action
     await log_action(interaction.guild, "warn", interaction.user, user, reason)
     
-    logger.info(f"⚠️ {interaction.user} a averti {user} ({warn_count}/{config['max_warns']}) - Raison: {reason}")
+    logger.info(f"⚠️ {interaction.user} a averti {user} ({warn_count}/{config.max_warns}) - Raison: {reason}")
 
 @bot.tree.command(name="clear", description="🧹 Supprimer des messages")
 @app_commands.describe(
@@ -1836,39 +2803,39 @@ async def config_security(
         
         # Mettre à jour chaque paramètre fourni
         if raid_protection is not None:
-            update_security_config(interaction.guild.id, "raid_protection", raid_protection)
+            await update_security_config(interaction.guild.id, "raid_protection", raid_protection)
             changes.append(f"**Protection anti-raid :** {'✅ Activée' if raid_protection else '❌ Désactivée'}")
         
         if auto_ban_bots is not None:
-            update_security_config(interaction.guild.id, "auto_ban_bots", auto_ban_bots)
+            await update_security_config(interaction.guild.id, "auto_ban_bots", auto_ban_bots)
             changes.append(f"**Auto-ban bots :** {'✅ Activé' if auto_ban_bots else '❌ Désactivé'}")
         
         if max_mentions is not None:
             max_mentions = max(1, min(max_mentions, 20))
-            update_security_config(interaction.guild.id, "max_mentions", max_mentions)
+            await update_security_config(interaction.guild.id, "max_mentions", max_mentions)
             changes.append(f"**Max mentions :** {max_mentions}")
         
         if max_messages_per_minute is not None:
             max_messages_per_minute = max(1, min(max_messages_per_minute, 60))
-            update_security_config(interaction.guild.id, "max_messages_per_minute", max_messages_per_minute)
+            await update_security_config(interaction.guild.id, "max_messages_per_minute", max_messages_per_minute)
             changes.append(f"**Max messages/min :** {max_messages_per_minute}")
         
         if anti_spam is not None:
-            update_security_config(interaction.guild.id, "anti_spam", anti_spam)
+            await update_security_config(interaction.guild.id, "anti_spam", anti_spam)
             changes.append(f"**Anti-spam :** {'✅ Activé' if anti_spam else '❌ Désactivé'}")
         
         if auto_delete_invites is not None:
-            update_security_config(interaction.guild.id, "auto_delete_invites", auto_delete_invites)
+            await update_security_config(interaction.guild.id, "auto_delete_invites", auto_delete_invites)
             changes.append(f"**Auto-delete invites :** {'✅ Activé' if auto_delete_invites else '❌ Désactivé'}")
         
         if max_account_age_days is not None:
             max_account_age_days = max(0, min(max_account_age_days, 365))
-            update_security_config(interaction.guild.id, "max_account_age_days", max_account_age_days)
+            await update_security_config(interaction.guild.id, "max_account_age_days", max_account_age_days)
             changes.append(f"**Âge minimum compte :** {max_account_age_days} jours")
         
         if not changes:
             # Afficher la configuration actuelle
-            current_config = get_security_config(interaction.guild.id)
+            current_config = await get_security_config(interaction.guild.id)
             embed = create_embed("🛡️ Configuration Sécurité", "Configuration actuelle sauvegardée :", 0xff6b6b)
             
             config_text = f"**Protection anti-raid :** {'✅' if current_config.get('raid_protection') else '❌'}\n"
@@ -1910,9 +2877,7 @@ async def show_config_complete(interaction: discord.Interaction):
         return
     
     try:
-        from config_manager import get_guild_config
-        
-        config = get_guild_config(interaction.guild.id)
+        config = await aget_guild_config(interaction.guild.id)
         
         embed = create_embed("📊 Configuration Complète Sauvegardée", f"Configuration persistante pour **{interaction.guild.name}**", 0x5865f2)
         
@@ -1968,33 +2933,33 @@ async def security_status(interaction: discord.Interaction):
         await interaction.response.send_message("❌ Vous devez être administrateur !", ephemeral=True)
         return
     
-    config = get_security_config(interaction.guild_id)
+    config = await get_security_config(interaction.guild_id)
     
     embed = create_embed("🛡️ État de la Sécurité", f"Configuration pour **{interaction.guild.name}**", 0x5865f2)
     
     # Protection anti-raid
-    raid_status = "✅ Activée" if config["anti_raid_enabled"] else "❌ Désactivée"
+    raid_status = "✅ Activée" if config.anti_raid_enabled else "❌ Désactivée"
     embed.add_field(name="🚨 Protection Anti-Raid", value=raid_status, inline=True)
     
-    spam_status = "✅ Activée" if config["anti_spam_enabled"] else "❌ Désactivée"
+    spam_status = "✅ Activée" if config.anti_spam_enabled else "❌ Désactivée"
     embed.add_field(name="💬 Protection Anti-Spam", value=spam_status, inline=True)
     
-    mode_raid = "🔴 MODE RAID ACTIF" if config.get("raid_mode", False) else "🟢 Normal"
+    mode_raid = "🔴 MODE RAID ACTIF" if is_raid_mode_active(interaction.guild_id, config) else "🟢 Normal"
     embed.add_field(name="🚨 Mode Actuel", value=mode_raid, inline=True)
     
     # Limites
-    embed.add_field(name="👥 Max joins/minute", value=str(config["max_joins_per_minute"]), inline=True)
-    embed.add_field(name="📝 Max messages/minute", value=str(config["max_messages_per_minute"]), inline=True)
-    embed.add_field(name="⚠️ Max avertissements", value=str(config["max_warns"]), inline=True)
+    embed.add_field(name="👥 Max joins/minute", value=str(config.max_joins_per_minute), inline=True)
+    embed.add_field(name="📝 Max messages/minute", value=str(config.max_messages_per_minute), inline=True)
+    embed.add_field(name="⚠️ Max avertissements", value=str(config.max_warns), inline=True)
     
     # Auto-actions
-    auto_ban = "✅ Activé" if config["auto_ban_suspicious"] else "❌ Désactivé"
+    auto_ban = "✅ Activé" if config.auto_ban_suspicious else "❌ Désactivé"
     embed.add_field(name="🔨 Auto-ban suspects", value=auto_ban, inline=True)
     
-    delete_spam = "✅ Activé" if config["delete_spam_messages"] else "❌ Désactivé"
+    delete_spam = "✅ Activé" if config.delete_spam_messages else "❌ Désactivé"
     embed.add_field(name="🗑️ Suppr. spam", value=delete_spam, inline=True)
     
-    embed.add_field(name="⚖️ Type punition", value=config["punishment_type"].title(), inline=True)
+    embed.add_field(name="⚖️ Type punition", value=config.punishment_type.title(), inline=True)
     
     # Statistiques
     total_warns = sum(len(warns) for warns in WARNINGS.values())
@@ -2003,7 +2968,7 @@ async def security_status(interaction: discord.Interaction):
     recent_joins = len(JOIN_TRACKER.get(interaction.guild_id, []))
     embed.add_field(name="👥 Joins récents", value=str(recent_joins), inline=True)
     
-    timeout_min = config["timeout_duration"] // 60
+    timeout_min = config.timeout_duration // 60
     embed.add_field(name="⏰ Timeout auto", value=f"{timeout_min} min", inline=True)
     
     await interaction.response.send_message(embed=embed)
@@ -2017,8 +2982,7 @@ async def set_log_channel(interaction: discord.Interaction, channel: discord.Tex
         await interaction.response.send_message("❌ Vous devez être administrateur !", ephemeral=True)
         return
     
-    config = get_security_config(interaction.guild_id)
-    config["log_channel_id"] = channel.id
+    await update_security_config(interaction.guild_id, "log_channel_id", channel.id)
     
     embed = create_embed("📝 Salon de logs configuré", f"Les logs seront envoyés dans {channel.mention}")
     await interaction.response.send_message(embed=embed)
@@ -2047,7 +3011,7 @@ async def setup_support(interaction: discord.Interaction, enable: bool = True):
             del SUPPORT_CHANNELS[guild_id]
             del SUPPORT_CONFIG[guild_id]
             # 💾 SAUVEGARDE AUTOMATIQUE après suppression
-            auto_save_data(support_channels=SUPPORT_CHANNELS, support_config=SUPPORT_CONFIG)
+            await aauto_save_data(support_channels=SUPPORT_CHANNELS, support_config=SUPPORT_CONFIG)
             embed = create_embed("⚙️ Support désactivé", "Système de support vocal désactivé")
             await interaction.followup.send(embed=embed)
             return
@@ -2113,7 +3077,7 @@ async def setup_support(interaction: discord.Interaction, enable: bool = True):
         SUPPORT_CHANNELS[guild_id] = {"waiting": waiting_channel.id, "active": []}
         
         # 💾 SAUVEGARDE AUTOMATIQUE des SUPPORT_CHANNELS et SUPPORT_CONFIG
-        auto_save_data(support_channels=SUPPORT_CHANNELS, support_config=SUPPORT_CONFIG)
+        await aauto_save_data(support_channels=SUPPORT_CHANNELS, support_config=SUPPORT_CONFIG)
         
         embed = create_embed("✅ Système de Support Configuré", "Support vocal automatique activé avec succès !")
         embed.add_field(name="⏳ Channel d'attente", value=f"{waiting_channel.mention}", inline=True)
@@ -2152,7 +3116,7 @@ async def setup_temp_vocal(interaction: discord.Interaction, enable: bool = True
             if guild_id in TEMP_VOCAL_CHANNELS:
                 del TEMP_VOCAL_CHANNELS[guild_id]
             # 💾 SAUVEGARDE AUTOMATIQUE après suppression
-            auto_save_data(temp_vocal_config=TEMP_VOCAL_CONFIG, temp_vocal_channels=TEMP_VOCAL_CHANNELS)
+            await aauto_save_data(temp_vocal_config=TEMP_VOCAL_CONFIG, temp_vocal_channels=TEMP_VOCAL_CHANNELS)
             embed = create_embed("🎤 Salons temporaires désactivés", "Système désactivé")
             await interaction.followup.send(embed=embed)
             return
@@ -2201,7 +3165,7 @@ async def setup_temp_vocal(interaction: discord.Interaction, enable: bool = True
             TEMP_VOCAL_CHANNELS[guild_id] = []
         
         # 💾 SAUVEGARDE AUTOMATIQUE des TEMP_VOCAL_CONFIG et TEMP_VOCAL_CHANNELS
-        auto_save_data(temp_vocal_config=TEMP_VOCAL_CONFIG, temp_vocal_channels=TEMP_VOCAL_CHANNELS)
+        await aauto_save_data(temp_vocal_config=TEMP_VOCAL_CONFIG, temp_vocal_channels=TEMP_VOCAL_CHANNELS)
         
         embed = create_embed("✅ Salons Vocaux Temporaires Configurés", "Système activé avec succès !")
         embed.add_field(name="➕ Channel de création", value=f"{create_channel.mention}", inline=True)
@@ -2228,8 +3192,8 @@ async def help_command(interaction: discord.Interaction):
     embed.add_field(
         name="🎶 Commandes Musicales",
         value=(
-            "`/play <chanson>` - YouTube avec 8 méthodes d'extraction\n"
-            "`/spotify <chanson/lien>` - Spotify → YouTube\n"
+            "`/play <chanson/playlist>` - YouTube avec 8 méthodes d'extraction\n"
+            "`/spotify <chanson/lien/album>` - Spotify → YouTube (albums et playlists)\n"
             "`/soundcloud <chanson/lien>` - SoundCloud direct\n"
             "`/radio` - Lancer une radio en continu\n"
             "`/queue` - Voir la liste d'attente\n"
@@ -2323,6 +3287,8 @@ async def stats(interaction: discord.Interaction):
     embed.add_field(name="🎥 YouTube", value=str(EXTRACTION_STATS["youtube"]), inline=True)
     embed.add_field(name="🔊 SoundCloud", value=str(EXTRACTION_STATS["soundcloud"]), inline=True)
     embed.add_field(name="🎧 Spotify", value=str(EXTRACTION_STATS["spotify"]), inline=True)
+    embed.add_field(name="⚡ Cache d'extraction", value=f"{EXTRACTION_STATS.get('cache_hits', 0)} hits • {extraction_cache.cache_size()} entrées • {EXTRACTION_STATS.get('coalesced', 0)} fusionnées • {EXTRACTION_STATS.get('negative_hits', 0) + EXTRACTION_STATS.get('short_circuited', 0)} ignorées", inline=True)
+    embed.add_field(name="🏁 Meilleures méthodes YouTube", value=format_method_ranking("youtube", limit=3), inline=False)
     
     # Stats modération
     total_warns = sum(len(warns) for warns in WARNINGS.values())
@@ -2330,7 +3296,7 @@ async def stats(interaction: discord.Interaction):
     
     embed.add_field(name="⚠️ Avertissements total", value=str(total_warns), inline=True)
     embed.add_field(name="🛡️ Serveurs protégés", value=str(guilds_with_security), inline=True)
-    embed.add_field(name="🚨 Modes raid actifs", value=str(len([c for c in SECURITY_CONFIG.values() if c.get("raid_mode", False)])), inline=True)
+    embed.add_field(name="🚨 Modes raid actifs", value=str(len(active_raid_modes())), inline=True)
     
     # Stats salons
     total_temp_channels = sum(len(channels) for channels in TEMP_VOCAL_CHANNELS.values())
@@ -2395,6 +3361,53 @@ async def debug_command(interaction: discord.Interaction):
     embed.add_field(name="👤 Développeur", value="Mada", inline=True)
     
     embed.add_field(name="📊 Stats extraction", value=f"Succès: {EXTRACTION_STATS['success']}\nÉchecs: {EXTRACTION_STATS['failed']}", inline=True)
+    for source_type in ("youtube", "soundcloud"):
+        embed.add_field(name=f"🏁 Méthodes {source_type}", value=format_method_ranking(source_type), inline=False)
+    
+    embed.add_field(name="🚦 Ordonnanceur d'extraction", value=format_scheduler_status(), inline=False)
+    embed.add_field(name="🔌 Coupe-circuits", value=format_circuit_status(), inline=False)
+    
+    pool = ytdlp_pool.pool_status()
+    pool_info = (
+        f"{pool['workers']}/{pool['size']} workers • {pool['queued']} en file\n"
+        f"{pool['discarded']} résultats jetés • {pool['killed']} tués (délai)"
+        if pool["available"] else "CLI (sous-processus)"
+    )
+    embed.add_field(name="🧰 Extraction yt-dlp", value=pool_info, inline=True)
+    
+    cache = audio_cache.cache_status()
+    cache_info = (
+        f"{cache['entries']} titres • {cache['bytes'] // (1024 * 1024)}/{cache['max_bytes'] // (1024 * 1024)} Mo\n"
+        f"{cache['hits']} lectures locales • {cache['downloads']} en cours"
+    ) if cache["enabled"] else "Désactivé"
+    embed.add_field(name="💽 Cache audio", value=cache_info, inline=True)
+    ffmpeg = ffmpeg_supervisor.supervisor_status()
+    ffmpeg_info = (
+        f"{ffmpeg['running']}/{ffmpeg['max']} processus ({ffmpeg['downloads']} téléchargements) • {ffmpeg['guilds']} serveurs • {ffmpeg['waiting']} en attente\n"
+        f"Orphelins/terminés récupérés: {ffmpeg['reaped']}"
+    )
+    if ffmpeg["metrics"]:
+        ffmpeg_info += f"\nCPU: {ffmpeg['cpu_percent']:.0f}% • RSS: {ffmpeg['rss'] // (1024 * 1024)} Mo ({ffmpeg['metrics']})"
+    embed.add_field(name="🎛️ FFmpeg", value=ffmpeg_info, inline=False)
+    stations = radio_hub.hub_status()
+    stations_info = "\n".join(
+        f"{station['name']}: {station['listeners']} serveur(s)" for station in stations
+    ) or "Aucune station ouverte"
+    embed.add_field(name="📡 Radios partagées", value=stations_info, inline=False)
+    health_lines = []
+    for station in radio_health.health_status(RADIO_STATIONS):
+        if station["dead"]:
+            health_lines.append(f"💀 {station['name']}")
+        elif station["ttfb"] is not None:
+            health_lines.append(f"🟢 {station['name']}: {station['ttfb'] * 1000:.0f} ms")
+        else:
+            health_lines.append(f"⚪ {station['name']}: non sondée")
+    embed.add_field(name="📶 Santé des radios", value="\n".join(health_lines), inline=False)
+    embed.add_field(
+        name="🔊 Lecture",
+        value=f"Copie Opus: {PLAYBACK_STATS['copy']} • Encodage FFmpeg: {PLAYBACK_STATS['opus']} • PCM: {PLAYBACK_STATS['pcm']}",
+        inline=True
+    )
     embed.add_field(name="🛡️ Sécurité active", value=str(len(SECURITY_CONFIG)), inline=True)
     embed.add_field(name="🎵 Queues actives", value=str(len(SONG_QUEUES)), inline=True)
     
@@ -2446,6 +3459,27 @@ async def force_sync(interaction: discord.Interaction):
         await interaction.followup.send(embed=embed, ephemeral=True)
         logger.error(f"❌ Erreur sync forcée: {e}")
 
+@bot.tree.command(name="save", description="💾 [OWNER] Forcer l'écriture des sauvegardes en attente")
+async def force_save(interaction: discord.Interaction):
+    """Écrire immédiatement les données en attente dans bot_configs.json"""
+    
+    if interaction.user.id != OWNER_ID:
+        await interaction.response.send_message("❌ Réservé au propriétaire du bot !", ephemeral=True)
+        return
+    
+    await interaction.response.defer(ephemeral=True)
+    
+    # L'écriture se fait hors de l'event loop
+    success = await aflush_pending_saves()
+    
+    if success:
+        embed = create_embed("💾 Sauvegarde forcée", "Toutes les données en attente ont été écrites", 0x66bb6a)
+    else:
+        embed = create_embed("❌ Erreur sauvegarde", "Impossible d'écrire les données en attente", 0xff0000)
+    
+    await interaction.followup.send(embed=embed, ephemeral=True)
+    logger.info(f"💾 {interaction.user} a forcé la sauvegarde: {'OK' if success else 'ÉCHEC'}")
+
 # ============================
 # LANCEMENT
 # ============================
@@ -2469,3 +3503,13 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"❌ Erreur critique: {e}")
         print("💡 Vérifiez que DISCORD_TOKEN est correct dans le fichier .env")
+    finally:
+        # 💾 Écrire les sauvegardes en attente avant de quitter
+        if METHOD_STATS_DIRTY:
+            auto_save_data(method_stats=snapshot_method_stats())
+        stop_background_writer()
+        ytdlp_pool.shutdown_pool()
+        audio_cache.cancel_downloads()
+        radio_health.stop_prober()
+        radio_hub.close_all()
+        ffmpeg_supervisor.shutdown()
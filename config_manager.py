@@ -2,28 +2,168 @@
 Gestionnaire de configuration persistante pour le bot Discord
 Sauvegarde automatique des configurations dans bot_configs.json
 """
+import copy
 import json
 import os
+import zlib
+import struct
+import atexit
+import asyncio
+import functools
+import time
+import shutil
 import logging
+import tempfile
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Callable
 from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import sqlite_storage
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # Configuration du logging
 logger = logging.getLogger(__name__)
 
 # Fichier de configuration persistante
 CONFIG_FILE = "bot_configs.json"
 
+# Nombre d'anciennes versions valides conservées (bot_configs.json.1, .2, ...)
+CONFIG_BACKUP_GENERATIONS = 3
+
+# Backend de stockage : "json" (défaut) ou "sqlite"
+STORAGE_BACKEND = "json"
+
+# Format du snapshot global_data : "json" (dans bot_configs.json, lisible) ou "binary"
+SNAPSHOT_FORMAT = "json"
+BINARY_SNAPSHOT_FILE = "bot_global_data.bin"
+
+# Journal append-only (JSON-lines) des mutations de WARNINGS / JOIN_TRACKER / MESSAGE_TRACKER
+JOURNAL_FILE = "bot_journal.jsonl"
+
+# Nombre d'entrées du journal avant compaction dans le snapshot
+JOURNAL_COMPACT_THRESHOLD = 1000
+
+# Sections persistées par le journal plutôt que par réécriture complète
+JOURNALED_SECTIONS = ("warnings", "join_tracker", "message_tracker")
+
+# Trackers anti-raid / anti-spam (fenêtre d'une minute) : leur persistance peut être coupée
+TRACKER_SECTIONS = ("join_tracker", "message_tracker")
+PERSIST_TRACKERS = True
+
+# ============================
+# CACHE MÉMOIRE DE LA CONFIGURATION
+# ============================
+
+# Intervalle minimal (secondes) entre deux vérifications du mtime du fichier
+CONFIG_MTIME_CHECK_INTERVAL = 1.0
+
+# Configuration parsée partagée par tout le processus (write-through)
+_CONFIG_CACHE: Optional[Dict[str, Any]] = None
+_CONFIG_MTIME: Optional[int] = None
+_LAST_MTIME_CHECK = 0.0
+_CONFIG_LOCK = threading.RLock()
+
 def ensure_config_file():
     """S'assurer que le fichier de configuration existe"""
     if not os.path.exists(CONFIG_FILE):
+        recovered = _recover_from_generations()
+        if recovered is not None:
+            _write_config(recovered)
+            return
         logger.info(f"📄 Création du fichier de configuration : {CONFIG_FILE}")
-        save_config({})
+        _write_config({})
 
-def load_config() -> Dict[str, Any]:
-    """Charger la configuration depuis le fichier JSON"""
+# ============================
+# ÉCRITURE ATOMIQUE ET GÉNÉRATIONS
+# ============================
+
+def _generation_path(index: int) -> str:
+    """Chemin de la génération n°index (1 = la plus récente)"""
+    return f"{CONFIG_FILE}.{index}"
+
+def _fsync_directory(path: str) -> None:
+    """Synchroniser le dossier pour rendre le rename durable (POSIX uniquement)"""
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+def _rotate_generations() -> None:
+    """Décaler les générations et copier le fichier actuel en génération 1"""
+    if CONFIG_BACKUP_GENERATIONS <= 0 or not os.path.exists(CONFIG_FILE):
+        return
+
+    for index in range(CONFIG_BACKUP_GENERATIONS - 1, 0, -1):
+        if os.path.exists(_generation_path(index)):
+            os.replace(_generation_path(index), _generation_path(index + 1))
+
+    # Le fichier principal reste en place : un crash ici ne le fait pas disparaître
+    try:
+        os.link(CONFIG_FILE, _generation_path(1))
+    except OSError:
+        shutil.copyfile(CONFIG_FILE, _generation_path(1))
+
+def _atomic_write_json(path: str, data: Any, **dump_kwargs) -> None:
+    """Écrire un JSON via fichier temporaire + fsync + rename (jamais de fichier à moitié écrit)"""
+    _atomic_write_bytes(path, json.dumps(data, **dump_kwargs).encode('utf-8'))
+
+def _atomic_write_bytes(path: str, payload: bytes) -> None:
+    """Écrire un fichier via fichier temporaire + fsync + rename"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        if path == CONFIG_FILE:
+            _rotate_generations()
+        os.replace(tmp_path, path)
+        _fsync_directory(path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+def _recover_from_generations() -> Optional[Dict[str, Any]]:
+    """Charger la génération valide la plus récente (None si aucune)"""
+    for index in range(1, CONFIG_BACKUP_GENERATIONS + 1):
+        path = _generation_path(index)
+        if not os.path.exists(path):
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            logger.warning(f"♻️ Configuration récupérée depuis {path}")
+            return config
+        except Exception as e:
+            logger.error(f"❌ Génération {path} illisible: {e}")
+    return None
+
+def _get_config_mtime() -> Optional[int]:
+    """Récupérer le mtime du fichier de configuration (None s'il n'existe pas)"""
+    try:
+        return os.stat(CONFIG_FILE).st_mtime_ns
+    except OSError:
+        return None
+
+def _read_config_file() -> Dict[str, Any]:
+    """Lire et parser le fichier JSON sans passer par le cache"""
     try:
         ensure_config_file()
         with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
@@ -32,54 +172,395 @@ def load_config() -> Dict[str, Any]:
             return config
     except json.JSONDecodeError as e:
         logger.error(f"❌ Erreur JSON dans {CONFIG_FILE}: {e}")
-        logger.info("🔄 Création d'une nouvelle configuration vide")
-        save_config({})
-        return {}
+        # Garder le fichier corrompu de côté sans écraser les générations valides
+        try:
+            os.replace(CONFIG_FILE, f"{CONFIG_FILE}.corrupt")
+        except OSError:
+            pass
+        recovered = _recover_from_generations()
+        if recovered is None:
+            logger.info("🔄 Création d'une nouvelle configuration vide")
+            recovered = {}
+        _write_config(recovered)
+        return recovered
     except Exception as e:
         logger.error(f"❌ Erreur lors du chargement de {CONFIG_FILE}: {e}")
         return {}
 
+def load_config() -> Dict[str, Any]:
+    """
+    Charger la configuration (depuis le cache mémoire si possible)
+
+    Retourne une copie : la modifier ne change rien tant qu'elle n'est pas
+    passée à save_config().
+    """
+    with _CONFIG_LOCK:
+        return copy.deepcopy(_load_cached_config())
+
+def _load_cached_config() -> Dict[str, Any]:
+    """
+    Configuration partagée du cache, en lecture seule pour l'appelant
+
+    Le fichier n'est re-parsé que si le cache est vide/invalidé ou si son
+    mtime a changé (modification faite en dehors du bot). La vérification
+    du mtime est limitée à une fois par CONFIG_MTIME_CHECK_INTERVAL.
+    Les écritures remplacent le cache par un nouveau dictionnaire (copie
+    modifiée) une fois le fichier écrit, jamais avant.
+    """
+    global _CONFIG_CACHE, _CONFIG_MTIME, _LAST_MTIME_CHECK
+
+    with _CONFIG_LOCK:
+        now = time.monotonic()
+        if _CONFIG_CACHE is not None and now - _LAST_MTIME_CHECK < CONFIG_MTIME_CHECK_INTERVAL:
+            return _CONFIG_CACHE
+
+        _LAST_MTIME_CHECK = now
+        mtime = _get_config_mtime()
+        if _CONFIG_CACHE is not None and mtime is not None and mtime == _CONFIG_MTIME:
+            return _CONFIG_CACHE
+
+        if _CONFIG_CACHE is not None:
+            logger.info(f"🔄 {CONFIG_FILE} modifié hors du bot, rechargement du cache")
+
+        config = _read_config_file()
+        _SETTINGS_CACHE.clear()
+        if _migrate_config(config):
+            _write_config(config)
+        # _write_config() a pu mettre le cache à jour pendant la lecture (fichier corrompu)
+        _CONFIG_CACHE = config
+        _CONFIG_MTIME = _get_config_mtime()
+        return _CONFIG_CACHE
+
+def invalidate_config_cache() -> None:
+    """Invalider le cache : le prochain load_config() relira le fichier"""
+    global _CONFIG_CACHE, _CONFIG_MTIME, _LAST_MTIME_CHECK
+
+    with _CONFIG_LOCK:
+        _CONFIG_CACHE = None
+        _CONFIG_MTIME = None
+        _LAST_MTIME_CHECK = 0.0
+        _SETTINGS_CACHE.clear()
+        _clear_binary_snapshot_cache()
+        sqlite_storage.clear_cache()
+        logger.debug("🧹 Cache de configuration invalidé")
+
+def reload_config() -> Dict[str, Any]:
+    """Forcer le rechargement de la configuration depuis le disque"""
+    invalidate_config_cache()
+    return load_config()
+
 def save_config(config: Dict[str, Any]) -> bool:
-    """Sauvegarder la configuration dans le fichier JSON"""
-    try:
-        # Sauvegarder avec indentation pour lisibilité
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False, default=str)
-        logger.debug(f"💾 Configuration sauvegardée dans {CONFIG_FILE}")
-        return True
-    except Exception as e:
-        logger.error(f"❌ Erreur lors de la sauvegarde dans {CONFIG_FILE}: {e}")
+    """Sauvegarder la configuration dans le fichier JSON (le cache en garde une copie)"""
+    return _write_config(copy.deepcopy(config))
+
+def _write_config(config: Dict[str, Any]) -> bool:
+    """Écrire la configuration puis en faire le cache (le dictionnaire ne doit plus être modifié)"""
+    global _CONFIG_CACHE, _CONFIG_MTIME, _LAST_MTIME_CHECK
+
+    with _CONFIG_LOCK:
+        try:
+            # Sauvegarder avec indentation pour lisibilité, de façon atomique
+            _atomic_write_json(CONFIG_FILE, config, indent=2, ensure_ascii=False, default=str)
+            _CONFIG_CACHE = config
+            _CONFIG_MTIME = _get_config_mtime()
+            _LAST_MTIME_CHECK = time.monotonic()
+            logger.debug(f"💾 Configuration sauvegardée dans {CONFIG_FILE}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la sauvegarde dans {CONFIG_FILE}: {e}")
+            return False
+
+def set_storage_backend(backend: str, migrate: bool = True) -> bool:
+    """
+    Choisir le backend de stockage ("json" ou "sqlite")
+
+    Avec SQLite, un bot_configs.json existant est migré une seule fois
+    dans la base si celle-ci est vide (sauf si migrate=False).
+    """
+    global STORAGE_BACKEND
+
+    backend = (backend or "json").lower()
+    if backend not in ("json", "sqlite"):
+        logger.error(f"❌ Backend de stockage inconnu: {backend}")
         return False
 
+    with _CONFIG_LOCK:
+        if backend == "sqlite":
+            if not sqlite_storage.init_database():
+                return False
+            if migrate:
+                sqlite_storage.migrate_from_json(CONFIG_FILE)
+        STORAGE_BACKEND = backend
+        _SETTINGS_CACHE.clear()
+
+    logger.info(f"🗄️ Backend de stockage: {backend}")
+    return True
+
+# ============================
+# SCHÉMA VERSIONNÉ DES CONFIGURATIONS
+# ============================
+
+# Version du schéma des configurations de serveur (clé "schema_version")
+CONFIG_SCHEMA_VERSION = 2
+
+def _copy_default(value: Any) -> Any:
+    """Copie d'une valeur par défaut (seules les listes sont mutables)"""
+    return list(value) if isinstance(value, list) else value
+
+def _coerce_setting(value: Any, default: Any) -> Any:
+    """Ramener une valeur stockée au type de sa valeur par défaut (défaut si impossible)"""
+    if default is None:
+        return value
+    if value is None:
+        return _copy_default(default)
+    if isinstance(default, bool):
+        if isinstance(value, bool):
+            return value
+        return str(value).lower() in ("1", "true", "yes", "on")
+    if isinstance(default, int):
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+    if isinstance(default, list):
+        return list(value) if isinstance(value, (list, tuple)) else list(default)
+    if isinstance(default, str):
+        return value if isinstance(value, str) else str(value)
+    return value
+
+class _SettingsRecord:
+    """Section de configuration typée : champs fixes, lecture par attribut, sans copie de dict"""
+
+    __slots__ = ()
+    SECTION = ""
+    DEFAULTS: Dict[str, Any] = {}
+
+    def __init__(self, data: Optional[Dict[str, Any]] = None):
+        data = data or {}
+        for name, default in self.DEFAULTS.items():
+            object.__setattr__(self, name,
+                               _coerce_setting(data[name], default) if name in data else _copy_default(default))
+
+    @classmethod
+    def default_dict(cls) -> Dict[str, Any]:
+        """Valeurs par défaut de la section (nouvelle copie)"""
+        return {name: _copy_default(default) for name, default in cls.DEFAULTS.items()}
+
+    def update_from(self, data: Dict[str, Any]) -> None:
+        """Appliquer des valeurs modifiées (les autres champs, y compris l'état d'exécution, sont conservés)"""
+        for name, value in data.items():
+            if name in self.DEFAULTS:
+                object.__setattr__(self, name, _coerce_setting(value, self.DEFAULTS[name]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.DEFAULTS}
+
+    # Compatibilité avec l'ancien accès par clé (config["enabled"], config.get(...))
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.DEFAULTS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    # Enregistrement partagé par tout le processus : seul update_guild_config() le modifie
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} est en lecture seule (utiliser update_guild_config)")
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self.__setattr__(key, value)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.DEFAULTS
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.DEFAULTS else default
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()})"
+
+class SecuritySettings(_SettingsRecord):
+    """Paramètres de sécurité - DÉSACTIVÉS par défaut (l'état d'exécution, comme le mode raid déclenché, vit dans bot.py)"""
+
+    SECTION = "security_settings"
+    DEFAULTS = {
+        "enabled": False,
+        "max_joins_per_minute": 5,
+        "max_messages_per_minute": 35,
+        "auto_ban_suspicious": False,
+        "log_channel_id": None,
+        "whitelist": [],
+        "blacklist": [],
+        "raid_mode": False,
+        "max_warns": 3,
+        "timeout_duration": 300,  # 5 minutes
+        "delete_spam_messages": False,
+        "anti_spam_enabled": False,
+        "anti_raid_enabled": False,
+        "new_account_threshold": 7,  # jours
+        "punishment_type": "timeout",  # timeout, kick, ban
+        # Options de /config_security
+        "raid_protection": False,
+        "auto_ban_bots": False,
+        "max_mentions": 5,
+        "anti_spam": False,
+        "auto_delete_invites": False,
+        "max_account_age_days": 7
+    }
+    __slots__ = tuple(DEFAULTS)
+
+class VoiceTempSettings(_SettingsRecord):
+    """Paramètres des salons vocaux temporaires"""
+
+    SECTION = "voice_temp_settings"
+    DEFAULTS = {
+        "category_id": None,
+        "temp_channel_name": "🔊 Salon temporaire de {user}",
+        "user_limit": 0,
+        "auto_delete": True
+    }
+    __slots__ = tuple(DEFAULTS)
+
+class BotSettings(_SettingsRecord):
+    """Paramètres généraux du bot"""
+
+    SECTION = "bot_settings"
+    DEFAULTS = {
+        "prefix": "/",
+        "log_actions": True,
+        "welcome_message": True,
+        "welcome_channel_id": None
+    }
+    __slots__ = tuple(DEFAULTS)
+
+SETTINGS_RECORDS = (SecuritySettings, VoiceTempSettings, BotSettings)
+
+def _migrate_v1_to_v2(guild_config: Dict[str, Any]) -> None:
+    """v1 → v2 : sections garanties en dictionnaires (une section vide recevra toutes les valeurs par défaut)"""
+    for record_cls in SETTINGS_RECORDS:
+        if not isinstance(guild_config.get(record_cls.SECTION), dict):
+            guild_config[record_cls.SECTION] = {}
+
+# Migration appliquée pour passer de la version N à N + 1
+SCHEMA_MIGRATIONS = {
+    1: _migrate_v1_to_v2,
+}
+
+def migrate_guild_config(guild_config: Dict[str, Any]) -> bool:
+    """
+    Mettre une configuration de serveur au schéma courant (sur place)
+
+    Applique les migrations manquantes puis complète/type les champs de chaque
+    section à partir des valeurs par défaut. Retourne True si elle a changé.
+    """
+    version = guild_config.get("schema_version", 1)
+    changed = version != CONFIG_SCHEMA_VERSION
+    while version < CONFIG_SCHEMA_VERSION:
+        SCHEMA_MIGRATIONS[version](guild_config)
+        version += 1
+    guild_config["schema_version"] = max(version, CONFIG_SCHEMA_VERSION)
+
+    for record_cls in SETTINGS_RECORDS:
+        section = guild_config.setdefault(record_cls.SECTION, {})
+        for name, default in record_cls.DEFAULTS.items():
+            if name not in section:
+                section[name] = _copy_default(default)
+                changed = True
+                continue
+            value = _coerce_setting(section[name], default)
+            if value != section[name] or type(value) is not type(section[name]):
+                section[name] = value
+                changed = True
+    return changed
+
+def _migrate_config(config: Dict[str, Any]) -> bool:
+    """Migrer toutes les configurations de serveur du fichier JSON"""
+    changed = False
+    for guild_str, guild_config in config.items():
+        if guild_str != "global_data" and isinstance(guild_config, dict):
+            changed = migrate_guild_config(guild_config) or changed
+    if changed:
+        logger.info(f"🧬 Configurations migrées vers le schéma v{CONFIG_SCHEMA_VERSION}")
+    return changed
+
+# Sections typées déjà construites, par (guild_id, section)
+_SETTINGS_CACHE: Dict[Any, _SettingsRecord] = {}
+
+def _get_settings_record(guild_id: int, record_cls: type) -> _SettingsRecord:
+    """Section typée d'un serveur, construite une seule fois puis lue par attribut"""
+    if STORAGE_BACKEND == "json":
+        # Vérification du mtime (limitée) : un rechargement vide _SETTINGS_CACHE
+        _load_cached_config()
+    key = (int(guild_id), record_cls.SECTION)
+    record = _SETTINGS_CACHE.get(key)
+    if record is None:
+        with _CONFIG_LOCK:
+            record = _SETTINGS_CACHE.get(key)
+            if record is None:
+                record = record_cls(_get_shared_guild_config(guild_id).get(record_cls.SECTION))
+                _SETTINGS_CACHE[key] = record
+    return record
+
+def _refresh_settings_record(guild_id: int, section: str, data: Dict[str, Any]) -> None:
+    """Répercuter une mise à jour sur la section typée en cache (même objet)"""
+    for record_cls in SETTINGS_RECORDS:
+        if record_cls.SECTION == section:
+            record = _SETTINGS_CACHE.get((int(guild_id), section))
+            if record is not None:
+                record.update_from(data)
+            return
+
+def _forget_settings_records(guild_id: int = None) -> None:
+    """Oublier les sections typées (d'un serveur, ou toutes)"""
+    if guild_id is None:
+        _SETTINGS_CACHE.clear()
+        return
+    for record_cls in SETTINGS_RECORDS:
+        _SETTINGS_CACHE.pop((int(guild_id), record_cls.SECTION), None)
+
 def get_guild_config(guild_id: int) -> Dict[str, Any]:
-    """Récupérer la configuration complète d'un serveur"""
-    config = load_config()
+    """Récupérer la configuration complète d'un serveur (copie, à modifier via update_guild_config)"""
+    return copy.deepcopy(_get_shared_guild_config(guild_id))
+
+def _get_shared_guild_config(guild_id: int) -> Dict[str, Any]:
+    """Configuration d'un serveur telle qu'en cache (lecture seule), créée si besoin"""
+    if STORAGE_BACKEND == "sqlite":
+        guild_config = sqlite_storage.get_cached_guild_config(guild_id)
+        if guild_config is None:
+            with _CONFIG_LOCK:
+                guild_config = sqlite_storage.load_guild_config(guild_id)
+                if guild_config is None:
+                    logger.info(f"🆕 Nouvelle configuration pour le serveur {guild_id}")
+                    guild_config = create_default_guild_config()
+                    sqlite_storage.save_guild_config(guild_id, guild_config)
+                else:
+                    migrated = copy.deepcopy(guild_config)
+                    if migrate_guild_config(migrated) and sqlite_storage.save_guild_config(guild_id, migrated):
+                        # Ligne lue pour la première fois : migrée une seule fois
+                        guild_config = migrated
+        return guild_config
+    
+    config = _load_cached_config()
     guild_str = str(guild_id)
     
-    if guild_str not in config:
-        logger.info(f"🆕 Nouvelle configuration pour le serveur {guild_id}")
-        config[guild_str] = create_default_guild_config()
-        save_config(config)
+    if guild_str in config:
+        return config[guild_str]
+    
+    with _CONFIG_LOCK:
+        config = _load_cached_config()
+        if guild_str not in config:
+            logger.info(f"🆕 Nouvelle configuration pour le serveur {guild_id}")
+            config = {**config, guild_str: create_default_guild_config()}
+            if not _write_config(config):
+                return config[guild_str]
     
     return config[guild_str]
 
 def create_default_guild_config() -> Dict[str, Any]:
-    """Créer une configuration par défaut pour un serveur"""
-    return {
-        "security_settings": {},
-        "voice_temp_settings": {
-            "category_id": None,
-            "temp_channel_name": "🔊 Salon temporaire de {user}",
-            "user_limit": 0,
-            "auto_delete": True
-        },
-        "bot_settings": {
-            "prefix": "/",
-            "log_actions": True,
-            "welcome_message": True,
-            "welcome_channel_id": None
-        }
-    }
+    """Créer une configuration par défaut pour un serveur (schéma courant, valeurs précalculées)"""
+    guild_config = {record_cls.SECTION: record_cls.default_dict() for record_cls in SETTINGS_RECORDS}
+    guild_config["schema_version"] = CONFIG_SCHEMA_VERSION
+    return guild_config
 
 def update_guild_config(guild_id: int, section: str, key_or_data: Any, value: Any = None) -> bool:
     """
@@ -91,93 +572,100 @@ def update_guild_config(guild_id: int, section: str, key_or_data: Any, value: An
         key_or_data: Soit une clé spécifique, soit un dictionnaire complet
         value: Valeur (si key_or_data est une clé)
     """
-    try:
-        config = load_config()
-        guild_str = str(guild_id)
-        
-        # S'assurer que le serveur existe dans la config
-        if guild_str not in config:
-            config[guild_str] = create_default_guild_config()
-        
-        # S'assurer que la section existe
-        if section not in config[guild_str]:
-            config[guild_str][section] = {}
-        
-        # Mise à jour selon le type de paramètres
-        if value is not None:
-            # Mise à jour d'une clé spécifique
-            config[guild_str][section][key_or_data] = value
-            logger.info(f"🔧 Config mise à jour - Guild: {guild_id}, Section: {section}, {key_or_data}: {value}")
-        else:
-            # Mise à jour complète de la section ou ajout de données
-            if isinstance(key_or_data, dict):
-                config[guild_str][section].update(key_or_data)
-                logger.info(f"🔧 Config mise à jour - Guild: {guild_id}, Section: {section}, Données: {key_or_data}")
+    with _CONFIG_LOCK:
+        try:
+            guild_str = str(guild_id)
+            
+            # Travailler sur une copie : le cache n'est remplacé qu'une fois l'écriture réussie
+            if STORAGE_BACKEND == "sqlite":
+                guild_config = copy.deepcopy(sqlite_storage.load_guild_config(guild_id)) or create_default_guild_config()
+                migrate_guild_config(guild_config)
+            else:
+                config = dict(_load_cached_config())
+                guild_config = copy.deepcopy(config.get(guild_str)) or create_default_guild_config()
+                config[guild_str] = guild_config
+            
+            # S'assurer que la section existe
+            if section not in guild_config:
+                guild_config[section] = {}
+            
+            # Mise à jour selon le type de paramètres
+            if value is not None:
+                # Mise à jour d'une clé spécifique
+                guild_config[section][key_or_data] = value
+                logger.info(f"🔧 Config mise à jour - Guild: {guild_id}, Section: {section}, {key_or_data}: {value}")
             else:
-                logger.error(f"❌ Type de données incorrect pour la mise à jour: {type(key_or_data)}")
+                # Mise à jour complète de la section ou ajout de données
+                if isinstance(key_or_data, dict):
+                    guild_config[section].update(key_or_data)
+                    logger.info(f"🔧 Config mise à jour - Guild: {guild_id}, Section: {section}, Données: {key_or_data}")
+                else:
+                    logger.error(f"❌ Type de données incorrect pour la mise à jour: {type(key_or_data)}")
+                    return False
+            
+            # Sauvegarder (une seule ligne avec SQLite)
+            if STORAGE_BACKEND == "sqlite":
+                saved = sqlite_storage.save_guild_config(guild_id, guild_config)
+            else:
+                saved = _write_config(config)
+            
+            if saved:
+                _refresh_settings_record(guild_id, section, {key_or_data: value} if value is not None else key_or_data)
+                logger.info(f"✅ Configuration sauvegardée avec succès pour le serveur {guild_id}")
+                return True
+            else:
+                logger.error(f"❌ Échec de la sauvegarde pour le serveur {guild_id}")
                 return False
-        
-        # Sauvegarder
-        if save_config(config):
-            logger.info(f"✅ Configuration sauvegardée avec succès pour le serveur {guild_id}")
-            return True
-        else:
-            logger.error(f"❌ Échec de la sauvegarde pour le serveur {guild_id}")
-            return False
             
-    except Exception as e:
-        logger.error(f"❌ Erreur lors de la mise à jour de la config: {e}")
-        return False
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la mise à jour de la config: {e}")
+            return False
 
-def get_voice_temp_settings(guild_id: int) -> Dict[str, Any]:
+def get_voice_temp_settings(guild_id: int) -> VoiceTempSettings:
     """Récupérer les paramètres des salons vocaux temporaires"""
-    guild_config = get_guild_config(guild_id)
-    return guild_config.get("voice_temp_settings", {
-        "category_id": None,
-        "temp_channel_name": "🔊 Salon temporaire de {user}",
-        "user_limit": 0,
-        "auto_delete": True
-    })
+    return _get_settings_record(guild_id, VoiceTempSettings)
 
-def get_bot_settings(guild_id: int) -> Dict[str, Any]:
+def get_bot_settings(guild_id: int) -> BotSettings:
     """Récupérer les paramètres généraux du bot"""
-    guild_config = get_guild_config(guild_id)
-    return guild_config.get("bot_settings", {
-        "prefix": "/",
-        "log_actions": True,
-        "welcome_message": True,
-        "welcome_channel_id": None
-    })
+    return _get_settings_record(guild_id, BotSettings)
 
-def get_security_settings(guild_id: int) -> Dict[str, Any]:
-    """Récupérer les paramètres de sécurité"""
-    guild_config = get_guild_config(guild_id)
-    return guild_config.get("security_settings", {})
+def get_security_settings(guild_id: int) -> SecuritySettings:
+    """Récupérer les paramètres de sécurité (tous les champs présents, lecture par attribut)"""
+    return _get_settings_record(guild_id, SecuritySettings)
 
 def delete_guild_config(guild_id: int) -> bool:
     """Supprimer la configuration d'un serveur"""
-    try:
-        config = load_config()
-        guild_str = str(guild_id)
-        
-        if guild_str in config:
-            del config[guild_str]
-            save_config(config)
-            logger.info(f"🗑️ Configuration supprimée pour le serveur {guild_id}")
-            return True
-        else:
-            logger.warning(f"⚠️ Aucune configuration trouvée pour le serveur {guild_id}")
-            return False
+    with _CONFIG_LOCK:
+        try:
+            if STORAGE_BACKEND == "sqlite":
+                deleted = sqlite_storage.delete_guild_config(guild_id)
+            else:
+                config = dict(_load_cached_config())
+                guild_str = str(guild_id)
+                deleted = guild_str in config
+                if deleted:
+                    del config[guild_str]
+                    deleted = _write_config(config)
             
-    except Exception as e:
-        logger.error(f"❌ Erreur lors de la suppression de la config: {e}")
-        return False
+            if deleted:
+                _forget_settings_records(guild_id)
+                logger.info(f"🗑️ Configuration supprimée pour le serveur {guild_id}")
+                return True
+            else:
+                logger.warning(f"⚠️ Aucune configuration trouvée pour le serveur {guild_id}")
+                return False
+            
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la suppression de la config: {e}")
+            return False
 
 def get_all_guilds() -> list:
     """Récupérer la liste de tous les serveurs ayant une configuration"""
     try:
-        config = load_config()
-        return [int(guild_id) for guild_id in config.keys()]
+        if STORAGE_BACKEND == "sqlite":
+            return sqlite_storage.list_guild_ids()
+        config = _load_cached_config()
+        return [int(guild_id) for guild_id in config.keys() if guild_id != "global_data"]
     except Exception as e:
         logger.error(f"❌ Erreur lors de la récupération des serveurs: {e}")
         return []
@@ -190,9 +678,11 @@ def backup_config(backup_file: str = None) -> bool:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             backup_file = f"bot_configs_backup_{timestamp}.json"
         
-        config = load_config()
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        if STORAGE_BACKEND == "sqlite":
+            config = sqlite_storage.export_config()
+        else:
+            config = {**_load_cached_config(), "global_data": _get_json_global_data()}
+        _atomic_write_json(backup_file, config, indent=2, ensure_ascii=False, default=str)
         
         logger.info(f"💾 Sauvegarde créée: {backup_file}")
         return True
@@ -211,7 +701,16 @@ def restore_config(backup_file: str) -> bool:
         with open(backup_file, 'r', encoding='utf-8') as f:
             config = json.load(f)
         
-        save_config(config)
+        if STORAGE_BACKEND == "sqlite":
+            if not sqlite_storage.import_config(config):
+                return False
+        else:
+            if SNAPSHOT_FORMAT == "binary" and "global_data" in config:
+                _save_binary_snapshot(config.pop("global_data"))
+            _migrate_config(config)
+            if not _write_config(config):
+                return False
+        _forget_settings_records()
         logger.info(f"🔄 Configuration restaurée depuis: {backup_file}")
         return True
         
@@ -219,6 +718,191 @@ def restore_config(backup_file: str) -> bool:
         logger.error(f"❌ Erreur lors de la restauration: {e}")
         return False
 
+# ============================
+# SNAPSHOT BINAIRE DE global_data
+# ============================
+
+# En-tête : magic, version, codec, taille du contenu, CRC32 du contenu
+SNAPSHOT_MAGIC = b"DGJS"
+SNAPSHOT_VERSION = 1
+SNAPSHOT_HEADER = struct.Struct(">4sBBII")
+CODEC_MSGPACK = 1
+CODEC_ZLIB_JSON = 2
+
+# Extension msgpack utilisée pour les datetime
+_MSGPACK_DATETIME_EXT = 1
+
+_BINARY_SNAPSHOT_CACHE: Optional[Dict[str, Any]] = None
+
+def set_snapshot_format(snapshot_format: str) -> bool:
+    """Choisir le format du snapshot global_data ("json" ou "binary", backend JSON uniquement)"""
+    global SNAPSHOT_FORMAT
+
+    snapshot_format = (snapshot_format or "json").lower()
+    if snapshot_format not in ("json", "binary"):
+        logger.error(f"❌ Format de snapshot inconnu: {snapshot_format}")
+        return False
+
+    with _CONFIG_LOCK:
+        SNAPSHOT_FORMAT = snapshot_format
+        _clear_binary_snapshot_cache()
+    logger.info(f"📦 Format du snapshot global_data: {snapshot_format}")
+    return True
+
+def set_tracker_persistence(enabled: bool) -> None:
+    """Activer ou non la persistance de JOIN_TRACKER / MESSAGE_TRACKER (état de courte durée)"""
+    global PERSIST_TRACKERS
+
+    with _CONFIG_LOCK:
+        PERSIST_TRACKERS = bool(enabled)
+    if enabled:
+        logger.info("⏱️ Persistance des trackers anti-raid activée")
+    else:
+        logger.info("⏱️ Persistance des trackers anti-raid désactivée (état en mémoire uniquement)")
+
+def _clear_binary_snapshot_cache() -> None:
+    """Oublier le snapshot binaire en mémoire"""
+    global _BINARY_SNAPSHOT_CACHE
+    _BINARY_SNAPSHOT_CACHE = None
+
+def _normalize_keys(value: Any) -> Any:
+    """Clés de dictionnaire en texte et séquences en listes (même forme que le JSON)"""
+    if isinstance(value, dict):
+        return {str(key): _normalize_keys(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, deque)):
+        return [_normalize_keys(item) for item in value]
+    return value
+
+def _msgpack_default(value: Any) -> Any:
+    """Encodage msgpack des types non natifs"""
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_MSGPACK_DATETIME_EXT, value.isoformat().encode('utf-8'))
+    return str(value)
+
+def _msgpack_ext_hook(code: int, data: bytes) -> Any:
+    """Décodage des extensions msgpack"""
+    if code == _MSGPACK_DATETIME_EXT:
+        return datetime.fromisoformat(data.decode('utf-8'))
+    return msgpack.ExtType(code, data)
+
+def _json_typed_default(value: Any) -> Any:
+    """Encodage JSON typé : les datetime deviennent {"$dt": "..."}"""
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return str(value)
+
+def _json_typed_hook(obj: Dict[str, Any]) -> Any:
+    """Décodage JSON typé"""
+    if len(obj) == 1 and "$dt" in obj:
+        return datetime.fromisoformat(obj["$dt"])
+    return obj
+
+def encode_snapshot(global_data: Dict[str, Any]) -> bytes:
+    """Encoder global_data (msgpack si disponible, sinon JSON compact compressé)"""
+    if msgpack is not None:
+        codec = CODEC_MSGPACK
+        payload = msgpack.packb(_normalize_keys(global_data), default=_msgpack_default, use_bin_type=True)
+    else:
+        codec = CODEC_ZLIB_JSON
+        payload = zlib.compress(
+            json.dumps(global_data, separators=(',', ':'), ensure_ascii=False, default=_json_typed_default).encode('utf-8')
+        )
+    header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, codec, len(payload), zlib.crc32(payload))
+    return header + payload
+
+def decode_snapshot(data: bytes) -> Dict[str, Any]:
+    """Décoder un snapshot binaire (ValueError s'il est invalide)"""
+    if len(data) < SNAPSHOT_HEADER.size:
+        raise ValueError("snapshot tronqué")
+    magic, version, codec, length, crc = SNAPSHOT_HEADER.unpack_from(data)
+    payload = data[SNAPSHOT_HEADER.size:]
+    if magic != SNAPSHOT_MAGIC:
+        raise ValueError("en-tête de snapshot invalide")
+    if version > SNAPSHOT_VERSION:
+        raise ValueError(f"version de snapshot non supportée: {version}")
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise ValueError("snapshot corrompu (taille ou CRC)")
+
+    if codec == CODEC_MSGPACK:
+        if msgpack is None:
+            raise ValueError("snapshot msgpack mais le module msgpack n'est pas installé")
+        return msgpack.unpackb(payload, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+    if codec == CODEC_ZLIB_JSON:
+        return json.loads(zlib.decompress(payload).decode('utf-8'), object_hook=_json_typed_hook)
+    raise ValueError(f"codec de snapshot inconnu: {codec}")
+
+def _load_binary_snapshot() -> Dict[str, Any]:
+    """Charger (une fois) le snapshot binaire, en migrant la section JSON au besoin"""
+    global _BINARY_SNAPSHOT_CACHE
+
+    with _CONFIG_LOCK:
+        if _BINARY_SNAPSHOT_CACHE is not None:
+            return _BINARY_SNAPSHOT_CACHE
+
+        if os.path.exists(BINARY_SNAPSHOT_FILE):
+            try:
+                with open(BINARY_SNAPSHOT_FILE, 'rb') as f:
+                    _BINARY_SNAPSHOT_CACHE = decode_snapshot(f.read())
+                logger.debug(f"📥 Snapshot binaire chargé depuis {BINARY_SNAPSHOT_FILE}")
+                return _BINARY_SNAPSHOT_CACHE
+            except Exception as e:
+                logger.error(f"❌ Snapshot binaire illisible ({BINARY_SNAPSHOT_FILE}): {e}")
+                # Garder le fichier corrompu de côté : la prochaine sauvegarde ne l'écrase pas
+                try:
+                    os.replace(BINARY_SNAPSHOT_FILE, f"{BINARY_SNAPSHOT_FILE}.corrupt")
+                except OSError:
+                    pass
+
+        # Première utilisation (ou snapshot illisible) : reprendre la section global_data du JSON
+        _BINARY_SNAPSHOT_CACHE = _load_cached_config().get("global_data", {})
+        return _BINARY_SNAPSHOT_CACHE
+
+def _save_binary_snapshot(global_data: Dict[str, Any]) -> bool:
+    """Écrire le snapshot binaire de façon atomique"""
+    global _BINARY_SNAPSHOT_CACHE
+
+    with _CONFIG_LOCK:
+        try:
+            _atomic_write_bytes(BINARY_SNAPSHOT_FILE, encode_snapshot(global_data))
+            _BINARY_SNAPSHOT_CACHE = global_data
+
+            # global_data ne vit plus dans le JSON : éviter une copie périmée
+            config = _load_cached_config()
+            if "global_data" in config:
+                _write_config({key: value for key, value in config.items() if key != "global_data"})
+
+            logger.debug(f"💾 Snapshot binaire sauvegardé dans {BINARY_SNAPSHOT_FILE}")
+            return True
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la sauvegarde de {BINARY_SNAPSHOT_FILE}: {e}")
+            return False
+
+def _get_json_global_data() -> Dict[str, Any]:
+    """global_data du backend JSON (dans bot_configs.json ou dans le snapshot binaire)"""
+    if SNAPSHOT_FORMAT == "binary":
+        return _load_binary_snapshot()
+    return _load_cached_config().get("global_data", {})
+
+def _save_json_global_data(global_data: Dict[str, Any]) -> bool:
+    """Écrire global_data pour le backend JSON (nouveau dictionnaire, le cache n'est remplacé qu'après l'écriture)"""
+    if SNAPSHOT_FORMAT == "binary":
+        return _save_binary_snapshot(global_data)
+    return _write_config({**_load_cached_config(), "global_data": global_data})
+
+def export_global_data_json(export_file: str = "bot_global_data_export.json") -> bool:
+    """Exporter global_data en JSON lisible (pour inspection du snapshot binaire)"""
+    try:
+        if STORAGE_BACKEND == "sqlite":
+            global_data = sqlite_storage.load_global_data()
+        else:
+            global_data = _get_json_global_data()
+        _atomic_write_json(export_file, global_data, indent=2, ensure_ascii=False, default=_json_default)
+        logger.info(f"📤 global_data exporté dans {export_file}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de l'export de global_data: {e}")
+        return False
+
 # Initialisation du module
 logger.info("🔧 Module config_manager initialisé")
 ensure_config_file()
@@ -230,187 +914,317 @@ ensure_config_file()
 def save_all_data(warnings=None, song_queues=None, loop_modes=None, current_songs=None,
                   support_channels=None, support_config=None, temp_vocal_config=None,
                   temp_vocal_channels=None, raid_protection=None, join_tracker=None,
-                  message_tracker=None, extraction_stats=None) -> bool:
-    """Sauvegarder TOUTES les données du bot automatiquement"""
-    try:
-        config = load_config()
-        
-        # Créer la section global_data si elle n'existe pas
-        if "global_data" not in config:
-            config["global_data"] = {}
-        
-        # Sauvegarder toutes les données si elles sont fournies
-        if warnings is not None:
-            # Convertir defaultdict en dict normal pour JSON
-            config["global_data"]["warnings"] = dict(warnings)
-            logger.debug("💾 WARNINGS sauvegardées")
+                  message_tracker=None, extraction_stats=None, method_stats=None,
+                  journal_seq: Dict[str, int] = None) -> bool:
+    """
+    Sauvegarder TOUTES les données du bot automatiquement
+
+    journal_seq: numéro du journal auquel chaque section journalisée a été copiée
+    (mark_dirty) ; sans lui, les sections fournies sont supposées à jour.
+    """
+    with _CONFIG_LOCK:
+        try:
+            if STORAGE_BACKEND == "sqlite":
+                # Seules les sections fournies sont écrites, ligne par ligne
+                global_data = {}
+            else:
+                # Copie de la section global_data : le cache n'est remplacé qu'après l'écriture
+                global_data = dict(_get_json_global_data())
         
-        if song_queues is not None:
-            config["global_data"]["song_queues"] = song_queues
-            logger.debug("💾 SONG_QUEUES sauvegardées")
+            # Sauvegarder toutes les données si elles sont fournies
+            if warnings is not None:
+                # Convertir defaultdict en dict normal pour JSON
+                global_data["warnings"] = dict(warnings)
+                logger.debug("💾 WARNINGS sauvegardées")
         
-        if loop_modes is not None:
-            config["global_data"]["loop_modes"] = loop_modes
-            logger.debug("💾 LOOP_MODES sauvegardées")
+            if song_queues is not None:
+                global_data["song_queues"] = song_queues
+                logger.debug("💾 SONG_QUEUES sauvegardées")
         
-        if current_songs is not None:
-            config["global_data"]["current_songs"] = current_songs
-            logger.debug("💾 CURRENT_SONGS sauvegardées")
+            if loop_modes is not None:
+                global_data["loop_modes"] = loop_modes
+                logger.debug("💾 LOOP_MODES sauvegardées")
         
-        if support_channels is not None:
-            config["global_data"]["support_channels"] = support_channels
-            logger.debug("💾 SUPPORT_CHANNELS sauvegardées")
+            if current_songs is not None:
+                global_data["current_songs"] = current_songs
+                logger.debug("💾 CURRENT_SONGS sauvegardées")
         
-        if support_config is not None:
-            config["global_data"]["support_config"] = support_config
-            logger.debug("💾 SUPPORT_CONFIG sauvegardée")
+            if support_channels is not None:
+                global_data["support_channels"] = support_channels
+                logger.debug("💾 SUPPORT_CHANNELS sauvegardées")
         
-        if temp_vocal_config is not None:
-            config["global_data"]["temp_vocal_config"] = temp_vocal_config
-            logger.debug("💾 TEMP_VOCAL_CONFIG sauvegardée")
+            if support_config is not None:
+                global_data["support_config"] = support_config
+                logger.debug("💾 SUPPORT_CONFIG sauvegardée")
         
-        if temp_vocal_channels is not None:
-            config["global_data"]["temp_vocal_channels"] = temp_vocal_channels
-            logger.debug("💾 TEMP_VOCAL_CHANNELS sauvegardées")
+            if temp_vocal_config is not None:
+                global_data["temp_vocal_config"] = temp_vocal_config
+                logger.debug("💾 TEMP_VOCAL_CONFIG sauvegardée")
         
-        if raid_protection is not None:
-            config["global_data"]["raid_protection"] = raid_protection
-            logger.debug("💾 RAID_PROTECTION sauvegardée")
+            if temp_vocal_channels is not None:
+                global_data["temp_vocal_channels"] = temp_vocal_channels
+                logger.debug("💾 TEMP_VOCAL_CHANNELS sauvegardées")
         
-        if join_tracker is not None:
-            # Convertir defaultdict en dict normal pour JSON
-            config["global_data"]["join_tracker"] = dict(join_tracker)
-            logger.debug("💾 JOIN_TRACKER sauvegardé")
+            if raid_protection is not None:
+                global_data["raid_protection"] = raid_protection
+                logger.debug("💾 RAID_PROTECTION sauvegardée")
         
-        if message_tracker is not None:
-            # Convertir defaultdict en dict normal pour JSON
-            config["global_data"]["message_tracker"] = dict(message_tracker)
-            logger.debug("💾 MESSAGE_TRACKER sauvegardé")
+            if join_tracker is not None:
+                # Convertir defaultdict en dict normal pour JSON
+                global_data["join_tracker"] = dict(join_tracker)
+                logger.debug("💾 JOIN_TRACKER sauvegardé")
         
-        if extraction_stats is not None:
-            config["global_data"]["extraction_stats"] = extraction_stats
-            logger.debug("💾 EXTRACTION_STATS sauvegardées")
+            if message_tracker is not None:
+                # Convertir defaultdict en dict normal pour JSON
+                global_data["message_tracker"] = dict(message_tracker)
+                logger.debug("💾 MESSAGE_TRACKER sauvegardé")
         
-        # Ajouter timestamp de dernière sauvegarde
-        config["global_data"]["last_save"] = datetime.now().isoformat()
+            if extraction_stats is not None:
+                global_data["extraction_stats"] = extraction_stats
+                logger.debug("💾 EXTRACTION_STATS sauvegardées")
+            
+            if method_stats is not None:
+                global_data["method_stats"] = method_stats
+                logger.debug("💾 METHOD_STATS sauvegardées")
+            
+            if not PERSIST_TRACKERS:
+                # Ne rien garder des trackers sur disque (vide aussi d'anciennes sauvegardes)
+                for name in TRACKER_SECTIONS:
+                    global_data[name] = {}
         
-        # Sauvegarder
-        if save_config(config):
-            logger.info("✅ Toutes les données automatiquement sauvegardées")
-            return True
-        else:
-            logger.error("❌ Échec de la sauvegarde automatique")
-            return False
+            # Les entrées du journal déjà incluses dans les sections écrites ne seront pas rejouées
+            provided = {"warnings": warnings, "join_tracker": join_tracker, "message_tracker": message_tracker}
+            _init_journal()
+            with _SEQ_LOCK:
+                section_seq = {
+                    name: (journal_seq or {}).get(name, _JOURNAL_SEQ)
+                    for name, value in provided.items() if value is not None
+                }
+            
+            # Sauvegarder
+            if STORAGE_BACKEND == "sqlite":
+                saved = sqlite_storage.save_global_sections(global_data, journal_seq=section_seq)
+            else:
+                if section_seq:
+                    global_data["journal_seq"] = {**global_data.get("journal_seq", {}), **section_seq}
+                # Ajouter timestamp de dernière sauvegarde
+                global_data["last_save"] = datetime.now().isoformat()
+                saved = _save_json_global_data(global_data)
+            
+            if saved:
+                logger.info("✅ Toutes les données automatiquement sauvegardées")
+                return True
+            else:
+                logger.error("❌ Échec de la sauvegarde automatique")
+                return False
     
-    except Exception as e:
-        logger.error(f"❌ Erreur lors de la sauvegarde automatique: {e}")
-        return False
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la sauvegarde automatique: {e}")
+            return False
+
+# ============================
+# CHARGEMENT PARESSEUX DES SECTIONS
+# ============================
+
+class LazySectionDict(dict):
+    """Dictionnaire dont les entrées brutes (clés JSON en texte) ne sont converties qu'au premier accès.
+
+    Le démarrage ne coûte plus que la lecture du snapshot : une file d'attente ou une liste
+    d'avertissements n'est reconstruite (deque, datetime...) que lorsqu'un serveur l'utilise.
+    Les clés sont ramenées à un seul type (key_type, int par défaut) : 5 et "5" sont la même entrée.
+    """
+
+    def __init__(self, raw: Dict[str, Any] = None, convert: Callable[[Any], Any] = None,
+                 default_factory: Callable[[], Any] = None, key_type: Callable[[str], Any] = int):
+        super().__init__()
+        self._raw = dict(raw or {})
+        self._convert = convert or (lambda value: value)
+        self.default_factory = default_factory
+        self._key_type = key_type
+
+    def _canonical(self, key: Any) -> Any:
+        """Clé sous son type unique (5 et "5" désignent la même entrée)"""
+        try:
+            return self._key_type(key)
+        except (TypeError, ValueError):
+            return key
+
+    def _materialize(self, key: Any) -> bool:
+        """Convertir l'entrée brute correspondant à la clé (canonique), si elle existe encore"""
+        raw_key = str(key)
+        if raw_key not in self._raw:
+            return False
+        dict.__setitem__(self, key, self._convert(self._raw.pop(raw_key)))
+        return True
+
+    def _materialize_all(self) -> None:
+        """Convertir toutes les entrées restantes (itération, statistiques)"""
+        for raw_key in list(self._raw):
+            dict.__setitem__(self, self._canonical(raw_key), self._convert(self._raw.pop(raw_key)))
+
+    def __getitem__(self, key: Any) -> Any:
+        key = self._canonical(key)
+        if dict.__contains__(self, key):
+            return dict.__getitem__(self, key)
+        return self.__missing__(key)
+
+    def __missing__(self, key: Any) -> Any:
+        key = self._canonical(key)
+        if self._materialize(key):
+            return dict.__getitem__(self, key)
+        if self.default_factory is None:
+            raise KeyError(key)
+        value = self.default_factory()
+        dict.__setitem__(self, key, value)
+        return value
+
+    def __contains__(self, key: Any) -> bool:
+        key = self._canonical(key)
+        return dict.__contains__(self, key) or str(key) in self._raw
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        key = self._canonical(key)
+        self._raw.pop(str(key), None)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key: Any) -> None:
+        key = self._canonical(key)
+        if str(key) in self._raw:
+            del self._raw[str(key)]
+            dict.pop(self, key, None)
+            return
+        dict.__delitem__(self, key)
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + len(self._raw)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self):
+        self._materialize_all()
+        return dict.__iter__(self)
+
+    def __repr__(self) -> str:
+        return f"LazySectionDict({dict.__len__(self)} chargées, {len(self._raw)} en attente)"
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        key = self._canonical(key)
+        if dict.__contains__(self, key) or self._materialize(key):
+            return dict.__getitem__(self, key)
+        return default
+
+    def setdefault(self, key: Any, default: Any = None) -> Any:
+        key = self._canonical(key)
+        if dict.__contains__(self, key) or self._materialize(key):
+            return dict.__getitem__(self, key)
+        dict.__setitem__(self, key, default)
+        return default
+
+    def pop(self, key: Any, *default: Any) -> Any:
+        key = self._canonical(key)
+        self._materialize(key)
+        return dict.pop(self, key, *default)
+
+    def keys(self):
+        self._materialize_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._materialize_all()
+        return dict.values(self)
+
+    def items(self):
+        self._materialize_all()
+        return dict.items(self)
+
+    def clear(self) -> None:
+        self._raw.clear()
+        dict.clear(self)
+
+    def copy(self) -> Dict[Any, Any]:
+        return dict(self.items())
+
+    def pending_count(self) -> int:
+        """Nombre d'entrées pas encore converties"""
+        return len(self._raw)
+
+    def snapshot(self) -> Dict[Any, Any]:
+        """Copie prête à sérialiser, sans convertir les entrées jamais lues (elles sont déjà au format JSON)"""
+        # Clés en texte comme dans le JSON : une entrée convertie ne peut pas doubler son entrée brute
+        data = {str(k): list(v) if isinstance(v, (list, deque)) else v for k, v in dict.items(self)}
+        data.update(self._raw)
+        return data
+
+def _lazy_section(global_data: Dict[str, Any], name: str, convert: Callable[[Any], Any] = None,
+                  default_factory: Callable[[], Any] = None) -> LazySectionDict:
+    """Envelopper une section brute de global_data sans la parcourir"""
+    raw = global_data.get(name) or {}
+    section = LazySectionDict(raw, convert=convert, default_factory=default_factory)
+    if raw:
+        logger.debug(f"📥 {name.upper()} : {len(raw)} entrée(s) chargée(s) à la demande")
+    return section
+
+def _empty_loaded_data() -> Dict[str, Any]:
+    """Valeurs par défaut de load_all_data"""
+    return {
+        "warnings": LazySectionDict(default_factory=list),
+        "song_queues": LazySectionDict(convert=deque),
+        "loop_modes": LazySectionDict(),
+        "current_songs": LazySectionDict(),
+        "support_channels": LazySectionDict(),
+        "support_config": LazySectionDict(),
+        "temp_vocal_config": LazySectionDict(),
+        "temp_vocal_channels": LazySectionDict(),
+        "raid_protection": LazySectionDict(),
+        "join_tracker": LazySectionDict(default_factory=list),
+        "message_tracker": LazySectionDict(default_factory=list),
+        "extraction_stats": {"success": 0, "failed": 0, "youtube": 0, "spotify": 0, "soundcloud": 0},
+        "method_stats": {}
+    }
 
 def load_all_data() -> Dict[str, Any]:
-    """Charger TOUTES les données du bot depuis le JSON"""
+    """Charger TOUTES les données du bot depuis le JSON (chaque entrée est convertie à son premier accès)"""
     try:
-        config = load_config()
-        global_data = config.get("global_data", {})
+        # Snapshot + rejeu de la fin du journal (numérotation reprise avant toute mutation)
+        _init_journal()
+        # Copie profonde : les sections vivantes du bot ne partagent rien avec le cache
+        global_data = copy.deepcopy(_load_raw_global_data())
+        global_data = {**global_data, **_replay_journal(global_data)}
+        
+        parse_datetimes = lambda values: [_parse_datetime(value) for value in values]
         
-        # Préparer les données avec valeurs par défaut
         result = {
-            "warnings": defaultdict(list),
-            "song_queues": {},
-            "loop_modes": {},
-            "current_songs": {},
-            "support_channels": {},
-            "support_config": {},
-            "temp_vocal_config": {},
-            "temp_vocal_channels": {},
-            "raid_protection": {},
-            "join_tracker": defaultdict(list),
-            "message_tracker": defaultdict(list),
-            "extraction_stats": {"success": 0, "failed": 0, "youtube": 0, "spotify": 0, "soundcloud": 0}
+            "warnings": _lazy_section(global_data, "warnings",
+                                      lambda warns: _restore_datetime_field(warns, "timestamp"), list),
+            # Les listes redeviennent des deques
+            "song_queues": _lazy_section(global_data, "song_queues", deque),
+            "loop_modes": _lazy_section(global_data, "loop_modes"),
+            "current_songs": _lazy_section(global_data, "current_songs"),
+            "support_channels": _lazy_section(global_data, "support_channels"),
+            "support_config": _lazy_section(global_data, "support_config"),
+            "temp_vocal_config": _lazy_section(global_data, "temp_vocal_config"),
+            "temp_vocal_channels": _lazy_section(global_data, "temp_vocal_channels",
+                                                 lambda channels: _restore_datetime_field(channels, "created_at")),
+            "raid_protection": _lazy_section(global_data, "raid_protection"),
+            "join_tracker": _lazy_section(global_data, "join_tracker", parse_datetimes, list),
+            "message_tracker": _lazy_section(global_data, "message_tracker", parse_datetimes, list),
+            "extraction_stats": {"success": 0, "failed": 0, "youtube": 0, "spotify": 0, "soundcloud": 0},
+            "method_stats": {}
         }
         
-        # Charger les données sauvegardées
-        if "warnings" in global_data:
-            warnings_data = global_data["warnings"]
-            # Convertir les clés string en int
-            for user_id_str, warns in warnings_data.items():
-                result["warnings"][int(user_id_str)] = warns
-            logger.debug("📥 WARNINGS chargées")
-        
-        if "song_queues" in global_data:
-            song_queues_data = global_data["song_queues"]
-            result["song_queues"] = {}
-            # Convertir les listes de nouveau en deques
-            for guild_id, queue_list in song_queues_data.items():
-                result["song_queues"][int(guild_id)] = deque(queue_list)
-            logger.debug("📥 SONG_QUEUES chargées et converties en deques")
-        
-        if "loop_modes" in global_data:
-            loop_data = global_data["loop_modes"]
-            # Convertir les clés string en int
-            for guild_id_str, mode in loop_data.items():
-                result["loop_modes"][int(guild_id_str)] = mode
-            logger.debug("📥 LOOP_MODES chargées")
-        
-        if "current_songs" in global_data:
-            songs_data = global_data["current_songs"]
-            # Convertir les clés string en int
-            for guild_id_str, song in songs_data.items():
-                result["current_songs"][int(guild_id_str)] = song
-            logger.debug("📥 CURRENT_SONGS chargées")
-        
-        if "support_channels" in global_data:
-            support_data = global_data["support_channels"]
-            # Convertir les clés string en int
-            for guild_id_str, channels in support_data.items():
-                result["support_channels"][int(guild_id_str)] = channels
-            logger.debug("📥 SUPPORT_CHANNELS chargées")
-        
-        if "support_config" in global_data:
-            support_config_data = global_data["support_config"]
-            # Convertir les clés string en int
-            for guild_id_str, config in support_config_data.items():
-                result["support_config"][int(guild_id_str)] = config
-            logger.debug("📥 SUPPORT_CONFIG chargée")
-        
-        if "temp_vocal_config" in global_data:
-            temp_config_data = global_data["temp_vocal_config"]
-            # Convertir les clés string en int
-            for guild_id_str, config in temp_config_data.items():
-                result["temp_vocal_config"][int(guild_id_str)] = config
-            logger.debug("📥 TEMP_VOCAL_CONFIG chargée")
-        
-        if "temp_vocal_channels" in global_data:
-            temp_channels_data = global_data["temp_vocal_channels"]
-            # Convertir les clés string en int
-            for guild_id_str, channels in temp_channels_data.items():
-                result["temp_vocal_channels"][int(guild_id_str)] = channels
-            logger.debug("📥 TEMP_VOCAL_CHANNELS chargées")
-        
-        if "raid_protection" in global_data:
-            raid_data = global_data["raid_protection"]
-            # Convertir les clés string en int
-            for guild_id_str, protection in raid_data.items():
-                result["raid_protection"][int(guild_id_str)] = protection
-            logger.debug("📥 RAID_PROTECTION chargée")
-        
-        if "join_tracker" in global_data:
-            join_data = global_data["join_tracker"]
-            # Convertir les clés string en int et recréer defaultdict
-            for guild_id_str, joins in join_data.items():
-                result["join_tracker"][int(guild_id_str)] = joins
-            logger.debug("📥 JOIN_TRACKER chargé")
-        
-        if "message_tracker" in global_data:
-            message_data = global_data["message_tracker"]
-            # Convertir les clés string en int et recréer defaultdict
-            for guild_id_str, messages in message_data.items():
-                result["message_tracker"][int(guild_id_str)] = messages
-            logger.debug("📥 MESSAGE_TRACKER chargé")
-        
         if "extraction_stats" in global_data:
             result["extraction_stats"] = global_data["extraction_stats"]
             logger.debug("📥 EXTRACTION_STATS chargées")
         
+        if "method_stats" in global_data:
+            result["method_stats"] = global_data["method_stats"]
+            logger.debug("📥 METHOD_STATS chargées")
+        
+        if not PERSIST_TRACKERS:
+            for name in TRACKER_SECTIONS:
+                result[name] = LazySectionDict(default_factory=list)
+        
         last_save = global_data.get("last_save", "Jamais")
         logger.info(f"✅ Toutes les données chargées (dernière sauvegarde: {last_save})")
         
@@ -419,21 +1233,437 @@ def load_all_data() -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"❌ Erreur lors du chargement automatique: {e}")
         # Retourner valeurs par défaut en cas d'erreur
-        return {
-            "warnings": defaultdict(list),
-            "song_queues": {},
-            "loop_modes": {},
-            "current_songs": {},
-            "support_channels": {},
-            "support_config": {},
-            "temp_vocal_config": {},
-            "temp_vocal_channels": {},
-            "raid_protection": {},
-            "join_tracker": defaultdict(list),
-            "message_tracker": defaultdict(list),
-            "extraction_stats": {"success": 0, "failed": 0, "youtube": 0, "spotify": 0, "soundcloud": 0}
-        }
+        return _empty_loaded_data()
+
+# ============================
+# JOURNAL APPEND-ONLY DES MUTATIONS
+# ============================
+
+_JOURNAL_LOCK = threading.RLock()
+# Verrou court de la numérotation (jamais tenu pendant une E/S : pris depuis l'event loop)
+_SEQ_LOCK = threading.Lock()
+_JOURNAL_HANDLE = None
+_JOURNAL_SEQ = 0          # dernier numéro attribué à une mutation
+_JOURNAL_WRITTEN_SEQ = 0  # dernier numéro écrit dans le fichier
+_JOURNAL_ENTRIES = 0
+_JOURNAL_READY = False
+
+def _json_default(value: Any) -> Any:
+    """Encodage JSON des types non natifs (datetime en ISO 8601)"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _parse_datetime(value: Any) -> Any:
+    """Reconvertir une date sérialisée en datetime (valeur inchangée sinon)"""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return value
+
+def _restore_datetime_field(records: list, field: str) -> list:
+    """Copier une liste d'enregistrements en reconvertissant un champ date en datetime"""
+    return [
+        {**record, field: _parse_datetime(record[field])} if isinstance(record, dict) and field in record else record
+        for record in records
+    ]
+
+def _load_raw_global_data() -> Dict[str, Any]:
+    """Lire la section global_data brute du backend (clés en texte)"""
+    if STORAGE_BACKEND == "sqlite":
+        return sqlite_storage.load_global_data()
+    return _get_json_global_data()
+
+def _read_journal() -> list:
+    """Lire toutes les entrées valides du journal (une ligne tronquée par un crash est ignorée)"""
+    records = []
+    if not os.path.exists(JOURNAL_FILE):
+        return records
+    with open(JOURNAL_FILE, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning(f"⚠️ Entrée de journal illisible ignorée (ligne {line_number})")
+    return records
+
+def _init_journal() -> None:
+    """Reprendre la numérotation après le snapshot et les entrées déjà présentes"""
+    global _JOURNAL_SEQ, _JOURNAL_WRITTEN_SEQ, _JOURNAL_ENTRIES, _JOURNAL_READY
+
+    if _JOURNAL_READY:
+        return
+    with _JOURNAL_LOCK:
+        if _JOURNAL_READY:
+            return
+        records = _read_journal()
+        snapshot_seq = _load_raw_global_data().get("journal_seq", {})
+        _JOURNAL_SEQ = max([record.get("seq", 0) for record in records] + list(snapshot_seq.values()) + [0])
+        _JOURNAL_WRITTEN_SEQ = _JOURNAL_SEQ
+        _JOURNAL_ENTRIES = len(records)
+        _JOURNAL_READY = True
+
+def _replay_journal(global_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Appliquer la fin du journal aux sections journalisées du snapshot (copies, le cache n'est pas modifié)"""
+    with _JOURNAL_LOCK:
+        applied_seq = global_data.get("journal_seq", {})
+        # Copies superficielles : seules les listes touchées par le journal sont dupliquées
+        sections = {name: dict(global_data.get(name, {})) for name in JOURNALED_SECTIONS}
+        copied = set()
+
+        replayed = 0
+        for record in sorted(_read_journal(), key=lambda record: record.get("seq", 0)):
+            section = record.get("section")
+            if section not in sections or record.get("seq", 0) <= applied_seq.get(section, 0):
+                continue
+            key = str(record.get("key"))
+            op = record.get("op")
+            if op == "append":
+                if (section, key) not in copied:
+                    sections[section][key] = list(sections[section].get(key, []))
+                    copied.add((section, key))
+                sections[section][key].append(record.get("value"))
+            elif op == "set":
+                sections[section][key] = record.get("value")
+                copied.add((section, key))
+            elif op == "delete":
+                sections[section].pop(key, None)
+            replayed += 1
+
+    if replayed:
+        logger.debug(f"📜 {replayed} entrée(s) du journal rejouée(s)")
+    return sections
+
+def _reserve_journal_seq() -> int:
+    """
+    Numéroter une mutation au moment où elle est faite, avant son écriture différée
+
+    Une copie de section prise ensuite (mark_dirty) contient toutes les mutations
+    de numéro inférieur ou égal à _JOURNAL_SEQ, écrites ou non.
+    """
+    global _JOURNAL_SEQ
+
+    _init_journal()
+    with _SEQ_LOCK:
+        _JOURNAL_SEQ += 1
+        return _JOURNAL_SEQ
+
+def _write_journal_record(seq: int, section: str, key: Any, op: str, encoded_value: str) -> bool:
+    """Ajouter une ligne au journal (coût constant), compacter si le seuil est atteint"""
+    return _write_journal_records([(seq, section, key, op, encoded_value)])
+
+def _write_journal_records(records: list) -> bool:
+    """Ajouter plusieurs lignes (seq, section, clé, op, valeur encodée) en une seule écriture"""
+    global _JOURNAL_HANDLE, _JOURNAL_WRITTEN_SEQ, _JOURNAL_ENTRIES
+
+    try:
+        with _JOURNAL_LOCK:
+            _init_journal()
+            if _JOURNAL_HANDLE is None:
+                _JOURNAL_HANDLE = open(JOURNAL_FILE, 'a', encoding='utf-8')
+            _JOURNAL_HANDLE.write("".join(
+                f'{{"seq": {seq}, "section": {json.dumps(section)}, "key": {json.dumps(str(key))}, '
+                f'"op": {json.dumps(op)}, "value": {encoded_value}}}\n'
+                for seq, section, key, op, encoded_value in records
+            ))
+            _JOURNAL_HANDLE.flush()
+            _JOURNAL_WRITTEN_SEQ = max([_JOURNAL_WRITTEN_SEQ] + [record[0] for record in records])
+            _JOURNAL_ENTRIES += len(records)
+            needs_compaction = _JOURNAL_ENTRIES >= JOURNAL_COMPACT_THRESHOLD
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de l'écriture dans {JOURNAL_FILE}: {e}")
+        return False
+
+    if needs_compaction:
+        compact_journal()
+    return True
+
+def record_journal(section: str, key: Any, op: str, value: Any = None) -> bool:
+    """
+    Journaliser une mutation d'une section journalisée
+
+    Args:
+        section: "warnings", "join_tracker" ou "message_tracker"
+        key: ID utilisateur ou serveur
+        op: "append" (ajout d'un élément), "set" (remplacement de la liste) ou "delete"
+        value: Élément ajouté ou nouvelle liste
+    """
+    if section not in JOURNALED_SECTIONS:
+        logger.error(f"❌ Section non journalisée: {section}")
+        return False
+    if section in TRACKER_SECTIONS and not PERSIST_TRACKERS:
+        return True
+    encoded_value = json.dumps(value, ensure_ascii=False, default=_json_default)
+    return _write_journal_record(_reserve_journal_seq(), section, key, op, encoded_value)
+
+def compact_journal() -> bool:
+    """
+    Intégrer le journal dans le snapshot puis le vider
+
+    Les entrées plus récentes qu'une copie de section encore en attente d'écriture
+    sont gardées : cette copie, écrite après la compaction, en a encore besoin au rejeu.
+    """
+    global _JOURNAL_HANDLE, _JOURNAL_ENTRIES
+
+    with _FLUSH_LOCK, _CONFIG_LOCK, _JOURNAL_LOCK:
+        try:
+            _init_journal()
+            if _JOURNAL_ENTRIES == 0:
+                return True
+
+            written_seq = _JOURNAL_WRITTEN_SEQ
+            sections = _replay_journal(_load_raw_global_data())
+            if not save_all_data(**sections, journal_seq={name: written_seq for name in sections}):
+                return False
+
+            with _PENDING_LOCK:
+                keep_after = min(_PENDING_JOURNAL_SEQ.values(), default=written_seq)
+            kept = [record for record in _read_journal() if record.get("seq", 0) > keep_after]
+
+            # Le snapshot contient tout le reste : le journal repart de ces seules entrées
+            if _JOURNAL_HANDLE is not None:
+                _JOURNAL_HANDLE.close()
+                _JOURNAL_HANDLE = None
+            _atomic_write_bytes(JOURNAL_FILE, "".join(
+                json.dumps(record, ensure_ascii=False) + "\n" for record in kept).encode('utf-8'))
+
+            logger.info(f"📜 Journal compacté ({_JOURNAL_ENTRIES - len(kept)} entrées intégrées au snapshot)")
+            _JOURNAL_ENTRIES = len(kept)
+            return True
+
+        except Exception as e:
+            logger.error(f"❌ Erreur lors de la compaction du journal: {e}")
+            return False
+
+# ============================
+# ÉCRITURE DIFFÉRÉE EN ARRIÈRE-PLAN
+# ============================
+
+# Fenêtre (secondes) pendant laquelle les sauvegardes sont regroupées en une seule écriture
+SAVE_DEBOUNCE_INTERVAL = 5.0
+
+# Sections modifiées en attente d'écriture (nom de section -> dernière valeur)
+_PENDING_SAVES: Dict[str, Any] = {}
+# Numéro du journal au moment de la copie de chaque section journalisée en attente
+_PENDING_JOURNAL_SEQ: Dict[str, int] = {}
+_PENDING_LOCK = threading.Lock()
+_FLUSH_LOCK = threading.Lock()
+_WRITER_WAKEUP = threading.Event()
+_WRITER_STOP = threading.Event()
+_WRITER_THREAD: Optional[threading.Thread] = None
+
+def _snapshot_section(value: Any) -> Any:
+    """Copie superficielle d'une section pour la sérialiser hors de l'event loop"""
+    if isinstance(value, LazySectionDict):
+        return value.snapshot()
+    if isinstance(value, dict):
+        return {k: list(v) if isinstance(v, (list, deque)) else v for k, v in value.items()}
+    return value
+
+def _snapshot_sections(sections: Dict[str, Any]) -> tuple:
+    """
+    Copier des sections et noter, pour les sections journalisées, le numéro du journal
+    auquel la copie correspond (les entrées suivantes seront rejouées par-dessus)
+    """
+    _init_journal()
+    with _SEQ_LOCK:
+        copies = {name: _snapshot_section(value) for name, value in sections.items()}
+        journal_seq = {name: _JOURNAL_SEQ for name in copies if name in JOURNALED_SECTIONS}
+    return copies, journal_seq
+
+def _background_writer_loop():
+    """Boucle du thread d'écriture : attend des sections sales puis les écrit en un seul lot"""
+    while not _WRITER_STOP.is_set():
+        _WRITER_WAKEUP.wait()
+        _WRITER_WAKEUP.clear()
+        # Laisser les autres modifications s'accumuler avant d'écrire
+        _WRITER_STOP.wait(SAVE_DEBOUNCE_INTERVAL)
+        _call_in_io_thread(flush_pending_saves)
+
+def start_background_writer(interval: float = None) -> None:
+    """Démarrer le thread d'écriture différée (sans effet s'il tourne déjà)"""
+    global _WRITER_THREAD, SAVE_DEBOUNCE_INTERVAL
+
+    if interval is not None:
+        SAVE_DEBOUNCE_INTERVAL = interval
+
+    if _WRITER_THREAD is not None and _WRITER_THREAD.is_alive():
+        return
+
+    _WRITER_STOP.clear()
+    _WRITER_THREAD = threading.Thread(target=_background_writer_loop, name="config-writer", daemon=True)
+    _WRITER_THREAD.start()
+    logger.info(f"💾 Écriture différée activée (intervalle: {SAVE_DEBOUNCE_INTERVAL}s)")
+
+def stop_background_writer(timeout: float = 10.0) -> bool:
+    """Arrêter le thread d'écriture et écrire tout ce qui reste en attente"""
+    global _WRITER_THREAD
+
+    if _WRITER_THREAD is not None:
+        _WRITER_STOP.set()
+        _WRITER_WAKEUP.set()
+        _WRITER_THREAD.join(timeout)
+        _WRITER_THREAD = None
+    saved = _call_in_io_thread(flush_pending_saves)
+    return _call_in_io_thread(compact_journal) and saved
+
+def mark_dirty(**sections) -> None:
+    """Marquer des sections de global_data comme modifiées"""
+    sections = {
+        name: value for name, value in sections.items()
+        if value is not None and not (name in TRACKER_SECTIONS and not PERSIST_TRACKERS)
+    }
+    with _PENDING_LOCK:
+        copies, journal_seq = _snapshot_sections(sections)
+        _PENDING_SAVES.update(copies)
+        _PENDING_JOURNAL_SEQ.update(journal_seq)
+    _WRITER_WAKEUP.set()
+
+def has_pending_saves() -> bool:
+    """Indiquer si des sections attendent d'être écrites"""
+    with _PENDING_LOCK:
+        return bool(_PENDING_SAVES)
+
+def flush_pending_saves() -> bool:
+    """Écrire immédiatement toutes les sections en attente"""
+    with _FLUSH_LOCK:
+        with _PENDING_LOCK:
+            pending = dict(_PENDING_SAVES)
+            pending_seq = dict(_PENDING_JOURNAL_SEQ)
+            _PENDING_SAVES.clear()
+            _PENDING_JOURNAL_SEQ.clear()
+
+        if not pending:
+            return True
+
+        if save_all_data(**pending, journal_seq=pending_seq):
+            logger.debug(f"💾 {len(pending)} section(s) écrite(s) en un seul lot")
+            return True
+
+        # Remettre en attente ce qui n'a pas été remplacé entre-temps
+        with _PENDING_LOCK:
+            for name, value in pending.items():
+                if name not in _PENDING_SAVES:
+                    _PENDING_SAVES[name] = value
+                    if name in pending_seq:
+                        _PENDING_JOURNAL_SEQ[name] = pending_seq[name]
+        return False
 
 def auto_save_data(**kwargs) -> bool:
-    """Fonction raccourci pour sauvegarde automatique partielle"""
-    return save_all_data(**kwargs)
\ No newline at end of file
+    """
+    Fonction raccourci pour sauvegarde automatique partielle
+
+    Si le thread d'écriture tourne, les sections sont seulement marquées
+    comme modifiées et écrites au prochain lot. Sinon l'écriture est immédiate.
+    """
+    mark_dirty(**kwargs)
+    if _WRITER_THREAD is not None and _WRITER_THREAD.is_alive():
+        return True
+    return flush_pending_saves()
+
+# ============================
+# FAÇADE ASYNCHRONE (HORS EVENT LOOP)
+# ============================
+
+# Thread unique pour les E/S disque du bot : les façades a*, le lot du thread d'écriture
+# différée et l'arrêt s'y exécutent dans l'ordre de soumission. Les appels synchrones
+# directs (save_config, update_guild_config...) ne sont ordonnés que par _CONFIG_LOCK.
+_IO_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="config-io")
+
+def _call_in_io_thread(func, *args, **kwargs):
+    """Exécuter une fonction bloquante dans le thread d'E/S et attendre son résultat (depuis un autre thread)"""
+    if threading.current_thread().name.startswith("config-io"):
+        return func(*args, **kwargs)
+    try:
+        future = _IO_EXECUTOR.submit(func, *args, **kwargs)
+    except RuntimeError:
+        # Exécuteur déjà arrêté (fin de l'interpréteur) : écrire directement
+        return func(*args, **kwargs)
+    return future.result()
+
+async def _run_io(func, *args, **kwargs):
+    """Exécuter une fonction bloquante dans le thread d'E/S de la configuration"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_IO_EXECUTOR, functools.partial(func, *args, **kwargs))
+
+def _get_cached_guild_config(guild_id: int) -> Optional[Dict[str, Any]]:
+    """Configuration d'un serveur si elle est déjà en mémoire et à jour, sinon None"""
+    if STORAGE_BACKEND == "sqlite":
+        return sqlite_storage.get_cached_guild_config(guild_id)
+
+    config = _CONFIG_CACHE
+    if config is None or time.monotonic() - _LAST_MTIME_CHECK >= CONFIG_MTIME_CHECK_INTERVAL:
+        return None
+    return config.get(str(guild_id))
+
+async def aget_guild_config(guild_id: int) -> Dict[str, Any]:
+    """Version asynchrone de get_guild_config (copie ; lecture disque dans le thread d'E/S)"""
+    cached = _get_cached_guild_config(guild_id)
+    if cached is not None:
+        return copy.deepcopy(cached)
+    return await _run_io(get_guild_config, guild_id)
+
+def _get_cached_settings(guild_id: int, record_cls: type) -> Optional[_SettingsRecord]:
+    """Section typée déjà construite et à jour, sinon None"""
+    if STORAGE_BACKEND == "json" and (
+            _CONFIG_CACHE is None or time.monotonic() - _LAST_MTIME_CHECK >= CONFIG_MTIME_CHECK_INTERVAL):
+        return None
+    return _SETTINGS_CACHE.get((int(guild_id), record_cls.SECTION))
+
+async def aget_security_settings(guild_id: int) -> SecuritySettings:
+    """Version asynchrone de get_security_settings (sans changement de thread si déjà en cache)"""
+    cached = _get_cached_settings(guild_id, SecuritySettings)
+    if cached is not None:
+        return cached
+    return await _run_io(get_security_settings, guild_id)
+
+async def aupdate_guild_config(guild_id: int, section: str, key_or_data: Any, value: Any = None) -> bool:
+    """Version asynchrone de update_guild_config"""
+    return await _run_io(update_guild_config, guild_id, section, key_or_data, value)
+
+async def asave_all_data(**kwargs) -> bool:
+    """Version asynchrone de save_all_data (sections copiées avant de quitter l'event loop)"""
+    sections, journal_seq = _snapshot_sections({name: value for name, value in kwargs.items() if value is not None})
+    return await _run_io(save_all_data, **sections, journal_seq=journal_seq)
+
+async def aload_all_data() -> Dict[str, Any]:
+    """Version asynchrone de load_all_data"""
+    return await _run_io(load_all_data)
+
+async def aauto_save_data(**kwargs) -> bool:
+    """Version asynchrone de auto_save_data"""
+    mark_dirty(**kwargs)
+    if _WRITER_THREAD is not None and _WRITER_THREAD.is_alive():
+        return True
+    return await _run_io(flush_pending_saves)
+
+async def arecord_journal(section: str, key: Any, op: str, value: Any = None) -> bool:
+    """Version asynchrone de record_journal (valeur encodée avant de quitter l'event loop)"""
+    if section not in JOURNALED_SECTIONS:
+        logger.error(f"❌ Section non journalisée: {section}")
+        return False
+    if section in TRACKER_SECTIONS and not PERSIST_TRACKERS:
+        return True
+    encoded_value = json.dumps(value, ensure_ascii=False, default=_json_default)
+    return await _run_io(_write_journal_record, _reserve_journal_seq(), section, key, op, encoded_value)
+
+async def arecord_journal_deletes(section: str, keys: list) -> bool:
+    """Journaliser la suppression de plusieurs clés d'une section en une seule écriture"""
+    if section not in JOURNALED_SECTIONS:
+        logger.error(f"❌ Section non journalisée: {section}")
+        return False
+    if not keys or (section in TRACKER_SECTIONS and not PERSIST_TRACKERS):
+        return True
+    records = [(_reserve_journal_seq(), section, key, "delete", "null") for key in keys]
+    return await _run_io(_write_journal_records, records)
+
+async def aflush_pending_saves() -> bool:
+    """Version asynchrone de flush_pending_saves"""
+    return await _run_io(flush_pending_saves)
+
+# Ne rien perdre si le processus s'arrête avec des sections en attente
+atexit.register(stop_background_writer)
@@ -0,0 +1,263 @@
+"""
+Cache des extractions yt-dlp, cache des échecs et coupe-circuits par extracteur
+Les métadonnées d'un titre (titre, auteur, durée...) sont gardées longtemps, l'URL de flux
+signée seulement jusqu'à son paramètre "expire". Une requête dont toutes les méthodes ont
+échoué n'est pas relancée avant NEGATIVE_CACHE_TTL. Un extracteur qui échoue à répétition
+(erreurs d'extracteur ou réseau, pas les vidéos indisponibles) est coupé CIRCUIT_COOLDOWN
+secondes, puis un seul essai décide de sa remise en service.
+"""
+import itertools
+import logging
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+
+# Configuration du logging
+logger = logging.getLogger(__name__)
+
+# Entrées gardées par cache (LRU)
+CACHE_MAX = 1000
+
+# Durée de vie des métadonnées en cache
+CACHE_TTL = 7 * 24 * 3600.0
+
+# Secondes retirées à l'expiration d'une URL de flux (le temps de démarrer la lecture)
+STREAM_URL_EXPIRY_MARGIN = 120
+
+# Délai avant de réessayer une requête dont toutes les méthodes ont échoué
+NEGATIVE_CACHE_TTL = 300.0
+
+# Échecs d'extracteur consécutifs avant coupure
+CIRCUIT_FAILURE_THRESHOLD = 5
+
+# Durée d'une coupure (l'extracteur n'est pas essayé)
+CIRCUIT_COOLDOWN = 120.0
+
+# Types d'échec d'une tentative : seul "extractor" compte pour le coupe-circuit
+FAILURE_CONTENT = "content"      # vidéo indisponible, privée, bloquée, aucun résultat
+FAILURE_EXTRACTOR = "extractor"  # extracteur cassé, réseau, blocage anti-bot
+FAILURE_TIMEOUT = "timeout"      # délai dépassé (souvent la charge, pas l'extracteur)
+FAILURE_INTERNAL = "internal"    # worker arrêté, processus impossible à lancer
+
+EXPIRE_PARAM_PATTERN = re.compile(r'[?&/]expires?[=/](\d+)', re.IGNORECASE)
+
+# Messages yt-dlp propres au contenu demandé (l'extracteur fonctionne)
+CONTENT_ERROR_PATTERN = re.compile(
+    r"video unavailable|private video|video is private|has been removed|been terminated"
+    r"|copyright|confirm your age|age[- ]restricted|inappropriate for some users|members[- ]only"
+    r"|not available in your country|geo[- ]?restrict|premieres in|live event will begin"
+    r"|http error 404|does not exist|no video results|unable to find",
+    re.IGNORECASE
+)
+
+# État (event loop du bot uniquement)
+_ENTRIES: "OrderedDict[Tuple[str, str], Dict[str, Any]]" = OrderedDict()
+_FAILURES: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+_BREAKERS: Dict[str, Dict[str, Any]] = {}
+_PROBE_TOKENS = itertools.count(1)
+
+def configure(cache_max: int = None, cache_ttl: float = None, negative_ttl: float = None,
+              failure_threshold: int = None, cooldown: float = None) -> None:
+    """Régler les caches et les coupe-circuits (valeurs par défaut si non fournies)"""
+    global CACHE_MAX, CACHE_TTL, NEGATIVE_CACHE_TTL, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN
+
+    if cache_max:
+        CACHE_MAX = cache_max
+    if cache_ttl:
+        CACHE_TTL = cache_ttl
+    if negative_ttl:
+        NEGATIVE_CACHE_TTL = negative_ttl
+    if failure_threshold:
+        CIRCUIT_FAILURE_THRESHOLD = failure_threshold
+    if cooldown:
+        CIRCUIT_COOLDOWN = cooldown
+
+# ============================
+# CACHE D'EXTRACTION
+# ============================
+
+def normalize_query(query: str, source_type: str) -> Tuple[str, str]:
+    """Clé de cache : espaces normalisés, casse ignorée sauf pour les URLs (IDs sensibles à la casse)"""
+    query = " ".join(query.split())
+    if not query.startswith("http"):
+        query = query.lower()
+    return (query, source_type)
+
+def parse_stream_url_expiry(url: Optional[str]) -> Optional[int]:
+    """Timestamp d'expiration d'une URL de flux signée (paramètre expire / Expires), None si absent"""
+    match = EXPIRE_PARAM_PATTERN.search(url or "")
+    if not match:
+        return None
+    return int(match.group(1))
+
+def get_cached(query: str, source_type: str) -> Optional[Dict[str, Any]]:
+    """Résultat en cache : métadonnées seules (url à None) si l'URL de flux a expiré, None si inconnu"""
+    key = normalize_query(query, source_type)
+    entry = _ENTRIES.get(key)
+    if entry is None:
+        return None
+
+    now = time.time()
+    if now - entry["cached_at"] > CACHE_TTL:
+        del _ENTRIES[key]
+        return None
+
+    _ENTRIES.move_to_end(key)
+    result = dict(entry["info"])
+    if not entry["url"] or now >= entry["url_expires"] - STREAM_URL_EXPIRY_MARGIN:
+        result["url"] = None
+    else:
+        result["url"] = entry["url"]
+    return result
+
+def store(query: str, source_type: str, audio_info: Dict[str, Any]) -> None:
+    """Mettre en cache un résultat d'extraction"""
+    key = normalize_query(query, source_type)
+    url = audio_info.get("url")
+    url_expires = parse_stream_url_expiry(url)
+
+    _ENTRIES[key] = {
+        "info": {k: v for k, v in audio_info.items() if k != "url"},
+        # Sans expiration connue, l'URL n'est pas réutilisée
+        "url": url if url_expires else None,
+        "url_expires": url_expires or 0,
+        "cached_at": time.time()
+    }
+    _ENTRIES.move_to_end(key)
+    while len(_ENTRIES) > CACHE_MAX:
+        _ENTRIES.popitem(last=False)
+
+def cache_size() -> int:
+    """Nombre de requêtes en cache"""
+    return len(_ENTRIES)
+
+# ============================
+# CACHE NÉGATIF
+# ============================
+
+def is_known_failure(query: str, source_type: str) -> bool:
+    """Indiquer si cette requête a échoué récemment (inutile de relancer toutes les méthodes)"""
+    key = normalize_query(query, source_type)
+    failed_at = _FAILURES.get(key)
+    if failed_at is None:
+        return False
+    if time.time() - failed_at > NEGATIVE_CACHE_TTL:
+        del _FAILURES[key]
+        return False
+    return True
+
+def record_failure(query: str, source_type: str) -> None:
+    """Mémoriser l'échec d'une requête (LRU borné comme le cache positif)"""
+    key = normalize_query(query, source_type)
+    _FAILURES[key] = time.time()
+    _FAILURES.move_to_end(key)
+    while len(_FAILURES) > CACHE_MAX:
+        _FAILURES.popitem(last=False)
+
+def failure_count() -> int:
+    """Nombre de requêtes en échec mémorisées"""
+    return len(_FAILURES)
+
+# ============================
+# COUPE-CIRCUITS
+# ============================
+
+def classify_error(message: Optional[str]) -> str:
+    """Type d'échec d'un message d'erreur yt-dlp : contenu (vidéo indisponible...) ou extracteur"""
+    if message and CONTENT_ERROR_PATTERN.search(message):
+        return FAILURE_CONTENT
+    return FAILURE_EXTRACTOR
+
+def is_extractor_outage(failures: List[str]) -> bool:
+    """Une extraction ratée compte pour le coupe-circuit si toutes ses tentatives ont buté sur l'extracteur"""
+    return bool(failures) and all(kind == FAILURE_EXTRACTOR for kind in failures)
+
+def _breaker(source_type: str) -> Dict[str, Any]:
+    return _BREAKERS.setdefault(source_type, {"failures": 0, "open_until": 0.0, "trips": 0, "probing": 0.0, "probe": None})
+
+def _probe_running(breaker: Dict[str, Any], now: float) -> bool:
+    # Un essai sans réponse après CIRCUIT_COOLDOWN est considéré perdu
+    return bool(breaker["probing"]) and now - breaker["probing"] < CIRCUIT_COOLDOWN
+
+def circuit_open(source_type: str) -> bool:
+    """
+    Indiquer si l'extracteur est indisponible : coupé, ou semi-ouvert avec son essai en cours
+    (sans effet sur l'état : circuit_admit réserve l'essai)
+    """
+    breaker = _BREAKERS.get(source_type)
+    if breaker is None or not breaker["open_until"]:
+        return False
+    now = time.time()
+    return now < breaker["open_until"] or _probe_running(breaker, now)
+
+def circuit_admit(source_type: str) -> Tuple[bool, Optional[int]]:
+    """
+    Autoriser (ou non) une extraction : (autorisée, jeton d'essai)
+    Après la coupure, une seule extraction passe (jeton non nul) ; son résultat ferme ou
+    rouvre le circuit, un résultat sans verdict rend le jeton (release_circuit_probe).
+    """
+    breaker = _BREAKERS.get(source_type)
+    if breaker is None or not breaker["open_until"]:
+        return True, None
+    now = time.time()
+    if now < breaker["open_until"] or _probe_running(breaker, now):
+        return False, None
+    breaker["probing"] = now
+    breaker["probe"] = next(_PROBE_TOKENS)
+    logger.info(f"🔌 Extracteur {source_type}: essai de remise en service")
+    return True, breaker["probe"]
+
+def release_circuit_probe(source_type: str, probe: Optional[int]) -> None:
+    """Rendre le jeton d'essai sans verdict (annulation, vidéo indisponible, délai dépassé)"""
+    breaker = _BREAKERS.get(source_type)
+    if probe and breaker is not None and breaker["probe"] == probe:
+        breaker["probing"] = 0.0
+        breaker["probe"] = None
+
+def record_circuit_result(source_type: str, success: bool) -> None:
+    """Mettre à jour le coupe-circuit après une extraction : réussite, ou panne de l'extracteur"""
+    breaker = _breaker(source_type)
+    breaker["probing"] = 0.0
+    breaker["probe"] = None
+    if success:
+        if breaker["open_until"]:
+            logger.info(f"🔌 Extracteur {source_type} rétabli")
+        breaker["failures"] = 0
+        breaker["open_until"] = 0.0
+        return
+
+    breaker["failures"] += 1
+    # Au seuil, ou à l'essai qui suit une coupure : couper (à nouveau)
+    if breaker["failures"] >= CIRCUIT_FAILURE_THRESHOLD or breaker["open_until"]:
+        breaker["open_until"] = time.time() + CIRCUIT_COOLDOWN
+        breaker["trips"] += 1
+        logger.warning(f"🔌 Extracteur {source_type} coupé {CIRCUIT_COOLDOWN:.0f}s après {breaker['failures']} échecs consécutifs")
+
+def circuit_retry_in(source_type: str) -> float:
+    """Secondes avant que l'extracteur puisse être essayé à nouveau (0 s'il n'est pas coupé)"""
+    breaker = _BREAKERS.get(source_type)
+    if breaker is None or not breaker["open_until"]:
+        return 0.0
+    return max(0.0, breaker["open_until"] - time.time())
+
+def circuit_status() -> List[Dict[str, Any]]:
+    """État des coupe-circuits pour /debug"""
+    now = time.time()
+    status = []
+    for source_type, breaker in sorted(_BREAKERS.items()):
+        if not breaker["open_until"]:
+            state = "closed"
+        elif now < breaker["open_until"]:
+            state = "open"
+        else:
+            state = "half_open"
+        status.append({
+            "source": source_type,
+            "state": state,
+            "retry_in": circuit_retry_in(source_type),
+            "probing": _probe_running(breaker, now),
+            "failures": breaker["failures"],
+            "trips": breaker["trips"]
+        })
+    return status
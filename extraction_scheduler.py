@@ -0,0 +1,132 @@
+"""
+Ordonnanceur des extractions yt-dlp
+Au plus MAX_CONCURRENT extractions à la fois. Les places libérées vont d'abord aux
+demandes "jouer maintenant", puis au préchargement ; dans une même priorité, les serveurs
+sont servis chacun leur tour, pour qu'une longue playlist n'affame pas les autres.
+"""
+import asyncio
+import logging
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional
+
+# Configuration du logging
+logger = logging.getLogger(__name__)
+
+# Priorités : "jouer maintenant" passe avant le préchargement
+PRIORITY_PLAY = 0
+PRIORITY_PREFETCH = 1
+
+# Extractions simultanées maximum
+MAX_CONCURRENT = 4
+
+# État (event loop du bot uniquement)
+# En attente : {priorité: {guild_id: deque de futures}} - tourniquet entre serveurs
+_WAITING: Dict[int, "OrderedDict[Any, deque]"] = {PRIORITY_PLAY: OrderedDict(), PRIORITY_PREFETCH: OrderedDict()}
+_RUNNING = 0
+_STATS = {"scheduled": 0, "queued": 0, "promoted": 0, "max_queue_depth": 0, "total_wait": 0.0}
+
+def configure(max_concurrent: int = None) -> None:
+    """Régler le nombre d'extractions simultanées (valeur par défaut si non fourni)"""
+    global MAX_CONCURRENT
+
+    if max_concurrent:
+        MAX_CONCURRENT = max_concurrent
+
+def queue_depth(priority: Optional[int] = None) -> int:
+    """Nombre d'extractions en attente (toutes priorités ou une seule)"""
+    priorities = [priority] if priority is not None else list(_WAITING)
+    return sum(len(waiters) for p in priorities for waiters in _WAITING[p].values())
+
+def running() -> int:
+    """Nombre d'extractions ayant une place"""
+    return _RUNNING
+
+def dispatch_slots() -> None:
+    """Attribuer les places libres : priorité d'abord, puis un serveur après l'autre"""
+    global _RUNNING
+
+    for priority in sorted(_WAITING):
+        guilds = _WAITING[priority]
+        while guilds and _RUNNING < MAX_CONCURRENT:
+            guild_id, waiters = next(iter(guilds.items()))
+            future = waiters.popleft()
+            if waiters:
+                # Ce serveur repasse en fin de tour
+                guilds.move_to_end(guild_id)
+            else:
+                del guilds[guild_id]
+            if not future.done():
+                future.set_result(True)
+                _RUNNING += 1
+
+def release_slot() -> None:
+    """Libérer une place et la donner au suivant"""
+    global _RUNNING
+    _RUNNING -= 1
+    dispatch_slots()
+
+def new_request(guild_id: Any, priority: int) -> Dict[str, Any]:
+    """Demande de place : sa priorité peut être relevée tant qu'elle attend"""
+    return {"guild_id": guild_id, "priority": priority, "future": None}
+
+def _forget_waiting_request(request: Dict[str, Any]) -> None:
+    """Retirer une demande de la file où elle attend"""
+    waiters = _WAITING[request["priority"]].get(request["guild_id"])
+    if waiters is not None and request["future"] in waiters:
+        waiters.remove(request["future"])
+        if not waiters:
+            del _WAITING[request["priority"]][request["guild_id"]]
+
+def raise_priority(request: Dict[str, Any], priority: int) -> None:
+    """Faire passer une demande en attente dans une file plus prioritaire"""
+    if priority >= request["priority"]:
+        return
+    future = request["future"]
+    if future is None or future.done():
+        # Pas encore en file (la demande sera créée avec cette priorité) ou déjà servie
+        request["priority"] = priority
+        return
+    _forget_waiting_request(request)
+    request["priority"] = priority
+    _WAITING[priority].setdefault(request["guild_id"], deque()).append(future)
+    _STATS["promoted"] += 1
+
+async def acquire_slot(request: Dict[str, Any]) -> None:
+    """Attendre une place d'extraction (équitable entre serveurs)"""
+    global _RUNNING
+
+    _STATS["scheduled"] += 1
+    if _RUNNING < MAX_CONCURRENT and not queue_depth():
+        _RUNNING += 1
+        return
+
+    loop = asyncio.get_running_loop()
+    future = request["future"] = loop.create_future()
+    _WAITING[request["priority"]].setdefault(request["guild_id"], deque()).append(future)
+    _STATS["queued"] += 1
+    _STATS["max_queue_depth"] = max(_STATS["max_queue_depth"], queue_depth())
+    started = loop.time()
+
+    try:
+        await future
+    except asyncio.CancelledError:
+        if future.done() and not future.cancelled():
+            # Place accordée juste avant l'annulation : la rendre
+            release_slot()
+        else:
+            _forget_waiting_request(request)
+        raise
+    finally:
+        _STATS["total_wait"] += loop.time() - started
+
+def scheduler_status() -> Dict[str, Any]:
+    """État de l'ordonnanceur pour /debug"""
+    queued = _STATS["queued"]
+    return {
+        "running": _RUNNING,
+        "max_concurrent": MAX_CONCURRENT,
+        "waiting_play": queue_depth(PRIORITY_PLAY),
+        "waiting_prefetch": queue_depth(PRIORITY_PREFETCH),
+        "average_wait": _STATS["total_wait"] / queued if queued else 0.0,
+        **_STATS
+    }
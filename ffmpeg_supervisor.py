@@ -0,0 +1,287 @@
+"""
+Superviseur des processus FFmpeg de lecture
+Toutes les sources audio (titres, radios) sont créées ici : suivi par serveur,
+plafond global avec file d'attente, nettoyage des processus orphelins et
+mesures CPU / mémoire par processus (psutil si installé, sinon /proc sous Linux).
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Configuration du logging
+logger = logging.getLogger(__name__)
+
+# Processus FFmpeg simultanés par défaut
+MAX_PROCESSES = 32
+
+# Intervalle entre deux passages du superviseur (mesures et nettoyage)
+SUPERVISOR_INTERVAL = 15.0
+
+# Délai avant de considérer orpheline une source qui n'est pas jouée
+ORPHAN_GRACE = 30.0
+
+# Sources suivies : {id(source): enregistrement}
+_RECORDS: Dict[int, Dict[str, Any]] = {}
+_DYING: List[Any] = []  # processus tués, récupérés (poll) au passage suivant
+_WAITERS: deque = deque()
+_SLOTS_IN_USE = 0
+_IS_ACTIVE: Optional[Callable[[Dict[str, Any]], bool]] = None
+_TASK: Optional[asyncio.Task] = None
+_STATS = {"started": 0, "queued": 0, "reaped": 0, "total_wait": 0.0}
+
+# ============================
+# MESURES
+# ============================
+
+_CLOCK_TICKS = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+def metrics_backend() -> Optional[str]:
+    """Source des mesures : psutil, /proc ou aucune"""
+    if psutil is not None:
+        return "psutil"
+    if os.path.exists("/proc/self/stat"):
+        return "proc"
+    return None
+
+def _read_usage(pid: int) -> Optional[tuple]:
+    """(temps CPU cumulé en secondes, RSS en octets) d'un processus, None s'il a disparu"""
+    try:
+        if psutil is not None:
+            process = psutil.Process(pid)
+            cpu = process.cpu_times()
+            return cpu.user + cpu.system, process.memory_info().rss
+        with open(f"/proc/{pid}/stat") as f:
+            # Le nom du processus (entre parenthèses) peut contenir des espaces
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        # utime et stime : champs 14 et 15 de /proc/<pid>/stat
+        return (int(fields[11]) + int(fields[12])) / _CLOCK_TICKS, resident_pages * _PAGE_SIZE
+    except Exception:
+        return None
+
+def _sample(record: Dict[str, Any], now: float) -> None:
+    """Mettre à jour CPU (% depuis la mesure précédente) et RSS d'un processus"""
+    process = record["process"]
+    if process is None or metrics_backend() is None:
+        return
+    usage = _read_usage(process.pid)
+    if usage is None:
+        return
+
+    cpu_time, rss = usage
+    if record["sampled_at"]:
+        elapsed = now - record["sampled_at"]
+        if elapsed > 0:
+            record["cpu_percent"] = max(0.0, (cpu_time - record["cpu_time"]) / elapsed * 100)
+    record["cpu_time"] = cpu_time
+    record["rss"] = rss
+    record["sampled_at"] = now
+
+# ============================
+# PLAFOND GLOBAL
+# ============================
+
+def _dispatch() -> None:
+    """Donner les places libres aux premiers en attente"""
+    global _SLOTS_IN_USE
+    while _WAITERS and _SLOTS_IN_USE < MAX_PROCESSES:
+        future = _WAITERS.popleft()
+        if not future.done():
+            future.set_result(True)
+            _SLOTS_IN_USE += 1
+
+def _release_slot() -> None:
+    global _SLOTS_IN_USE
+    _SLOTS_IN_USE -= 1
+    _dispatch()
+
+async def _acquire_slot() -> None:
+    """Attendre une place (file FIFO quand le plafond est atteint)"""
+    global _SLOTS_IN_USE
+
+    if _SLOTS_IN_USE < MAX_PROCESSES and not _WAITERS:
+        _SLOTS_IN_USE += 1
+        return
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    _WAITERS.append(future)
+    _STATS["queued"] += 1
+    started = loop.time()
+    logger.warning(f"⏳ Plafond FFmpeg atteint ({MAX_PROCESSES}), source en attente")
+
+    try:
+        await future
+    except asyncio.CancelledError:
+        if future.done() and not future.cancelled():
+            _release_slot()
+        elif future in _WAITERS:
+            _WAITERS.remove(future)
+        raise
+    finally:
+        _STATS["total_wait"] += loop.time() - started
+
+# ============================
+# SOURCES
+# ============================
+
+def _track(source: Any, process: Any, guild_id: str, label: str, kind: str) -> None:
+    _RECORDS[id(source)] = {
+        "guild_id": guild_id,
+        "label": label,
+        "kind": kind,
+        "source": source,
+        "process": process,
+        "started": time.time(),
+        "cpu_time": 0.0,
+        "cpu_percent": 0.0,
+        "rss": 0,
+        "sampled_at": 0.0
+    }
+    _STATS["started"] += 1
+
+async def open_source(guild_id: str, label: str, kind: str, factory: Callable[[], Any]) -> Any:
+    """
+    Créer une source audio FFmpeg (factory) une fois une place obtenue et la suivre
+
+    La source doit être refermée par close_source (callback after de la lecture),
+    sinon le superviseur la traite comme orpheline après ORPHAN_GRACE secondes.
+    """
+    await _acquire_slot()
+    try:
+        source = factory()
+    except Exception:
+        _release_slot()
+        raise
+
+    # Popen créé par discord.py (attribut interne de FFmpegAudio)
+    _track(source, getattr(source, "_process", None), guild_id, label, kind)
+    return source
+
+async def open_process(guild_id: str, label: str, kind: str, spawn: Callable[[], Awaitable[Any]]) -> Any:
+    """
+    Lancer un processus FFmpeg asyncio (spawn) une fois une place obtenue et le suivre
+    Même plafond et mêmes mesures que les sources de lecture ; à refermer par close_source(process).
+    """
+    await _acquire_slot()
+    try:
+        process = await spawn()
+    except BaseException:
+        _release_slot()
+        raise
+
+    _track(process, process, guild_id, label, kind)
+    return process
+
+def _exit_code(process: Any) -> Optional[int]:
+    """Code de sortie, None tant que le processus tourne (Popen ou processus asyncio)"""
+    poll = getattr(process, "poll", None)
+    return poll() if poll is not None else process.returncode
+
+def _terminate(record: Dict[str, Any]) -> None:
+    """Tuer le processus d'une source sans l'attendre (il est récupéré aux passages suivants)"""
+    process = record["process"]
+    if process is None or _exit_code(process) is not None:
+        return
+    try:
+        process.kill()
+    except ProcessLookupError:
+        return
+    if _exit_code(process) is None:
+        _DYING.append(process)
+
+def _collect_dying() -> None:
+    """Récupérer (poll, non bloquant) les processus tués qui ont fini de s'arrêter"""
+    _DYING[:] = [process for process in _DYING if _exit_code(process) is None]
+
+def close_source(source: Any) -> None:
+    """Fin de lecture d'une source : s'assurer que son processus est terminé et libérer la place"""
+    record = _RECORDS.pop(id(source), None)
+    if record is None:
+        return
+    _terminate(record)
+    _release_slot()
+
+def _reap(now: float) -> None:
+    """Retirer les processus terminés et tuer les sources qui ne sont plus jouées"""
+    _collect_dying()
+    for key, record in list(_RECORDS.items()):
+        process = record["process"]
+        exited = process is not None and _exit_code(process) is not None
+        orphan = (
+            not exited
+            and _IS_ACTIVE is not None
+            and now - record["started"] > ORPHAN_GRACE
+            and not _IS_ACTIVE(record)
+        )
+        if exited or orphan:
+            if orphan:
+                logger.warning(f"🧟 FFmpeg orphelin tué (serveur {record['guild_id']}, {record['label']})")
+            _STATS["reaped"] += 1
+            _RECORDS.pop(key, None)
+            _terminate(record)
+            _release_slot()
+        else:
+            _sample(record, now)
+
+async def _supervisor_loop() -> None:
+    while True:
+        await asyncio.sleep(SUPERVISOR_INTERVAL)
+        try:
+            _reap(time.time())
+        except Exception as e:
+            logger.error(f"❌ Superviseur FFmpeg: {e}")
+
+def start_supervisor(is_active: Callable[[Dict[str, Any]], bool], max_processes: int = None) -> None:
+    """Démarrer le superviseur ; is_active(record) indique si la source est encore jouée"""
+    global _IS_ACTIVE, _TASK, MAX_PROCESSES
+
+    _IS_ACTIVE = is_active
+    if max_processes:
+        MAX_PROCESSES = max_processes
+    if _TASK is None or _TASK.done():
+        _TASK = asyncio.create_task(_supervisor_loop())
+        logger.info(f"🎛️ Superviseur FFmpeg démarré (max {MAX_PROCESSES}, mesures: {metrics_backend() or 'aucune'})")
+
+def shutdown() -> None:
+    """Tuer tous les processus suivis (arrêt du bot)"""
+    for record in list(_RECORDS.values()):
+        _terminate(record)
+    _RECORDS.clear()
+    if _TASK is not None:
+        try:
+            _TASK.cancel()
+        except RuntimeError:
+            # Event loop déjà fermée
+            pass
+
+def guild_processes(guild_id: str) -> list:
+    """Processus suivis d'un serveur"""
+    return [record for record in _RECORDS.values() if record["guild_id"] == guild_id]
+
+def supervisor_status() -> Dict[str, Any]:
+    """État du superviseur pour /debug"""
+    queued = _STATS["queued"]
+    return {
+        "running": len(_RECORDS),
+        "max": MAX_PROCESSES,
+        "waiting": len(_WAITERS),
+        "guilds": len({record["guild_id"] for record in _RECORDS.values()}),
+        "downloads": sum(1 for record in _RECORDS.values() if record["kind"] == "download"),
+        "dying": len(_DYING),
+        "cpu_percent": sum(record["cpu_percent"] for record in _RECORDS.values()),
+        "rss": sum(record["rss"] for record in _RECORDS.values()),
+        "average_wait": _STATS["total_wait"] / queued if queued else 0.0,
+        "metrics": metrics_backend(),
+        **_STATS
+    }
@@ -0,0 +1,67 @@
+"""
+Import de playlists et d'albums dans la file d'un serveur
+Les entrées arrivent au fil de l'eau (yt-dlp --flat-playlist, pages Spotify) et sont
+ajoutées une par une : la lecture démarre dès la première, sans attendre la fin de la liste.
+"""
+import asyncio
+import json
+import logging
+from contextlib import aclosing
+from typing import Any, AsyncIterator, Awaitable, Callable, MutableSequence, Optional, Tuple
+
+# Configuration du logging
+logger = logging.getLogger(__name__)
+
+# Titres ajoutés entre deux sauvegardes de la file
+SAVE_EVERY = 25
+
+def flat_playlist_entry(line: bytes) -> Optional[Tuple[str, str, str]]:
+    """Entrée de file (url, source, titre) pour une ligne de --flat-playlist (None si inutilisable)"""
+    try:
+        entry = json.loads(line)
+    except json.JSONDecodeError:
+        return None
+    if not isinstance(entry, dict):
+        return None
+    video_url = entry.get('url') or entry.get('webpage_url')
+    if not (video_url or "").startswith("http"):
+        if not entry.get('id'):
+            return None
+        video_url = f"https://www.youtube.com/watch?v={entry['id']}"
+    return (video_url, "youtube", entry.get('title') or video_url)
+
+async def ingest(queue: MutableSequence, entries: AsyncIterator[Tuple[str, str, str]], label: str,
+                 playing: bool, start_playback: Callable[[], Any], schedule_prefetch: Callable[[], Any],
+                 save: Callable[[], Awaitable[Any]], prefetch_depth: int) -> int:
+    """
+    Ajouter les entrées à la file au fil de l'eau, retourne le nombre de titres ajoutés
+
+    start_playback() est appelé au premier titre si rien ne joue (playing False) ; ensuite,
+    un titre qui arrive parmi les prefetch_depth premiers de la file lance schedule_prefetch().
+    save() est attendu tous les SAVE_EVERY titres. Une erreur de la source arrête l'import
+    sans perdre les titres déjà ajoutés ; une annulation est propagée.
+    """
+    added = 0
+
+    try:
+        async with aclosing(entries):
+            async for entry in entries:
+                queue.append(entry)
+                added += 1
+
+                if not playing:
+                    # Résolu par le chemin de lecture habituel (préchargement compris)
+                    playing = True
+                    start_playback()
+                elif len(queue) <= prefetch_depth:
+                    schedule_prefetch()
+
+                if added % SAVE_EVERY == 0:
+                    await save()
+    except asyncio.CancelledError:
+        logger.info(f"⏹️ Import de playlist annulé après {added} titres: {label}")
+        raise
+    except Exception as e:
+        logger.error(f"❌ Import de playlist interrompu ({label}): {e}")
+
+    return added
@@ -0,0 +1,141 @@
+"""
+Santé des stations radio
+Une tâche de fond mesure régulièrement, pour chaque station, si le flux répond et le
+délai avant son premier octet (TTFB). Le fallback radio lit le classement en cache :
+la station la plus rapide d'abord, les stations mortes écartées sans lancer FFmpeg.
+La couche HTTP est une simple fonction (url, timeout) -> TTFB, remplaçable pour les tests.
+"""
+import asyncio
+import logging
+import time
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+
+# Configuration du logging
+logger = logging.getLogger(__name__)
+
+# Délai maximal d'une sonde (au-delà, la station est considérée injoignable)
+PROBE_TIMEOUT = 5.0
+
+# Intervalle entre deux tournées de sondes
+PROBE_INTERVAL = 300.0
+
+# Échecs consécutifs avant d'écarter une station
+DEAD_AFTER_FAILURES = 2
+
+# Poids de la dernière mesure dans la moyenne lissée du TTFB
+TTFB_ALPHA = 0.5
+
+# Sonde HTTP : (url, timeout) -> TTFB en secondes, None si le flux ne répond pas
+HttpProbe = Callable[[str, float], Awaitable[Optional[float]]]
+
+# État des stations : {url: {"ttfb", "failures", "checked_at", "last_error"}}
+_HEALTH: Dict[str, Dict[str, Any]] = {}
+_TASK: Optional[asyncio.Task] = None
+
+async def http_first_byte(url: str, timeout: float) -> Optional[float]:
+    """Sonde par défaut : GET du flux, temps jusqu'au premier octet audio (connexion aussitôt fermée)"""
+    # Import ici : le classement et les tests n'ont pas besoin d'aiohttp
+    import aiohttp
+
+    started = time.perf_counter()
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    try:
+        async with aiohttp.ClientSession(timeout=client_timeout) as session:
+            async with session.get(url, headers={"Icy-MetaData": "0"}) as response:
+                if response.status != 200:
+                    return None
+                chunk = await response.content.readany()
+                if not chunk:
+                    return None
+                return time.perf_counter() - started
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return None
+
+def _record(url: str, ttfb: Optional[float], error: Optional[str] = None) -> None:
+    health = _HEALTH.setdefault(url, {"ttfb": None, "failures": 0, "checked_at": 0.0, "last_error": None})
+    health["checked_at"] = time.time()
+    if ttfb is None:
+        health["failures"] += 1
+        health["last_error"] = error or "pas de réponse"
+        return
+    health["failures"] = 0
+    health["last_error"] = None
+    health["ttfb"] = ttfb if health["ttfb"] is None else TTFB_ALPHA * ttfb + (1 - TTFB_ALPHA) * health["ttfb"]
+
+def record_failure(url: str, error: str) -> None:
+    """Échec constaté hors sonde (démarrage de la lecture raté)"""
+    _record(url, None, error)
+
+def is_dead(url: str) -> bool:
+    """Station écartée : trop d'échecs consécutifs"""
+    health = _HEALTH.get(url)
+    return health is not None and health["failures"] >= DEAD_AFTER_FAILURES
+
+async def probe_station(station: Dict[str, str], probe: HttpProbe = None) -> Optional[float]:
+    """Sonder une station et mettre à jour son état"""
+    probe = probe or http_first_byte
+    try:
+        ttfb = await probe(station["url"], PROBE_TIMEOUT)
+    except Exception as e:
+        _record(station["url"], None, str(e))
+        return None
+    _record(station["url"], ttfb)
+    return ttfb
+
+async def probe_all(stations: List[Dict[str, str]], probe: HttpProbe = None) -> None:
+    """Sonder toutes les stations en parallèle"""
+    await asyncio.gather(*(probe_station(station, probe) for station in stations))
+    ranked = ranked_stations(stations)
+    alive = sum(1 for station in stations if not is_dead(station["url"]))
+    logger.info(f"📡 Sondes radio: {alive}/{len(stations)} joignables, meilleure: {ranked[0]['name'] if ranked else '-'}")
+
+def ranked_stations(stations: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Stations joignables, de la plus rapide à la plus lente
+    Les stations jamais mesurées suivent (ordre d'origine), les stations mortes sont écartées.
+    """
+    def rank(indexed):
+        index, station = indexed
+        health = _HEALTH.get(station["url"])
+        if health is None or health["ttfb"] is None:
+            return (1, 0.0, index)
+        # Un échec récent fait passer la station derrière les autres mesurées
+        return (0, health["ttfb"] + health["failures"] * PROBE_TIMEOUT, index)
+
+    alive = [(index, station) for index, station in enumerate(stations) if not is_dead(station["url"])]
+    return [station for _, station in sorted(alive, key=rank)]
+
+async def _prober_loop(stations: List[Dict[str, str]], probe: Optional[HttpProbe]) -> None:
+    while True:
+        try:
+            await probe_all(stations, probe)
+        except Exception as e:
+            logger.error(f"❌ Sondes radio: {e}")
+        await asyncio.sleep(PROBE_INTERVAL)
+
+def start_prober(stations: List[Dict[str, str]], interval: float = None, probe: HttpProbe = None) -> None:
+    """Démarrer les sondes périodiques (sans effet si elles tournent déjà)"""
+    global _TASK, PROBE_INTERVAL
+
+    if interval:
+        PROBE_INTERVAL = interval
+    if _TASK is None or _TASK.done():
+        _TASK = asyncio.create_task(_prober_loop(stations, probe))
+
+def stop_prober() -> None:
+    """Arrêter les sondes"""
+    if _TASK is not None:
+        try:
+            _TASK.cancel()
+        except RuntimeError:
+            # Event loop déjà fermée
+            pass
+
+def health_status(stations: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+    """État des stations pour /debug, dans l'ordre du classement"""
+    ranked = ranked_stations(stations)
+    dead = [station for station in stations if is_dead(station["url"])]
+    return [
+        {"name": station["name"], "dead": station in dead, **_HEALTH.get(station["url"], {"ttfb": None, "failures": 0})}
+        for station in ranked + dead
+    ]
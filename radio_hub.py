@@ -0,0 +1,229 @@
+"""
+Diffusion partagée des radios
+Une station = un seul FFmpeg qui décode le flux et l'encode en Opus, quel que soit le
+nombre de serveurs qui l'écoutent. Les trames Opus vont dans un tampon circulaire ;
+chaque salon vocal lit ce tampon avec son propre curseur (RadioListener).
+"""
+import logging
+import subprocess
+import threading
+from collections import deque
+from typing import Dict, Any, Optional, Callable
+
+import discord
+from discord.oggparse import OggStream
+
+# Configuration du logging
+logger = logging.getLogger(__name__)
+
+# Trames Opus de 20 ms gardées par station (10 secondes)
+RING_FRAMES = 500
+
+# Retard d'un nouvel auditeur sur le direct (1 seconde) : absorbe les irrégularités du flux
+PREBUFFER_FRAMES = 50
+
+# Attente maximale d'une trame avant d'envoyer du silence
+READ_TIMEOUT = 0.1
+
+# Une station sans auditeur reste ouverte ce temps (retour rapide de la radio après un titre)
+IDLE_LINGER = 30.0
+
+# Débit de l'Opus diffusé
+OPUS_BITRATE = "128k"
+
+# Trame Opus de silence (celle qu'envoie discord.py)
+OPUS_SILENCE = b"\xf8\xff\xfe"
+
+# Stations ouvertes : {url: RadioStation}
+_STATIONS: Dict[str, "RadioStation"] = {}
+_STATIONS_LOCK = threading.Lock()
+
+class RadioStation:
+    """Un flux radio décodé une fois, diffusé à tous ses auditeurs"""
+
+    def __init__(self, name: str, url: str, volume: float = 1.0,
+                 on_close: Optional[Callable[["RadioStation"], None]] = None):
+        self.name = name
+        self.url = url
+        self.volume = volume
+        self.on_close = on_close
+        self.listeners = 0
+        self.closed = False
+
+        self._frames = deque(maxlen=RING_FRAMES)
+        self._total = 0  # trames reçues depuis le démarrage (index global de la suivante)
+        self._ended = False
+        self._condition = threading.Condition()
+        self._idle_timer: Optional[threading.Timer] = None
+
+        # Le superviseur FFmpeg lit l'attribut _process (comme pour les sources discord.py)
+        self._process = subprocess.Popen(
+            [
+                "ffmpeg", "-nostdin", "-loglevel", "error",
+                "-reconnect", "1", "-reconnect_streamed", "1", "-reconnect_delay_max", "30",
+                "-i", url,
+                "-vn", "-map_metadata", "-1", "-filter:a", f"volume={volume}",
+                "-c:a", "libopus", "-b:a", OPUS_BITRATE, "-ar", "48000", "-ac", "2",
+                "-f", "opus", "pipe:1"
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+        self._reader = threading.Thread(target=self._read_loop, name=f"radio-{name}", daemon=True)
+        self._reader.start()
+        logger.info(f"📡 Station ouverte: {name}")
+
+    def _read_loop(self) -> None:
+        """Thread lecteur : pages Ogg de FFmpeg -> trames Opus dans le tampon"""
+        try:
+            for packet in OggStream(self._process.stdout).iter_packets():
+                if packet.startswith((b"OpusHead", b"OpusTags")):
+                    continue
+                with self._condition:
+                    self._frames.append(packet)
+                    self._total += 1
+                    self._condition.notify_all()
+        except Exception as e:
+            if not self.closed:
+                logger.error(f"❌ Station {self.name}: {e}")
+        finally:
+            with self._condition:
+                self._ended = True
+                self._condition.notify_all()
+            if not self.closed:
+                logger.warning(f"📡 Flux terminé: {self.name}")
+            self.close()
+
+    def wait_started(self, timeout: float) -> bool:
+        """Attendre la première trame (bloquant) : False si le flux se termine ou tarde"""
+        with self._condition:
+            self._condition.wait_for(lambda: self._total > 0 or self._ended, timeout)
+            return self._total > 0
+
+    def is_alive(self) -> bool:
+        """Station ouverte et flux toujours reçu"""
+        return not self.closed and not self._ended
+
+    def listen(self) -> "RadioListener":
+        """Nouvel auditeur (un salon vocal), placé juste derrière le direct"""
+        with self._condition:
+            if self.closed:
+                raise RuntimeError(f"station {self.name} fermée")
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+                self._idle_timer = None
+            self.listeners += 1
+            cursor = max(self._total - len(self._frames), self._total - PREBUFFER_FRAMES)
+        return RadioListener(self, cursor)
+
+    def _detach(self) -> None:
+        with self._condition:
+            self.listeners -= 1
+            if self.listeners > 0 or self.closed:
+                return
+            # Dernier auditeur parti : fermer après IDLE_LINGER s'il ne revient personne
+            self._idle_timer = threading.Timer(IDLE_LINGER, self._close_if_idle)
+            self._idle_timer.daemon = True
+            self._idle_timer.start()
+
+    def _close_if_idle(self) -> None:
+        # Sous le verrou : un auditeur ne peut pas arriver entre la vérification et la fermeture
+        with self._condition:
+            if self.listeners == 0:
+                self.close()
+
+    def _next_frame(self, cursor: int) -> tuple:
+        """(trame, curseur suivant) pour un auditeur ; b'' quand le flux est terminé"""
+        with self._condition:
+            if cursor >= self._total and not self._ended:
+                self._condition.wait(READ_TIMEOUT)
+            oldest = self._total - len(self._frames)
+            if cursor < oldest:
+                # Auditeur trop en retard (trames écrasées) : retour près du direct
+                cursor = max(oldest, self._total - PREBUFFER_FRAMES)
+            if cursor < self._total:
+                return self._frames[cursor - oldest], cursor + 1
+            if self._ended:
+                return b"", cursor
+            # Flux en retard : du silence plutôt qu'un blocage du lecteur audio
+            return OPUS_SILENCE, cursor
+
+    def close(self) -> None:
+        """Arrêter FFmpeg et retirer la station"""
+        with self._condition:
+            if self.closed:
+                return
+            self.closed = True
+            self._ended = True
+            if self._idle_timer is not None:
+                self._idle_timer.cancel()
+            self._condition.notify_all()
+
+        with _STATIONS_LOCK:
+            if _STATIONS.get(self.url) is self:
+                del _STATIONS[self.url]
+
+        if self._process.poll() is None:
+            self._process.kill()
+        try:
+            self._process.wait(timeout=2)
+        except subprocess.TimeoutExpired:
+            pass
+        logger.info(f"📡 Station fermée: {self.name}")
+
+        if self.on_close is not None:
+            self.on_close(self)
+
+    def status(self) -> Dict[str, Any]:
+        return {"name": self.name, "listeners": self.listeners, "frames": self._total, "alive": self.is_alive()}
+
+class RadioListener(discord.AudioSource):
+    """Source audio d'un salon vocal : lit le tampon de la station à son propre rythme"""
+
+    def __init__(self, station: RadioStation, cursor: int):
+        self.station = station
+        self._cursor = cursor
+        self._detached = False
+
+    def read(self) -> bytes:
+        frame, self._cursor = self.station._next_frame(self._cursor)
+        return frame
+
+    def is_opus(self) -> bool:
+        return True
+
+    def cleanup(self) -> None:
+        # Appelé par discord.py en fin de lecture (et par __del__) : une seule fois
+        if not self._detached:
+            self._detached = True
+            self.station._detach()
+
+def get_station(url: str) -> Optional[RadioStation]:
+    """Station déjà ouverte pour ce flux (None si fermée ou terminée)"""
+    with _STATIONS_LOCK:
+        station = _STATIONS.get(url)
+    return station if station is not None and station.is_alive() else None
+
+def open_station(name: str, url: str, volume: float = 1.0,
+                 on_close: Optional[Callable[[RadioStation], None]] = None) -> RadioStation:
+    """Ouvrir (ou réutiliser) la station d'un flux"""
+    with _STATIONS_LOCK:
+        station = _STATIONS.get(url)
+        if station is not None and station.is_alive():
+            return station
+        station = RadioStation(name, url, volume, on_close)
+        _STATIONS[url] = station
+    return station
+
+def close_all() -> None:
+    """Fermer toutes les stations (arrêt du bot)"""
+    with _STATIONS_LOCK:
+        stations = list(_STATIONS.values())
+    for station in stations:
+        station.close()
+
+def hub_status() -> list:
+    """État des stations pour /debug"""
+    with _STATIONS_LOCK:
+        return [station.status() for station in _STATIONS.values()]
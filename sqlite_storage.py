@@ -0,0 +1,358 @@
+"""
+Backend SQLite pour le gestionnaire de configuration
+Une ligne par serveur et par enregistrement : une mise à jour ne réécrit que ce qui a changé
+"""
+import json
+import os
+import sqlite3
+import logging
+import threading
+from typing import Dict, Any, Optional, List
+from datetime import datetime
+
+# Configuration du logging
+logger = logging.getLogger(__name__)
+
+# Fichier de base de données
+SQLITE_FILE = "bot_data.db"
+
+# Sections de global_data ayant leur propre table (clé = ID utilisateur ou serveur)
+DEDICATED_TABLES = {
+    "warnings": "warnings",
+    "song_queues": "song_queues",
+    "temp_vocal_channels": "temp_vocal_channels",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS guild_configs (
+    guild_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS warnings (
+    record_key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS song_queues (
+    record_key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS temp_vocal_channels (
+    record_key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS global_records (
+    section TEXT NOT NULL,
+    record_key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (section, record_key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_CONNECTION: Optional[sqlite3.Connection] = None
+_DB_LOCK = threading.RLock()
+
+# Configurations de serveur déjà lues (guild_id -> dict partagé)
+_GUILD_CACHE: Dict[str, Dict[str, Any]] = {}
+
+# Dernier JSON écrit pour chaque ligne de global_data (section -> {clé: JSON})
+_ROW_CACHE: Dict[str, Dict[str, str]] = {}
+
+def _dumps(value: Any) -> str:
+    """Sérialiser une valeur comme le backend JSON"""
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+def get_connection() -> sqlite3.Connection:
+    """Ouvrir (une seule fois) la connexion partagée en mode WAL"""
+    global _CONNECTION
+
+    with _DB_LOCK:
+        if _CONNECTION is None:
+            _CONNECTION = sqlite3.connect(SQLITE_FILE, check_same_thread=False)
+            _CONNECTION.execute("PRAGMA journal_mode=WAL")
+            _CONNECTION.execute("PRAGMA synchronous=NORMAL")
+            _CONNECTION.executescript(SCHEMA)
+            logger.info(f"🗄️ Base SQLite ouverte : {SQLITE_FILE}")
+        return _CONNECTION
+
+def init_database() -> bool:
+    """Créer la base et les tables si nécessaire"""
+    try:
+        get_connection()
+        return True
+    except Exception as e:
+        logger.error(f"❌ Erreur lors de l'ouverture de {SQLITE_FILE}: {e}")
+        return False
+
+def close() -> None:
+    """Fermer la connexion et vider les caches"""
+    global _CONNECTION
+
+    with _DB_LOCK:
+        if _CONNECTION is not None:
+            _CONNECTION.close()
+            _CONNECTION = None
+        clear_cache()
+
+def clear_cache() -> None:
+    """Oublier les lignes en mémoire : elles seront relues depuis la base"""
+    with _DB_LOCK:
+        _GUILD_CACHE.clear()
+        _ROW_CACHE.clear()
+
+# ============================
+# CONFIGURATIONS PAR SERVEUR
+# ============================
+
+def load_guild_config(guild_id: int) -> Optional[Dict[str, Any]]:
+    """Lire la configuration d'un serveur (None si elle n'existe pas)"""
+    guild_str = str(guild_id)
+    cached = _GUILD_CACHE.get(guild_str)
+    if cached is not None:
+        return cached
+
+    with _DB_LOCK:
+        row = get_connection().execute(
+            "SELECT data FROM guild_configs WHERE guild_id = ?", (guild_str,)
+        ).fetchone()
+        if row is None:
+            return None
+        config = json.loads(row[0])
+        _GUILD_CACHE[guild_str] = config
+        return config
+
+def get_cached_guild_config(guild_id: int) -> Optional[Dict[str, Any]]:
+    """Configuration d'un serveur si elle est déjà en mémoire (sans accès disque)"""
+    return _GUILD_CACHE.get(str(guild_id))
+
+def save_guild_config(guild_id: int, config: Dict[str, Any]) -> bool:
+    """Écrire la ligne d'un seul serveur"""
+    guild_str = str(guild_id)
+    try:
+        with _DB_LOCK:
+            conn = get_connection()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO guild_configs (guild_id, data, updated_at) VALUES (?, ?, ?)",
+                    (guild_str, _dumps(config), datetime.now().isoformat())
+                )
+            _GUILD_CACHE[guild_str] = config
+        logger.debug(f"💾 Configuration SQLite sauvegardée pour le serveur {guild_id}")
+        return True
+    except Exception as e:
+        logger.error(f"❌ Erreur SQLite lors de la sauvegarde du serveur {guild_id}: {e}")
+        return False
+
+def delete_guild_config(guild_id: int) -> bool:
+    """Supprimer la ligne d'un serveur"""
+    guild_str = str(guild_id)
+    with _DB_LOCK:
+        conn = get_connection()
+        with conn:
+            cursor = conn.execute("DELETE FROM guild_configs WHERE guild_id = ?", (guild_str,))
+        _GUILD_CACHE.pop(guild_str, None)
+        return cursor.rowcount > 0
+
+def list_guild_ids() -> List[int]:
+    """Lister les serveurs ayant une configuration"""
+    with _DB_LOCK:
+        rows = get_connection().execute("SELECT guild_id FROM guild_configs").fetchall()
+    return [int(row[0]) for row in rows]
+
+# ============================
+# DONNÉES GLOBALES (global_data)
+# ============================
+
+def _read_section_rows(conn: sqlite3.Connection, section: str) -> Dict[str, str]:
+    """Lire les lignes brutes (JSON) d'une section"""
+    table = DEDICATED_TABLES.get(section)
+    if table:
+        rows = conn.execute(f"SELECT record_key, data FROM {table}").fetchall()
+    else:
+        rows = conn.execute(
+            "SELECT record_key, data FROM global_records WHERE section = ?", (section,)
+        ).fetchall()
+    return {key: data for key, data in rows}
+
+def _save_section(conn: sqlite3.Connection, section: str, value: Dict[Any, Any], now: str) -> int:
+    """Écrire uniquement les lignes modifiées d'une section, retourne le nombre de lignes touchées"""
+    if section not in _ROW_CACHE:
+        _ROW_CACHE[section] = _read_section_rows(conn, section)
+    previous = _ROW_CACHE[section]
+
+    rows = {str(key): _dumps(item) for key, item in value.items()}
+    changed = [(key, data) for key, data in rows.items() if previous.get(key) != data]
+    removed = [key for key in previous if key not in rows]
+
+    table = DEDICATED_TABLES.get(section)
+    if table:
+        conn.executemany(
+            f"INSERT OR REPLACE INTO {table} (record_key, data, updated_at) VALUES (?, ?, ?)",
+            [(key, data, now) for key, data in changed]
+        )
+        conn.executemany(f"DELETE FROM {table} WHERE record_key = ?", [(key,) for key in removed])
+    else:
+        conn.executemany(
+            "INSERT OR REPLACE INTO global_records (section, record_key, data, updated_at) VALUES (?, ?, ?, ?)",
+            [(section, key, data, now) for key, data in changed]
+        )
+        conn.executemany(
+            "DELETE FROM global_records WHERE section = ? AND record_key = ?",
+            [(section, key) for key in removed]
+        )
+
+    _ROW_CACHE[section] = rows
+    return len(changed) + len(removed)
+
+def _save_journal_seq(conn: sqlite3.Connection, journal_seq: Dict[str, int]) -> None:
+    """Mémoriser le dernier numéro de journal inclus dans chaque section"""
+    conn.executemany(
+        "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+        [(f"journal_seq:{section}", str(seq)) for section, seq in journal_seq.items()]
+    )
+
+def save_global_sections(sections: Dict[str, Dict[Any, Any]], journal_seq: Optional[Dict[str, int]] = None) -> bool:
+    """Sauvegarder des sections de global_data en une seule transaction"""
+    now = datetime.now().isoformat()
+    try:
+        with _DB_LOCK:
+            conn = get_connection()
+            with conn:
+                touched = 0
+                for section, value in sections.items():
+                    touched += _save_section(conn, section, dict(value), now)
+                if journal_seq:
+                    _save_journal_seq(conn, journal_seq)
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_save', ?)", (now,))
+        logger.debug(f"💾 {touched} ligne(s) SQLite mises à jour")
+        return True
+    except Exception as e:
+        # Les lignes en mémoire ne reflètent plus la base après un rollback
+        _ROW_CACHE.clear()
+        logger.error(f"❌ Erreur SQLite lors de la sauvegarde automatique: {e}")
+        return False
+
+def load_global_data() -> Dict[str, Any]:
+    """Reconstruire global_data avec la même structure que dans le JSON"""
+    with _DB_LOCK:
+        conn = get_connection()
+        global_data: Dict[str, Any] = {}
+
+        for section in DEDICATED_TABLES:
+            rows = _read_section_rows(conn, section)
+            if rows:
+                _ROW_CACHE[section] = rows
+                global_data[section] = {key: json.loads(data) for key, data in rows.items()}
+
+        sections = [row[0] for row in conn.execute("SELECT DISTINCT section FROM global_records").fetchall()]
+        for section in sections:
+            rows = _read_section_rows(conn, section)
+            _ROW_CACHE[section] = rows
+            global_data[section] = {key: json.loads(data) for key, data in rows.items()}
+
+        row = conn.execute("SELECT value FROM meta WHERE key = 'last_save'").fetchone()
+        if row:
+            global_data["last_save"] = row[0]
+
+        rows = conn.execute("SELECT key, value FROM meta WHERE key LIKE 'journal_seq:%'").fetchall()
+        if rows:
+            global_data["journal_seq"] = {key.split(":", 1)[1]: int(value) for key, value in rows}
+
+    return global_data
+
+# ============================
+# EXPORT / IMPORT / MIGRATION
+# ============================
+
+def export_config() -> Dict[str, Any]:
+    """Exporter toute la base au format de bot_configs.json"""
+    with _DB_LOCK:
+        rows = get_connection().execute("SELECT guild_id, data FROM guild_configs").fetchall()
+    config: Dict[str, Any] = {guild_id: json.loads(data) for guild_id, data in rows}
+    global_data = load_global_data()
+    if global_data:
+        config["global_data"] = global_data
+    return config
+
+def import_config(config: Dict[str, Any]) -> bool:
+    """Importer une configuration au format de bot_configs.json (remplace l'existant)"""
+    now = datetime.now().isoformat()
+    try:
+        with _DB_LOCK:
+            conn = get_connection()
+            with conn:
+                conn.execute("DELETE FROM guild_configs")
+                for table in DEDICATED_TABLES.values():
+                    conn.execute(f"DELETE FROM {table}")
+                conn.execute("DELETE FROM global_records")
+                conn.execute("DELETE FROM meta WHERE key LIKE 'journal_seq:%'")
+                clear_cache()
+
+                conn.executemany(
+                    "INSERT INTO guild_configs (guild_id, data, updated_at) VALUES (?, ?, ?)",
+                    [(guild_id, _dumps(data), now) for guild_id, data in config.items() if guild_id != "global_data"]
+                )
+
+                global_data = config.get("global_data", {})
+                for section, value in global_data.items():
+                    if section == "journal_seq":
+                        _save_journal_seq(conn, value)
+                    elif isinstance(value, dict):
+                        _save_section(conn, section, value, now)
+                if "last_save" in global_data:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('last_save', ?)",
+                        (str(global_data["last_save"]),)
+                    )
+        return True
+    except Exception as e:
+        clear_cache()
+        logger.error(f"❌ Erreur SQLite lors de l'import: {e}")
+        return False
+
+def migrate_from_json(json_file: str) -> bool:
+    """
+    Migration unique depuis un bot_configs.json existant
+
+    Ne fait rien si la migration a déjà eu lieu ou si la base contient déjà des serveurs.
+    """
+    with _DB_LOCK:
+        conn = get_connection()
+        if conn.execute("SELECT 1 FROM meta WHERE key = 'json_migrated'").fetchone():
+            return False
+        if conn.execute("SELECT 1 FROM guild_configs LIMIT 1").fetchone():
+            logger.info("ℹ️ Base SQLite déjà remplie, migration JSON ignorée")
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', 'skipped')")
+            return False
+
+        if not os.path.exists(json_file):
+            return False
+
+        try:
+            with open(json_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except Exception as e:
+            logger.error(f"❌ Migration impossible, {json_file} illisible: {e}")
+            return False
+
+        if not import_config(config):
+            return False
+
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                (datetime.now().isoformat(),)
+            )
+
+    guild_count = len([key for key in config if key != "global_data"])
+    logger.info(f"📦 Migration {json_file} → {SQLITE_FILE} terminée ({guild_count} serveurs)")
+    return True
@@ -0,0 +1,54 @@
+"""
+Configuration commune des tests : modules du bot importables et fichiers isolés
+"""
+import atexit
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# config_manager crée bot_configs.json dans le dossier courant dès son import
+_cwd = os.getcwd()
+os.chdir(tempfile.mkdtemp(prefix="bot-tests-"))
+try:
+    import config_manager
+finally:
+    os.chdir(_cwd)
+
+# Les tests n'ont rien à écrire à la sortie : la compaction de fin (atexit) relirait
+# sinon la configuration dans le dossier courant et y créerait bot_configs.json
+atexit.unregister(config_manager.stop_background_writer)
+
+
+@pytest.fixture
+def isolated_config(tmp_path, monkeypatch):
+    """Fichiers de configuration et journal dans un dossier temporaire, caches remis à zéro"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(config_manager, "STORAGE_BACKEND", "json")
+    monkeypatch.setattr(config_manager, "SNAPSHOT_FORMAT", "json")
+    monkeypatch.setattr(config_manager, "PERSIST_TRACKERS", True)
+    config_manager.invalidate_config_cache()
+    with config_manager._JOURNAL_LOCK:
+        if config_manager._JOURNAL_HANDLE is not None:
+            config_manager._JOURNAL_HANDLE.close()
+        config_manager._JOURNAL_HANDLE = None
+        config_manager._JOURNAL_SEQ = 0
+        config_manager._JOURNAL_ENTRIES = 0
+        config_manager._JOURNAL_READY = False
+    with config_manager._PENDING_LOCK:
+        config_manager._PENDING_SAVES.clear()
+        config_manager._PENDING_JOURNAL_SEQ.clear()
+    yield tmp_path
+    with config_manager._JOURNAL_LOCK:
+        if config_manager._JOURNAL_HANDLE is not None:
+            config_manager._JOURNAL_HANDLE.close()
+            config_manager._JOURNAL_HANDLE = None
+        # Rien à compacter ni à écrire à la sortie (atexit) dans le dossier du dépôt
+        config_manager._JOURNAL_ENTRIES = 0
+    with config_manager._PENDING_LOCK:
+        config_manager._PENDING_SAVES.clear()
+        config_manager._PENDING_JOURNAL_SEQ.clear()
+    config_manager.invalidate_config_cache()
@@ -0,0 +1,62 @@
+"""
+Tests du comptage des lectures du cache audio (téléchargement remplacé par un enregistreur)
+"""
+import asyncio
+
+import pytest
+
+import audio_cache
+
+
+@pytest.fixture
+def downloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(audio_cache, "_ENTRIES", audio_cache.OrderedDict())
+    monkeypatch.setattr(audio_cache, "_PLAY_COUNTS", audio_cache.OrderedDict())
+    monkeypatch.setattr(audio_cache, "_DOWNLOADS", {})
+    started = []
+
+    async def fake_download(cid, url):
+        started.append(cid)
+
+    monkeypatch.setattr(audio_cache, "_download", fake_download)
+    audio_cache.configure(str(tmp_path / "cache"), 1024 * 1024, min_plays=2)
+    yield started
+    monkeypatch.setattr(audio_cache, "_DIRECTORY", None)
+
+
+def track(video_id, **fields):
+    return {"id": video_id, "extractor_key": "Youtube", "url": "https://stream", "duration": 180, **fields}
+
+
+def play(*tracks):
+    async def scenario():
+        for audio_info in tracks:
+            audio_cache.record_play(audio_info)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+
+
+def test_download_starts_at_threshold(downloads):
+    play(track("a"), track("b"))
+    assert downloads == []
+    play(track("a"))
+    assert downloads == ["youtube-a"]
+
+
+def test_live_and_durationless_tracks_are_not_counted(downloads):
+    play(*[track("live", is_live=True)] * 3)
+    play(*[track("unknown", duration=0)] * 3)
+    assert downloads == []
+    assert len(audio_cache._PLAY_COUNTS) == 0
+
+
+def test_play_counts_are_bounded(downloads, monkeypatch):
+    monkeypatch.setattr(audio_cache, "MAX_PLAY_COUNTS", 2)
+    play(track("a"), track("b"), track("c"))
+    # Le moins récemment joué est oublié : sa lecture suivante repart de zéro
+    assert list(audio_cache._PLAY_COUNTS) == ["youtube-b", "youtube-c"]
+    play(track("a"))
+    assert downloads == []
+    play(track("c"))
+    assert downloads == ["youtube-c"]
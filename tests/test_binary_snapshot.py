@@ -0,0 +1,117 @@
+"""
+Tests du snapshot binaire de global_data : en-tête, CRC, codecs et fichier abîmé
+"""
+import os
+import zlib
+from datetime import datetime
+
+import pytest
+
+import config_manager
+from config_manager import encode_snapshot, decode_snapshot, save_all_data, load_all_data
+
+
+@pytest.fixture
+def binary_snapshot(isolated_config, monkeypatch):
+    monkeypatch.setattr(config_manager, "SNAPSHOT_FORMAT", "binary")
+    config_manager._clear_binary_snapshot_cache()
+    yield isolated_config
+    config_manager._clear_binary_snapshot_cache()
+
+
+@pytest.fixture
+def zlib_codec(monkeypatch):
+    """Sans msgpack : JSON compact compressé"""
+    monkeypatch.setattr(config_manager, "msgpack", None)
+
+
+def test_header_describes_payload(zlib_codec):
+    data = encode_snapshot({"warnings": {"1": ["a"]}})
+    magic, version, codec, length, crc = config_manager.SNAPSHOT_HEADER.unpack_from(data)
+    payload = data[config_manager.SNAPSHOT_HEADER.size:]
+
+    assert magic == config_manager.SNAPSHOT_MAGIC
+    assert version == config_manager.SNAPSHOT_VERSION
+    assert codec == config_manager.CODEC_ZLIB_JSON
+    assert length == len(payload)
+    assert crc == zlib.crc32(payload)
+
+
+def test_zlib_fallback_round_trips_datetimes(zlib_codec):
+    when = datetime(2026, 1, 1, 12, 30)
+    global_data = {"join_tracker": {"1": [when]}, "extraction_stats": {"success": 2}}
+    assert decode_snapshot(encode_snapshot(global_data)) == global_data
+
+
+def test_msgpack_round_trip():
+    pytest.importorskip("msgpack")
+    when = datetime(2026, 1, 1, 12, 30)
+    data = encode_snapshot({"join_tracker": {1: [when]}})
+    assert config_manager.SNAPSHOT_HEADER.unpack_from(data)[2] == config_manager.CODEC_MSGPACK
+    # Clés normalisées en texte, comme dans le JSON
+    assert decode_snapshot(data) == {"join_tracker": {"1": [when]}}
+
+
+def test_msgpack_snapshot_without_module_is_rejected(zlib_codec):
+    payload = b"\x80"
+    header = config_manager.SNAPSHOT_HEADER.pack(
+        config_manager.SNAPSHOT_MAGIC, config_manager.SNAPSHOT_VERSION,
+        config_manager.CODEC_MSGPACK, len(payload), zlib.crc32(payload)
+    )
+    with pytest.raises(ValueError, match="msgpack"):
+        decode_snapshot(header + payload)
+
+
+def test_invalid_snapshots_are_rejected(zlib_codec):
+    data = encode_snapshot({"warnings": {"1": ["a"]}})
+    header_size = config_manager.SNAPSHOT_HEADER.size
+
+    with pytest.raises(ValueError, match="tronqué"):
+        decode_snapshot(data[:header_size - 1])
+    with pytest.raises(ValueError, match="CRC"):
+        decode_snapshot(data[:-1])
+    flipped = bytearray(data)
+    flipped[-1] ^= 0xFF
+    with pytest.raises(ValueError, match="CRC"):
+        decode_snapshot(bytes(flipped))
+    with pytest.raises(ValueError, match="en-tête"):
+        decode_snapshot(b"XXXX" + data[4:])
+    newer = bytearray(data)
+    newer[4] = config_manager.SNAPSHOT_VERSION + 1
+    with pytest.raises(ValueError, match="version"):
+        decode_snapshot(bytes(newer))
+
+
+def test_saved_snapshot_is_reloaded(binary_snapshot, zlib_codec):
+    assert save_all_data(warnings={1: [{"reason": "spam"}]}, extraction_stats={"success": 2})
+    # global_data ne reste pas dans le JSON
+    assert "global_data" not in config_manager.load_config()
+
+    config_manager._clear_binary_snapshot_cache()
+    data = load_all_data()
+    assert data["warnings"][1] == [{"reason": "spam"}]
+    assert data["extraction_stats"]["success"] == 2
+
+
+@pytest.mark.parametrize("damage", ["truncate", "flip"])
+def test_damaged_snapshot_is_set_aside(binary_snapshot, zlib_codec, damage):
+    assert save_all_data(warnings={1: [{"reason": "spam"}]})
+    with open(config_manager.BINARY_SNAPSHOT_FILE, "rb") as f:
+        damaged = bytearray(f.read())
+    if damage == "truncate":
+        damaged = damaged[:len(damaged) // 2]
+    else:
+        damaged[-1] ^= 0xFF
+    with open(config_manager.BINARY_SNAPSHOT_FILE, "wb") as f:
+        f.write(damaged)
+
+    config_manager._clear_binary_snapshot_cache()
+    assert 1 not in load_all_data()["warnings"]
+    assert os.path.exists(f"{config_manager.BINARY_SNAPSHOT_FILE}.corrupt")
+
+    # La sauvegarde suivante écrit un snapshot valide sans toucher à la copie abîmée
+    assert save_all_data(warnings={2: [{"reason": "raid"}]})
+    config_manager._clear_binary_snapshot_cache()
+    assert load_all_data()["warnings"][2] == [{"reason": "raid"}]
+    with open(f"{config_manager.BINARY_SNAPSHOT_FILE}.corrupt", "rb") as f:
+        assert f.read() == bytes(damaged)
@@ -0,0 +1,50 @@
+"""
+Tests du cache de configuration : copies rendues aux appelants, écriture avant mise à jour
+"""
+import pytest
+
+import config_manager
+from config_manager import (
+    load_config, get_guild_config, update_guild_config, get_security_settings
+)
+
+
+def test_load_config_returns_a_copy(isolated_config):
+    get_guild_config(1)
+    config = load_config()
+    config["1"]["security_settings"]["enabled"] = True
+    assert load_config()["1"]["security_settings"]["enabled"] is False
+
+
+def test_guild_config_copy_does_not_leak_into_cache(isolated_config):
+    guild_config = get_guild_config(1)
+    guild_config["bot_settings"]["prefix"] = "?"
+    assert get_guild_config(1)["bot_settings"]["prefix"] == "/"
+
+
+def test_update_is_applied_only_after_successful_write(isolated_config, monkeypatch):
+    get_guild_config(1)
+    atomic_write_json = config_manager._atomic_write_json
+
+    def failing_write(*args, **kwargs):
+        raise OSError("disque plein")
+
+    monkeypatch.setattr(config_manager, "_atomic_write_json", failing_write)
+    assert not update_guild_config(1, "security_settings", "enabled", True)
+    assert get_guild_config(1)["security_settings"]["enabled"] is False
+    assert get_security_settings(1).enabled is False
+
+    monkeypatch.setattr(config_manager, "_atomic_write_json", atomic_write_json)
+    assert update_guild_config(1, "security_settings", "enabled", True)
+    assert get_security_settings(1).enabled is True
+    config_manager.invalidate_config_cache()
+    assert get_guild_config(1)["security_settings"]["enabled"] is True
+
+
+def test_settings_records_are_read_only(isolated_config):
+    settings = get_security_settings(1)
+    with pytest.raises(AttributeError):
+        settings.raid_mode = True
+    with pytest.raises(AttributeError):
+        settings["enabled"] = True
+    assert settings.raid_mode is False
@@ -0,0 +1,72 @@
+"""
+Tests du schéma versionné : migration v1 → v2 au chargement et estampille schema_version
+"""
+import json
+
+import config_manager
+import sqlite_storage
+from config_manager import load_config, get_security_settings, get_bot_settings, migrate_guild_config
+
+# Configuration écrite par une version sans schema_version
+V1_GUILD = {
+    "security_settings": {"enabled": "true", "max_messages_per_minute": "8"},
+    "bot_settings": None,
+    "voice_temp_settings": ["pas", "un", "dict"],
+}
+
+
+def write_config(config):
+    with open(config_manager.CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump(config, f)
+
+
+def read_config_file():
+    with open(config_manager.CONFIG_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_v1_config_is_migrated_on_load(isolated_config):
+    write_config({"1": V1_GUILD, "global_data": {"warnings": {}}})
+
+    guild = load_config()["1"]
+    assert guild["schema_version"] == config_manager.CONFIG_SCHEMA_VERSION
+    # Sections invalides remplacées, puis complétées par les valeurs par défaut
+    for record_cls in config_manager.SETTINGS_RECORDS:
+        assert set(guild[record_cls.SECTION]) == set(record_cls.DEFAULTS)
+    assert guild["bot_settings"] == config_manager.BotSettings.DEFAULTS
+    # Valeurs existantes gardées, ramenées au type de leur défaut
+    assert guild["security_settings"]["enabled"] is True
+    assert guild["security_settings"]["max_messages_per_minute"] == 8
+    assert get_security_settings(1).max_messages_per_minute == 8
+    assert get_bot_settings(1).prefix == "/"
+
+    # Migration écrite une fois dans le fichier ; global_data n'est pas une configuration de serveur
+    on_disk = read_config_file()
+    assert on_disk["1"] == guild
+    assert on_disk["global_data"] == {"warnings": {}}
+
+
+def test_current_config_is_left_unchanged(isolated_config):
+    guild = config_manager.create_default_guild_config()
+    assert guild["schema_version"] == config_manager.CONFIG_SCHEMA_VERSION
+    assert not migrate_guild_config(guild)
+
+
+def test_every_older_version_has_a_migration():
+    for version in range(1, config_manager.CONFIG_SCHEMA_VERSION):
+        assert version in config_manager.SCHEMA_MIGRATIONS
+
+
+def test_v1_row_is_migrated_on_first_read_with_sqlite(isolated_config):
+    sqlite_storage.close()
+    try:
+        assert config_manager.set_storage_backend("sqlite", migrate=False)
+        assert sqlite_storage.save_guild_config(1, json.loads(json.dumps(V1_GUILD)))
+        sqlite_storage.clear_cache()
+
+        assert get_security_settings(1).enabled is True
+        row = sqlite_storage.load_guild_config(1)
+        assert row["schema_version"] == config_manager.CONFIG_SCHEMA_VERSION
+        assert set(row["voice_temp_settings"]) == set(config_manager.VoiceTempSettings.DEFAULTS)
+    finally:
+        sqlite_storage.close()
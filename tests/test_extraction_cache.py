@@ -0,0 +1,163 @@
+"""
+Tests du cache d'extraction et des coupe-circuits (horloge simulée)
+"""
+import types
+
+import pytest
+
+import extraction_cache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(extraction_cache, "time", types.SimpleNamespace(time=fake.time))
+    monkeypatch.setattr(extraction_cache, "_ENTRIES", extraction_cache.OrderedDict())
+    monkeypatch.setattr(extraction_cache, "_FAILURES", extraction_cache.OrderedDict())
+    monkeypatch.setattr(extraction_cache, "_BREAKERS", {})
+    monkeypatch.setattr(extraction_cache, "CIRCUIT_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(extraction_cache, "CIRCUIT_COOLDOWN", 60.0)
+    return fake
+
+
+def trip(source_type="youtube"):
+    for _ in range(extraction_cache.CIRCUIT_FAILURE_THRESHOLD):
+        extraction_cache.record_circuit_result(source_type, False)
+
+
+def test_content_errors_are_not_outages():
+    assert extraction_cache.classify_error("ERROR: [youtube] abc: Video unavailable") == "content"
+    assert extraction_cache.classify_error("ERROR: [youtube] abc: Private video. Sign in if you've been granted access") == "content"
+    assert extraction_cache.classify_error("ERROR: [youtube] abc: Sign in to confirm you're not a bot") == "extractor"
+    assert extraction_cache.classify_error("ERROR: Unable to download API page: HTTP Error 429: Too Many Requests") == "extractor"
+
+    assert extraction_cache.is_extractor_outage(["extractor", "extractor"])
+    assert not extraction_cache.is_extractor_outage(["extractor", "content"])
+    assert not extraction_cache.is_extractor_outage(["extractor", "timeout"])
+    assert not extraction_cache.is_extractor_outage([])
+
+
+def test_breaker_opens_at_threshold(clock):
+    extraction_cache.record_circuit_result("youtube", False)
+    extraction_cache.record_circuit_result("youtube", False)
+    assert not extraction_cache.circuit_open("youtube")
+    assert extraction_cache.circuit_admit("youtube") == (True, None)
+
+    extraction_cache.record_circuit_result("youtube", False)
+    assert extraction_cache.circuit_open("youtube")
+    assert extraction_cache.circuit_admit("youtube") == (False, None)
+    assert extraction_cache.circuit_retry_in("youtube") == 60.0
+    # Les autres extracteurs ne sont pas concernés
+    assert not extraction_cache.circuit_open("soundcloud")
+
+
+def test_half_open_admits_a_single_probe(clock):
+    trip()
+    clock.now += 61
+
+    assert not extraction_cache.circuit_open("youtube")
+    admitted, probe = extraction_cache.circuit_admit("youtube")
+    assert admitted and probe
+    # Essai en cours : personne d'autre ne passe
+    assert extraction_cache.circuit_open("youtube")
+    assert extraction_cache.circuit_admit("youtube") == (False, None)
+
+    extraction_cache.record_circuit_result("youtube", True)
+    assert not extraction_cache.circuit_open("youtube")
+    assert extraction_cache.circuit_admit("youtube") == (True, None)
+    assert extraction_cache.circuit_status()[0]["state"] == "closed"
+
+
+def test_failed_probe_reopens(clock):
+    trip()
+    clock.now += 61
+    extraction_cache.circuit_admit("youtube")
+
+    extraction_cache.record_circuit_result("youtube", False)
+    assert extraction_cache.circuit_open("youtube")
+    assert extraction_cache.circuit_retry_in("youtube") == 60.0
+    assert extraction_cache.circuit_status()[0]["trips"] == 2
+
+
+def test_released_probe_lets_the_next_extraction_try(clock):
+    trip()
+    clock.now += 61
+    _, first = extraction_cache.circuit_admit("youtube")
+    extraction_cache.release_circuit_probe("youtube", first)
+
+    admitted, second = extraction_cache.circuit_admit("youtube")
+    assert admitted and second
+    # Un ancien jeton ne libère pas l'essai suivant
+    clock.now += 1
+    extraction_cache.release_circuit_probe("youtube", first)
+    assert extraction_cache.circuit_open("youtube")
+
+
+def test_lost_probe_expires(clock):
+    trip()
+    clock.now += 61
+    extraction_cache.circuit_admit("youtube")
+    clock.now += 61
+    admitted, probe = extraction_cache.circuit_admit("youtube")
+    assert admitted and probe
+
+
+def test_cache_is_lru_bounded(clock, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "CACHE_MAX", 2)
+    extraction_cache.store("a", "youtube", {"title": "A"})
+    extraction_cache.store("b", "youtube", {"title": "B"})
+    # Lecture de "a" : "b" devient le moins récent
+    assert extraction_cache.get_cached("a", "youtube")["title"] == "A"
+    extraction_cache.store("c", "youtube", {"title": "C"})
+
+    assert extraction_cache.get_cached("b", "youtube") is None
+    assert extraction_cache.get_cached("a", "youtube")["title"] == "A"
+    assert extraction_cache.cache_size() == 2
+
+
+def test_query_normalization():
+    assert extraction_cache.normalize_query("  Daft   Punk ", "youtube") == ("daft punk", "youtube")
+    # Les identifiants d'URL sont sensibles à la casse
+    assert extraction_cache.normalize_query("https://youtu.be/AbC", "youtube") == ("https://youtu.be/AbC", "youtube")
+
+
+def test_stream_url_expires_before_metadata(clock):
+    expires = int(clock.now) + 600
+    extraction_cache.store("a", "youtube", {"title": "A", "url": f"https://cdn/videoplayback?expire={expires}&x=1"})
+    extraction_cache.store("b", "youtube", {"title": "B", "url": "https://cdn/no-expiry"})
+
+    assert extraction_cache.get_cached("a", "youtube")["url"].startswith("https://cdn/")
+    # Sans expiration connue, l'URL n'est jamais réutilisée
+    assert extraction_cache.get_cached("b", "youtube") == {"title": "B", "url": None}
+
+    # Dans la marge avant expiration : métadonnées seules
+    clock.now = expires - extraction_cache.STREAM_URL_EXPIRY_MARGIN
+    assert extraction_cache.get_cached("a", "youtube") == {"title": "A", "url": None}
+
+    clock.now += extraction_cache.CACHE_TTL + 1
+    assert extraction_cache.get_cached("a", "youtube") is None
+    assert extraction_cache.cache_size() == 1
+
+
+def test_negative_cache_expires_and_is_bounded(clock, monkeypatch):
+    monkeypatch.setattr(extraction_cache, "CACHE_MAX", 2)
+    extraction_cache.record_failure("a", "youtube")
+    assert extraction_cache.is_known_failure("A ", "youtube")
+    assert not extraction_cache.is_known_failure("a", "soundcloud")
+
+    clock.now += extraction_cache.NEGATIVE_CACHE_TTL + 1
+    assert not extraction_cache.is_known_failure("a", "youtube")
+    assert extraction_cache.failure_count() == 0
+
+    for query in ("a", "b", "c"):
+        extraction_cache.record_failure(query, "youtube")
+    assert not extraction_cache.is_known_failure("a", "youtube")
+    assert extraction_cache.failure_count() == 2
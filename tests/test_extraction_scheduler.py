@@ -0,0 +1,130 @@
+"""
+Tests de l'ordonnanceur d'extraction : priorité, tourniquet entre serveurs, statistiques
+"""
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+import extraction_scheduler
+from extraction_scheduler import PRIORITY_PLAY, PRIORITY_PREFETCH
+
+
+@pytest.fixture(autouse=True)
+def fresh_scheduler(monkeypatch):
+    monkeypatch.setattr(extraction_scheduler, "_WAITING", {PRIORITY_PLAY: OrderedDict(), PRIORITY_PREFETCH: OrderedDict()})
+    monkeypatch.setattr(extraction_scheduler, "_RUNNING", 0)
+    monkeypatch.setattr(extraction_scheduler, "_STATS", {
+        "scheduled": 0, "queued": 0, "promoted": 0, "max_queue_depth": 0, "total_wait": 0.0
+    })
+    monkeypatch.setattr(extraction_scheduler, "MAX_CONCURRENT", 1)
+
+
+async def occupy():
+    """Prendre l'unique place : les demandes suivantes attendent"""
+    await extraction_scheduler.acquire_slot(extraction_scheduler.new_request("busy", PRIORITY_PLAY))
+
+
+async def enqueue(order, guild_id, priority, label):
+    """Demande qui note son passage puis rend sa place au suivant"""
+    request = extraction_scheduler.new_request(guild_id, priority)
+    task = asyncio.create_task(extraction_scheduler.acquire_slot(request))
+
+    def served(task):
+        if not task.cancelled():
+            order.append(label)
+            extraction_scheduler.release_slot()
+
+    task.add_done_callback(served)
+    await asyncio.sleep(0)
+    return request, task
+
+
+def test_guilds_are_served_round_robin():
+    async def scenario():
+        await occupy()
+        order = []
+        tasks = []
+        for label in ("a1", "a2", "a3"):
+            tasks.append((await enqueue(order, "a", PRIORITY_PLAY, label))[1])
+        for label in ("b1", "b2"):
+            tasks.append((await enqueue(order, "b", PRIORITY_PLAY, label))[1])
+        tasks.append((await enqueue(order, "c", PRIORITY_PLAY, "c1"))[1])
+
+        extraction_scheduler.release_slot()
+        await asyncio.gather(*tasks)
+        # Un serveur avec une longue file n'affame pas les autres
+        assert order == ["a1", "b1", "c1", "a2", "b2", "a3"]
+
+    asyncio.run(scenario())
+
+
+def test_play_requests_preempt_prefetch():
+    async def scenario():
+        await occupy()
+        order = []
+        tasks = [
+            (await enqueue(order, "a", PRIORITY_PREFETCH, "a-prefetch"))[1],
+            (await enqueue(order, "b", PRIORITY_PREFETCH, "b-prefetch"))[1],
+            (await enqueue(order, "c", PRIORITY_PLAY, "c-play"))[1],
+            (await enqueue(order, "a", PRIORITY_PLAY, "a-play"))[1],
+        ]
+
+        extraction_scheduler.release_slot()
+        await asyncio.gather(*tasks)
+        assert order == ["c-play", "a-play", "a-prefetch", "b-prefetch"]
+
+    asyncio.run(scenario())
+
+
+def test_promoted_request_moves_to_the_play_queue():
+    async def scenario():
+        await occupy()
+        order = []
+        _, first = await enqueue(order, "a", PRIORITY_PREFETCH, "a-prefetch")
+        request, promoted = await enqueue(order, "b", PRIORITY_PREFETCH, "b-prefetch")
+
+        # Préchargement devenu "jouer maintenant"
+        extraction_scheduler.raise_priority(request, PRIORITY_PLAY)
+        assert extraction_scheduler.queue_depth(PRIORITY_PLAY) == 1
+        assert extraction_scheduler.queue_depth(PRIORITY_PREFETCH) == 1
+
+        extraction_scheduler.release_slot()
+        await asyncio.gather(first, promoted)
+        assert order == ["b-prefetch", "a-prefetch"]
+        assert extraction_scheduler.scheduler_status()["promoted"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_queue_depth_stats():
+    async def scenario():
+        await occupy()
+        order = []
+        tasks = [
+            (await enqueue(order, "a", PRIORITY_PLAY, "a1"))[1],
+            (await enqueue(order, "a", PRIORITY_PREFETCH, "a2"))[1],
+            (await enqueue(order, "b", PRIORITY_PREFETCH, "b1"))[1],
+        ]
+        status = extraction_scheduler.scheduler_status()
+        assert status["running"] == 1
+        assert (status["waiting_play"], status["waiting_prefetch"]) == (1, 2)
+        assert status["max_queue_depth"] == 3
+
+        # Une demande annulée pendant l'attente quitte la file sans prendre de place
+        tasks[2].cancel()
+        await asyncio.sleep(0)
+        assert extraction_scheduler.queue_depth() == 2
+
+        await asyncio.sleep(0.05)
+        extraction_scheduler.release_slot()
+        await asyncio.gather(*tasks[:2])
+
+        status = extraction_scheduler.scheduler_status()
+        assert status["running"] == 0
+        assert extraction_scheduler.queue_depth() == 0
+        assert status["scheduled"] == 4 and status["queued"] == 3
+        assert status["max_queue_depth"] == 3
+        assert status["average_wait"] > 0
+
+    asyncio.run(scenario())
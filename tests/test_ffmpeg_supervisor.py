@@ -0,0 +1,69 @@
+"""
+Tests du superviseur FFmpeg avec de simples processus Python à la place de FFmpeg
+"""
+import asyncio
+import subprocess
+import sys
+import time
+
+import pytest
+
+import ffmpeg_supervisor
+
+SLEEPER = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_supervisor(monkeypatch):
+    monkeypatch.setattr(ffmpeg_supervisor, "_RECORDS", {})
+    monkeypatch.setattr(ffmpeg_supervisor, "_DYING", [])
+    monkeypatch.setattr(ffmpeg_supervisor, "_WAITERS", ffmpeg_supervisor.deque())
+    monkeypatch.setattr(ffmpeg_supervisor, "_SLOTS_IN_USE", 0)
+    monkeypatch.setattr(ffmpeg_supervisor, "_IS_ACTIVE", None)
+    monkeypatch.setattr(ffmpeg_supervisor, "MAX_PROCESSES", 1)
+    monkeypatch.setattr(ffmpeg_supervisor, "_STATS", {"started": 0, "queued": 0, "reaped": 0, "total_wait": 0.0})
+
+
+class FakeSource:
+    """Source discord.py réduite à son Popen"""
+
+    def __init__(self):
+        self._process = subprocess.Popen(SLEEPER)
+
+
+def test_close_source_kills_without_waiting():
+    async def scenario():
+        source = await ffmpeg_supervisor.open_source("1", "titre", "track", FakeSource)
+        started = time.perf_counter()
+        ffmpeg_supervisor.close_source(source)
+        assert time.perf_counter() - started < 0.5
+        assert ffmpeg_supervisor.supervisor_status()["running"] == 0
+
+        # Récupéré par poll au passage suivant du superviseur
+        source._process.wait(5)
+        ffmpeg_supervisor._reap(time.time())
+        assert ffmpeg_supervisor.supervisor_status()["dying"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_download_process_shares_the_cap():
+    async def scenario():
+        process = await ffmpeg_supervisor.open_process(
+            "cache", "titre", "download", lambda: asyncio.create_subprocess_exec(*SLEEPER)
+        )
+        status = ffmpeg_supervisor.supervisor_status()
+        assert status["running"] == 1 and status["downloads"] == 1
+
+        # Plafond atteint : une lecture attend que le téléchargement rende sa place
+        waiting = asyncio.create_task(ffmpeg_supervisor.open_source("1", "titre", "track", FakeSource))
+        await asyncio.sleep(0.05)
+        assert ffmpeg_supervisor.supervisor_status()["waiting"] == 1
+
+        ffmpeg_supervisor.close_source(process)
+        source = await asyncio.wait_for(waiting, 5)
+        assert await process.wait() != 0
+        ffmpeg_supervisor.close_source(source)
+        source._process.wait(5)
+
+    asyncio.run(scenario())
@@ -0,0 +1,90 @@
+"""
+Tests du journal des mutations : rejeu, compaction et numéro de copie des sections
+"""
+import asyncio
+import json
+
+import config_manager
+from config_manager import (
+    load_all_data, record_journal, mark_dirty, flush_pending_saves, compact_journal, save_all_data,
+    arecord_journal_deletes
+)
+
+
+def journal_lines():
+    with open(config_manager.JOURNAL_FILE, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def test_replay_applies_appends_sets_and_deletes(isolated_config):
+    record_journal("warnings", 1, "append", {"reason": "a"})
+    record_journal("warnings", 1, "append", {"reason": "b"})
+    record_journal("join_tracker", 2, "set", ["2026-01-01T00:00:00"])
+    record_journal("join_tracker", 3, "set", ["2026-01-01T00:00:00"])
+    record_journal("join_tracker", 3, "delete")
+
+    data = load_all_data()
+    assert [warn["reason"] for warn in data["warnings"][1]] == ["a", "b"]
+    assert len(data["join_tracker"][2]) == 1
+    assert 3 not in data["join_tracker"]
+
+
+def test_compaction_folds_journal_into_snapshot(isolated_config):
+    for reason in ("a", "b", "c"):
+        record_journal("warnings", 1, "append", {"reason": reason})
+
+    assert compact_journal()
+    assert journal_lines() == []
+    data = load_all_data()
+    assert [warn["reason"] for warn in data["warnings"]["1"]] == ["a", "b", "c"]
+
+
+def test_flushed_copy_keeps_later_journal_entries(isolated_config):
+    warnings = load_all_data()["warnings"]
+    warnings[1].append({"reason": "a"})
+    record_journal("warnings", 1, "append", {"reason": "a"})
+    mark_dirty(warnings=warnings)
+
+    # Mutation journalisée après la copie mais avant son écriture
+    warnings[1].append({"reason": "b"})
+    record_journal("warnings", 1, "append", {"reason": "b"})
+    assert flush_pending_saves()
+
+    data = load_all_data()
+    assert [warn["reason"] for warn in data["warnings"][1]] == ["a", "b"]
+
+
+def test_compaction_keeps_entries_needed_by_pending_copy(isolated_config):
+    warnings = load_all_data()["warnings"]
+    warnings[1].append({"reason": "a"})
+    record_journal("warnings", 1, "append", {"reason": "a"})
+    mark_dirty(warnings=warnings)
+    warnings[1].append({"reason": "b"})
+    record_journal("warnings", 1, "append", {"reason": "b"})
+
+    assert compact_journal()
+    assert [record["value"]["reason"] for record in journal_lines()] == ["b"]
+    assert flush_pending_saves()
+
+    data = load_all_data()
+    assert [warn["reason"] for warn in data["warnings"][1]] == ["a", "b"]
+
+
+def test_saving_other_sections_does_not_skip_journal(isolated_config):
+    record_journal("warnings", 1, "append", {"reason": "a"})
+    assert save_all_data(loop_modes={"5": "queue"})
+
+    data = load_all_data()
+    assert [warn["reason"] for warn in data["warnings"][1]] == ["a"]
+    assert data["loop_modes"][5] == "queue"
+
+
+def test_batched_deletes_are_replayed(isolated_config):
+    record_journal("message_tracker", 1, "set", ["2026-01-01T00:00:00"])
+    record_journal("message_tracker", 2, "set", ["2026-01-01T00:00:00"])
+    record_journal("message_tracker", 3, "set", ["2026-01-01T00:00:00"])
+
+    assert asyncio.run(arecord_journal_deletes("message_tracker", [1, 3]))
+    assert [record["op"] for record in journal_lines()[-2:]] == ["delete", "delete"]
+    tracker = load_all_data()["message_tracker"]
+    assert list(tracker) == [2]
@@ -0,0 +1,72 @@
+"""
+Tests de LazySectionDict : conversion à la demande et clés canoniques
+"""
+import json
+from collections import deque
+
+from config_manager import LazySectionDict
+
+
+def test_entries_are_converted_on_first_access():
+    section = LazySectionDict({"1": [1, 2], "2": [3]}, convert=deque)
+    assert section.pending_count() == 2
+    assert section[1] == deque([1, 2])
+    assert section.pending_count() == 1
+    assert len(section) == 2
+
+
+def test_int_and_str_keys_designate_the_same_entry():
+    section = LazySectionDict({"1": ["a"]}, convert=list)
+    list(section.values())
+    assert "1" in section and 1 in section
+    section["1"] = ["b"]
+    assert section[1] == ["b"]
+    assert list(section.keys()) == [1]
+
+
+def test_default_factory_uses_canonical_key():
+    section = LazySectionDict(default_factory=list)
+    section["5"].append("x")
+    assert 5 in section
+    assert section.get(5) == ["x"]
+    assert section.pop("5") == ["x"]
+    assert 5 not in section
+
+
+def test_delete_and_setdefault_with_either_key_type():
+    section = LazySectionDict({"7": "raw", "8": "raw"})
+    del section[7]
+    assert "7" not in section
+    assert section.setdefault("8", "other") == "raw"
+    section[9] = "new"
+    del section["9"]
+    assert len(section) == 1
+
+
+def test_non_numeric_keys_stay_text():
+    section = LazySectionDict({"abc": 1})
+    assert section["abc"] == 1
+    assert list(section) == ["abc"]
+
+
+def test_snapshot_round_trip_has_no_duplicate_keys():
+    section = LazySectionDict({"1": [1], "2": [2], "3": [3]}, convert=deque)
+    list(section.values())
+    section["1"] = deque([10])
+    section[4] = deque([4])
+    # "2" reste converti, "3" jamais relu après une nouvelle section
+    encoded = json.dumps(section.snapshot())
+    pairs = json.loads(encoded, object_pairs_hook=lambda items: items)
+    keys = [key for key, _ in pairs]
+    assert sorted(keys) == ["1", "2", "3", "4"]
+
+    reloaded = LazySectionDict(json.loads(encoded), convert=deque)
+    assert reloaded[1] == deque([10])
+    assert reloaded["4"] == deque([4])
+
+
+def test_snapshot_keeps_untouched_raw_entries():
+    section = LazySectionDict({"1": [1], "2": [2]}, convert=deque)
+    section[1].append(5)
+    assert section.snapshot() == {"1": [1, 5], "2": [2]}
+    assert section.pending_count() == 1
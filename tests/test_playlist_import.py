@@ -0,0 +1,125 @@
+"""
+Tests de l'import de playlists : lignes --flat-playlist et ajout à la file au fil de l'eau
+"""
+import asyncio
+import json
+from collections import deque
+
+import pytest
+
+import playlist_import
+from playlist_import import flat_playlist_entry
+
+
+def line(**entry):
+    return json.dumps(entry).encode("utf-8") + b"\n"
+
+
+def test_flat_playlist_lines():
+    assert flat_playlist_entry(line(id="abc", url="https://www.youtube.com/watch?v=abc", title="A")) == (
+        "https://www.youtube.com/watch?v=abc", "youtube", "A"
+    )
+    # Sans URL exploitable : reconstruite depuis l'identifiant, le titre retombe sur l'URL
+    assert flat_playlist_entry(line(id="xyz", url="xyz", title=None)) == (
+        "https://www.youtube.com/watch?v=xyz", "youtube", "https://www.youtube.com/watch?v=xyz"
+    )
+    assert flat_playlist_entry(line(title="sans identifiant")) is None
+    assert flat_playlist_entry(b"WARNING: pas du JSON\n") is None
+    assert flat_playlist_entry(b"null\n") is None
+
+
+class Recorder:
+    """Callbacks d'ingest() : démarrages de lecture, préchargements et sauvegardes"""
+
+    def __init__(self, queue):
+        self.queue = queue
+        self.events = []
+
+    def start_playback(self):
+        self.events.append(("play", len(self.queue)))
+
+    def schedule_prefetch(self):
+        self.events.append(("prefetch", len(self.queue)))
+
+    async def save(self):
+        self.events.append(("save", len(self.queue)))
+
+
+async def source(count, fail_after=None, gate=None):
+    for index in range(count):
+        if index == fail_after:
+            raise RuntimeError("yt-dlp arrêté")
+        if gate is not None and index == 1:
+            await gate.wait()
+        yield (f"https://www.youtube.com/watch?v={index}", "youtube", f"titre {index}")
+
+
+def ingest(recorder, entries, playing=False):
+    return playlist_import.ingest(
+        recorder.queue, entries, "playlist", playing,
+        recorder.start_playback, recorder.schedule_prefetch, recorder.save, prefetch_depth=2
+    )
+
+
+def test_first_entry_starts_playback_before_the_rest_arrives():
+    async def scenario():
+        recorder = Recorder(deque())
+        gate = asyncio.Event()
+        task = asyncio.create_task(ingest(recorder, source(3, gate=gate)))
+        await asyncio.sleep(0.01)
+        # La liste n'est pas finie que la lecture est déjà lancée
+        assert recorder.events == [("play", 1)]
+
+        gate.set()
+        assert await task == 3
+        # Les titres arrivés dans les premières places sont préchargés
+        assert recorder.events == [("play", 1), ("prefetch", 2)]
+
+    asyncio.run(scenario())
+
+
+def test_playing_queue_only_prefetches(monkeypatch):
+    monkeypatch.setattr(playlist_import, "SAVE_EVERY", 2)
+
+    async def scenario():
+        recorder = Recorder(deque())
+        assert await ingest(recorder, source(4), playing=True) == 4
+        assert recorder.events == [("prefetch", 1), ("prefetch", 2), ("save", 2), ("save", 4)]
+
+    asyncio.run(scenario())
+
+
+def test_source_error_keeps_added_entries():
+    async def scenario():
+        recorder = Recorder(deque())
+        assert await ingest(recorder, source(5, fail_after=2)) == 2
+        assert [entry[2] for entry in recorder.queue] == ["titre 0", "titre 1"]
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_import_closes_its_source():
+    closed = []
+
+    async def endless():
+        try:
+            index = 0
+            while True:
+                yield (f"https://www.youtube.com/watch?v={index}", "youtube", str(index))
+                index += 1
+                await asyncio.sleep(0.01)
+        finally:
+            # Ici, le processus yt-dlp serait tué
+            closed.append(True)
+
+    async def scenario():
+        recorder = Recorder(deque())
+        task = asyncio.create_task(ingest(recorder, endless()))
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert closed == [True]
+        assert recorder.events[0] == ("play", 1)
+
+    asyncio.run(scenario())
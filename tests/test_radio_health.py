@@ -0,0 +1,68 @@
+"""
+Tests du classement des radios avec une fausse sonde (aucun accès réseau)
+"""
+import asyncio
+
+import pytest
+
+import radio_health
+
+STATIONS = [
+    {"name": "A", "url": "http://a"},
+    {"name": "B", "url": "http://b"},
+    {"name": "C", "url": "http://c"},
+    {"name": "D", "url": "http://d"},
+]
+
+
+@pytest.fixture(autouse=True)
+def fresh_health(monkeypatch):
+    monkeypatch.setattr(radio_health, "_HEALTH", {})
+
+
+def fake_probe(results):
+    """Sonde simulée : {url: TTFB, None (muette) ou exception}"""
+    async def probe(url, timeout):
+        result = results[url]
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return probe
+
+
+def names(stations):
+    return [station["name"] for station in stations]
+
+
+def test_fastest_first_unmeasured_last():
+    probe = fake_probe({"http://a": 0.8, "http://b": 0.2, "http://c": 0.5})
+    asyncio.run(radio_health.probe_all(STATIONS[:3], probe))
+
+    assert names(radio_health.ranked_stations(STATIONS)) == ["B", "C", "A", "D"]
+
+
+def test_station_dies_after_consecutive_failures_and_recovers():
+    failing = fake_probe({"http://a": None, "http://b": 0.3, "http://c": OSError("refusé"), "http://d": 0.1})
+    asyncio.run(radio_health.probe_all(STATIONS, failing))
+
+    # Un échec : toujours classée, mais derrière les stations qui répondent
+    assert not radio_health.is_dead("http://a")
+    assert names(radio_health.ranked_stations(STATIONS)) == ["D", "B", "A", "C"]
+
+    asyncio.run(radio_health.probe_all(STATIONS, failing))
+    assert radio_health.is_dead("http://a")
+    assert radio_health.is_dead("http://c")
+    assert names(radio_health.ranked_stations(STATIONS)) == ["D", "B"]
+
+    # Une sonde réussie la remet en service
+    asyncio.run(radio_health.probe_station(STATIONS[0], fake_probe({"http://a": 0.05})))
+    assert not radio_health.is_dead("http://a")
+    assert names(radio_health.ranked_stations(STATIONS)) == ["A", "D", "B"]
+
+
+def test_playback_failures_count_like_probe_failures():
+    radio_health.record_failure("http://b", "flux vide")
+    assert not radio_health.is_dead("http://b")
+    radio_health.record_failure("http://b", "flux interrompu")
+    assert radio_health.is_dead("http://b")
+    assert "B" not in names(radio_health.ranked_stations(STATIONS))
@@ -0,0 +1,134 @@
+"""
+Tests du backend SQLite : lignes par serveur et par enregistrement, migration JSON, journal
+"""
+import json
+
+import pytest
+
+import config_manager
+import sqlite_storage
+from config_manager import load_all_data, record_journal, compact_journal
+
+
+@pytest.fixture
+def sqlite_backend(isolated_config):
+    """Base SQLite neuve dans le dossier temporaire (backend choisi par chaque test)"""
+    sqlite_storage.close()
+    yield isolated_config
+    sqlite_storage.close()
+
+
+def reopen():
+    """Fermer la connexion et oublier les lignes en mémoire : tout est relu depuis le fichier"""
+    sqlite_storage.close()
+
+
+def test_global_sections_round_trip(sqlite_backend):
+    sections = {
+        "warnings": {1: [{"reason": "spam"}]},
+        "song_queues": {"42": [{"title": "A"}]},
+        "extraction_stats": {"success": 3, "failed": 1},
+    }
+    assert sqlite_storage.save_global_sections(sections, journal_seq={"warnings": 7})
+    reopen()
+
+    data = sqlite_storage.load_global_data()
+    assert data["warnings"] == {"1": [{"reason": "spam"}]}
+    assert data["song_queues"] == {"42": [{"title": "A"}]}
+    # Sections sans table dédiée : une ligne par clé dans global_records
+    assert data["extraction_stats"] == {"success": 3, "failed": 1}
+    assert data["journal_seq"] == {"warnings": 7}
+    assert "last_save" in data
+
+
+def test_only_changed_rows_are_rewritten(sqlite_backend):
+    conn = sqlite_storage.get_connection()
+    with conn:
+        assert sqlite_storage._save_section(conn, "warnings", {1: ["a"], 2: ["b"]}, "t0") == 2
+    with conn:
+        # Une ligne modifiée, une supprimée, une inchangée
+        assert sqlite_storage._save_section(conn, "warnings", {1: ["a", "c"]}, "t1") == 2
+    with conn:
+        assert sqlite_storage._save_section(conn, "warnings", {1: ["a", "c"]}, "t2") == 0
+
+    rows = conn.execute("SELECT record_key, updated_at FROM warnings").fetchall()
+    assert rows == [("1", "t1")]
+
+
+def test_guild_rows(sqlite_backend):
+    assert config_manager.set_storage_backend("sqlite", migrate=False)
+    assert sqlite_storage.save_guild_config(1, {"bot_settings": {"prefix": "!"}})
+    assert sqlite_storage.save_guild_config(2, {"bot_settings": {"prefix": "?"}})
+    reopen()
+
+    assert sorted(sqlite_storage.list_guild_ids()) == [1, 2]
+    assert sqlite_storage.load_guild_config(2) == {"bot_settings": {"prefix": "?"}}
+    assert sqlite_storage.delete_guild_config(1)
+    assert sqlite_storage.load_guild_config(1) is None
+    assert sqlite_storage.list_guild_ids() == [2]
+
+
+def test_existing_json_is_migrated_once(sqlite_backend):
+    legacy = {
+        "123": {"bot_settings": {"prefix": "!"}},
+        "global_data": {
+            "warnings": {"5": [{"reason": "spam"}]},
+            "raid_protection": {"123": {"enabled": True}},
+            "journal_seq": {"warnings": 4},
+        },
+    }
+    with open(config_manager.CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump(legacy, f)
+
+    assert config_manager.set_storage_backend("sqlite")
+    assert sqlite_storage.list_guild_ids() == [123]
+    data = sqlite_storage.load_global_data()
+    assert data["warnings"] == {"5": [{"reason": "spam"}]}
+    assert data["raid_protection"] == {"123": {"enabled": True}}
+    assert data["journal_seq"] == {"warnings": 4}
+
+    # Déjà migré : le JSON n'est plus relu, même modifié
+    legacy["456"] = {}
+    with open(config_manager.CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump(legacy, f)
+    assert not sqlite_storage.migrate_from_json(config_manager.CONFIG_FILE)
+    assert sqlite_storage.list_guild_ids() == [123]
+
+
+def test_journal_replays_over_sqlite(sqlite_backend):
+    assert config_manager.set_storage_backend("sqlite", migrate=False)
+    record_journal("warnings", 1, "append", {"reason": "a"})
+    record_journal("warnings", 1, "append", {"reason": "b"})
+    record_journal("join_tracker", 2, "set", ["2026-01-01T00:00:00"])
+
+    data = load_all_data()
+    assert [warn["reason"] for warn in data["warnings"][1]] == ["a", "b"]
+    assert len(data["join_tracker"][2]) == 1
+
+    # Section écrite avec son numéro de journal : les entrées déjà incluses ne sont pas rejouées
+    assert config_manager.save_all_data(warnings={1: [{"reason": "a"}, {"reason": "b"}]})
+    reopen()
+    data = load_all_data()
+    assert [warn["reason"] for warn in data["warnings"][1]] == ["a", "b"]
+
+    assert compact_journal()
+    reopen()
+    data = load_all_data()
+    assert [warn["reason"] for warn in data["warnings"][1]] == ["a", "b"]
+    assert sqlite_storage.load_global_data()["warnings"] == {"1": [{"reason": "a"}, {"reason": "b"}]}
+
+
+def test_export_import_round_trip(sqlite_backend):
+    config = {
+        "7": {"bot_settings": {"prefix": "!"}},
+        "global_data": {"warnings": {"1": ["a"]}, "method_stats": {"youtube": {"standard": 1}}},
+    }
+    assert sqlite_storage.import_config(config)
+    # L'import remplace l'existant
+    assert sqlite_storage.import_config(config)
+    reopen()
+
+    exported = sqlite_storage.export_config()
+    assert exported["7"] == config["7"]
+    assert exported["global_data"]["warnings"] == {"1": ["a"]}
+    assert exported["global_data"]["method_stats"] == {"youtube": {"standard": 1}}
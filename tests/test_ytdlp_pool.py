@@ -0,0 +1,152 @@
+"""
+Tests du pool yt-dlp avec un faux worker (yt_dlp n'est pas nécessaire)
+"""
+import asyncio
+import sys
+import textwrap
+
+import pytest
+
+import ytdlp_pool
+
+FAKE_WORKER = textwrap.dedent("""
+    import json, sys, time
+    print(json.dumps({"ready": True, "version": "fake"}), flush=True)
+    for line in sys.stdin:
+        job = json.loads(line)
+        if job["query"].startswith("ERROR"):
+            print(json.dumps({"id": job["id"], "info": None, "error": job["query"]}), flush=True)
+            continue
+        # La requête donne la durée de l'extraction simulée
+        time.sleep(float(job["query"]))
+        print(json.dumps({"id": job["id"], "info": {"title": job["query"]}}), flush=True)
+""")
+
+
+@pytest.fixture
+def fake_pool(tmp_path, monkeypatch):
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    monkeypatch.setattr(ytdlp_pool, "WORKER_SCRIPT", str(script))
+    monkeypatch.setattr(ytdlp_pool, "_STATS", {"killed": 0, "cancelled": 0, "discarded": 0})
+    spawned = []
+    spawn = ytdlp_pool._spawn_worker
+
+    async def recording_spawn():
+        process = await spawn()
+        spawned.append(process)
+        return process
+
+    monkeypatch.setattr(ytdlp_pool, "_spawn_worker", recording_spawn)
+    yield spawned
+    ytdlp_pool.shutdown_pool()
+
+
+async def stop_pool(spawned):
+    """Arrêter le pool et récupérer les workers avant la fermeture de l'event loop"""
+    ytdlp_pool.shutdown_pool()
+    await asyncio.sleep(0)
+    for process in spawned:
+        if process.returncode is None:
+            process.kill()
+        await process.wait()
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_cancelled_job_kills_and_respawns_worker(fake_pool):
+    async def scenario():
+        assert await ytdlp_pool.start_pool(1)
+        pid = ytdlp_pool._SLOTS[0]["process"].pid
+
+        loser = asyncio.create_task(ytdlp_pool.extract("5", {}, 10))
+        await asyncio.sleep(0.1)
+        loser.cancel()
+        # Le perdant n'occupe pas le slot jusqu'au bout : un nouveau worker prend la suite
+        info = await asyncio.wait_for(ytdlp_pool.extract("0", {}, 5), 3)
+        assert info == {"title": "0"}
+        assert ytdlp_pool._SLOTS[0]["process"].pid != pid
+        assert ytdlp_pool.pool_status()["cancelled"] == 1
+        await stop_pool(fake_pool)
+
+    run(scenario())
+
+
+def test_queued_cancelled_job_never_starts(fake_pool):
+    async def scenario():
+        assert await ytdlp_pool.start_pool(1)
+        started = []
+        busy = asyncio.create_task(ytdlp_pool.extract("0.2", {}, 5))
+        await asyncio.sleep(0.05)
+        loser = asyncio.create_task(ytdlp_pool.extract("5", {}, 10, on_start=lambda: started.append("loser")))
+        await asyncio.sleep(0.05)
+        loser.cancel()
+
+        assert await busy == {"title": "0.2"}
+        assert await ytdlp_pool.extract("0", {}, 5) == {"title": "0"}
+        assert started == []
+        assert ytdlp_pool.pool_status()["cancelled"] == 0
+        await stop_pool(fake_pool)
+
+    run(scenario())
+
+
+def test_higher_priority_jobs_are_served_first(fake_pool):
+    async def scenario():
+        assert await ytdlp_pool.start_pool(1)
+        order = []
+        busy = asyncio.create_task(ytdlp_pool.extract("0.2", {}, 5))
+        await asyncio.sleep(0.05)
+        assert ytdlp_pool.idle_workers() == 0
+
+        prefetch = asyncio.create_task(
+            ytdlp_pool.extract("0", {}, 5, priority=1, on_start=lambda: order.append("prefetch"))
+        )
+        play = asyncio.create_task(
+            ytdlp_pool.extract("0", {}, 5, priority=0, on_start=lambda: order.append("play"))
+        )
+        await asyncio.gather(busy, prefetch, play)
+        assert order == ["play", "prefetch"]
+        assert ytdlp_pool.idle_workers() == 1
+        await stop_pool(fake_pool)
+
+    run(scenario())
+
+
+def test_deadline_starts_when_worker_picks_up_job(fake_pool):
+    async def scenario():
+        assert await ytdlp_pool.start_pool(1)
+        first = asyncio.create_task(ytdlp_pool.extract("0.4", {}, 1))
+        # Attend 0.4 s dans la file : le délai de 0.5 s ne court pas encore
+        second = await ytdlp_pool.extract("0.2", {}, 0.5)
+        assert second == {"title": "0.2"}
+        assert await first == {"title": "0.4"}
+        assert ytdlp_pool.pool_status()["killed"] == 0
+        await stop_pool(fake_pool)
+
+    run(scenario())
+
+
+def test_overrun_kills_worker(fake_pool):
+    async def scenario():
+        assert await ytdlp_pool.start_pool(1)
+        with pytest.raises(asyncio.TimeoutError):
+            await ytdlp_pool.extract("5", {}, 0.2)
+        assert ytdlp_pool.pool_status()["killed"] == 1
+        await stop_pool(fake_pool)
+
+    run(scenario())
+
+
+def test_worker_error_is_raised_with_its_message(fake_pool):
+    async def scenario():
+        assert await ytdlp_pool.start_pool(1)
+        with pytest.raises(ytdlp_pool.ExtractionFailed, match="Video unavailable"):
+            await ytdlp_pool.extract("ERROR: [youtube] abc: Video unavailable", {}, 5)
+        # Le worker reste utilisable
+        assert await ytdlp_pool.extract("0", {}, 5) == {"title": "0"}
+        await stop_pool(fake_pool)
+
+    run(scenario())
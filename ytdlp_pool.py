@@ -0,0 +1,319 @@
+"""
+Pool de workers yt-dlp persistants pour l'extraction
+Chaque worker garde yt_dlp importé et une instance YoutubeDL par jeu d'options :
+une tentative ne paie plus le démarrage de l'interpréteur ni l'import des extracteurs.
+Lancé directement (python ytdlp_pool.py), ce fichier est le code du worker.
+"""
+import asyncio
+import json
+import logging
+import os
+import sys
+from typing import Dict, Any, Optional, List, Callable
+
+# Configuration du logging
+logger = logging.getLogger(__name__)
+
+# Script exécuté par chaque worker (ce fichier)
+WORKER_SCRIPT = os.path.abspath(__file__)
+
+# Nombre de workers par défaut
+POOL_SIZE = 3
+
+# Délai maximal pour qu'un worker importe yt_dlp et se déclare prêt
+WORKER_START_TIMEOUT = 30.0
+
+# Champs renvoyés par le worker (le JSON complet d'une vidéo pèse plusieurs centaines de Ko)
+WORKER_FIELDS = ("id", "title", "uploader", "duration", "url", "thumbnail", "webpage_url", "extractor_key", "acodec", "abr", "is_live")
+
+# Taille maximale d'une ligne de réponse
+WORKER_LINE_LIMIT = 1024 * 1024
+
+class PoolUnavailable(RuntimeError):
+    """Pool non démarré ou yt_dlp non importable : utiliser le chemin sous-processus"""
+
+class ExtractionFailed(RuntimeError):
+    """yt-dlp a signalé une erreur (message d'origine, pour distinguer vidéo indisponible et panne)"""
+
+# État du pool (event loop du bot uniquement)
+_JOB_QUEUE: Optional[asyncio.PriorityQueue] = None
+_SLOTS: List[Dict[str, Any]] = []
+_AVAILABLE = False
+_NEXT_JOB_ID = 0
+_STATS = {"killed": 0, "cancelled": 0, "discarded": 0}
+
+# ============================
+# CÔTÉ WORKER
+# ============================
+
+def _first_entry(info: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Résultat d'une recherche (ytsearch1:) : première entrée, comme --dump-json"""
+    while info and info.get("entries") is not None:
+        info = next((entry for entry in info["entries"] if entry), None)
+    return info
+
+class _ErrorLog:
+    """Logger yt-dlp du worker : garde les erreurs (avec ignoreerrors, extract_info renvoie None sans lever)"""
+
+    def __init__(self):
+        self.errors = []
+
+    def debug(self, message):
+        pass
+
+    def info(self, message):
+        pass
+
+    def warning(self, message):
+        pass
+
+    def error(self, message):
+        self.errors.append(message)
+
+def _worker_main() -> None:
+    """Boucle du worker : une requête JSON par ligne sur stdin, une réponse par ligne sur stdout"""
+    # Le canal du protocole est une copie de stdout ; ce que yt-dlp imprime part sur stderr
+    protocol = os.fdopen(os.dup(1), "w", encoding="utf-8", buffering=1)
+    os.dup2(2, 1)
+
+    try:
+        import yt_dlp
+    except ImportError as e:
+        protocol.write(json.dumps({"ready": False, "error": str(e)}) + "\n")
+        return
+
+    protocol.write(json.dumps({"ready": True, "version": yt_dlp.version.__version__}) + "\n")
+
+    # Une instance YoutubeDL par jeu d'options (initialisation des extracteurs faite une fois)
+    instances = {}
+    errors = _ErrorLog()
+    for line in sys.stdin:
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+
+        response = {"id": job.get("id"), "info": None}
+        try:
+            key = json.dumps(job["options"], sort_keys=True)
+            ydl = instances.get(key)
+            if ydl is None:
+                ydl = instances[key] = yt_dlp.YoutubeDL({**job["options"], "logger": errors})
+            errors.errors.clear()
+            info = _first_entry(ydl.extract_info(job["query"], download=False))
+            if info:
+                response["info"] = {field: info.get(field) for field in WORKER_FIELDS}
+            elif errors.errors:
+                response["error"] = errors.errors[-1][:500]
+        except Exception as e:
+            response["error"] = str(e)[:500]
+
+        protocol.write(json.dumps(response, ensure_ascii=False, default=str) + "\n")
+
+# ============================
+# CÔTÉ BOT
+# ============================
+
+async def _spawn_worker() -> asyncio.subprocess.Process:
+    """Lancer un worker et attendre qu'il ait importé yt_dlp"""
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-u", WORKER_SCRIPT,
+        stdin=asyncio.subprocess.PIPE,
+        stdout=asyncio.subprocess.PIPE,
+        # Avertissements de yt-dlp visibles seulement en debug
+        stderr=None if logger.isEnabledFor(logging.DEBUG) else asyncio.subprocess.DEVNULL,
+        start_new_session=True,
+        limit=WORKER_LINE_LIMIT
+    )
+
+    try:
+        line = await asyncio.wait_for(process.stdout.readline(), WORKER_START_TIMEOUT)
+        hello = json.loads(line or b"{}")
+    except (asyncio.TimeoutError, json.JSONDecodeError):
+        hello = {"error": "worker muet au démarrage"}
+
+    if not hello.get("ready"):
+        _kill(process)
+        raise PoolUnavailable(hello.get("error", "worker indisponible"))
+
+    logger.debug(f"🧰 Worker yt-dlp prêt (pid {process.pid}, yt-dlp {hello.get('version')})")
+    return process
+
+def _kill(process: Optional[asyncio.subprocess.Process]) -> None:
+    """Tuer un worker (sans attendre)"""
+    if process is not None and process.returncode is None:
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+async def _run_job(slot: Dict[str, Any], job_id: int, query: str, options: Dict[str, Any],
+                   future: asyncio.Future, timeout: float) -> None:
+    """
+    Envoyer une tâche au worker du slot ; le tuer si elle dépasse son délai ou si elle est annulée
+
+    Le délai court à partir de la prise en charge par le worker, pas de l'attente dans
+    la file. Une tâche annulée en cours (perdante d'une course) tue son worker : il est
+    relancé aussitôt, au lieu de rester occupé par un résultat qui serait jeté.
+    """
+    process = slot["process"]
+    request = json.dumps({"id": job_id, "query": query, "options": options}, ensure_ascii=False)
+    process.stdin.write(request.encode("utf-8") + b"\n")
+    await process.stdin.drain()
+
+    reader = asyncio.ensure_future(process.stdout.readline())
+    try:
+        done, _ = await asyncio.wait({reader, future}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        if not reader.done():
+            reader.cancel()
+
+    if reader not in done:
+        # Délai dépassé ou tâche annulée : l'extraction en cours ne peut pas être interrompue autrement
+        _kill(process)
+        slot["process"] = None
+        if future.done():
+            _STATS["cancelled"] += 1
+        else:
+            _STATS["killed"] += 1
+            future.set_exception(asyncio.TimeoutError())
+        return
+
+    line = reader.result()
+    if not line:
+        raise ConnectionError("worker arrêté pendant l'extraction")
+    response = json.loads(line)
+    if future.done():
+        _STATS["discarded"] += 1
+        return
+    if response.get("error") and not response.get("info"):
+        logger.debug(f"⚠️ Worker yt-dlp: {response['error']}")
+        future.set_exception(ExtractionFailed(response["error"]))
+        return
+    future.set_result(response.get("info"))
+
+async def _slot_loop(slot: Dict[str, Any]) -> None:
+    """Un slot du pool : prend les tâches dans la file et garde son worker chaud"""
+    global _AVAILABLE
+
+    while True:
+        if slot["process"] is None or slot["process"].returncode is not None:
+            try:
+                slot["process"] = await _spawn_worker()
+            except PoolUnavailable as e:
+                logger.error(f"❌ Worker yt-dlp indisponible: {e}")
+                _AVAILABLE = any(other["process"] is not None for other in _SLOTS)
+                await asyncio.sleep(WORKER_START_TIMEOUT)
+                continue
+
+        _, job_id, query, options, future, timeout, on_start = await _JOB_QUEUE.get()
+        if future.done():
+            # Annulée pendant l'attente dans la file : jamais lancée
+            continue
+
+        slot["busy"] = True
+        if on_start is not None:
+            on_start()
+
+        try:
+            await _run_job(slot, job_id, query, options, future, timeout)
+        except Exception as e:
+            _kill(slot["process"])
+            slot["process"] = None
+            if not future.done():
+                future.set_exception(e)
+        finally:
+            slot["busy"] = False
+
+async def start_pool(size: int = None) -> bool:
+    """Démarrer le pool (sans effet s'il tourne déjà) ; False si yt_dlp n'est pas importable"""
+    global _JOB_QUEUE, _AVAILABLE
+
+    if _SLOTS:
+        return _AVAILABLE
+
+    # Un premier worker vérifie que yt_dlp est importable
+    try:
+        first = await _spawn_worker()
+    except PoolUnavailable as e:
+        logger.warning(f"⚠️ Pool yt-dlp désactivé ({e}), extraction par sous-processus")
+        return False
+
+    _JOB_QUEUE = asyncio.PriorityQueue()
+    for index in range(max(1, size or POOL_SIZE)):
+        slot = {"process": first if index == 0 else None, "task": None, "busy": False}
+        slot["task"] = asyncio.create_task(_slot_loop(slot))
+        _SLOTS.append(slot)
+
+    _AVAILABLE = True
+    logger.info(f"🧰 Pool yt-dlp démarré ({len(_SLOTS)} workers)")
+    return True
+
+def is_available() -> bool:
+    """Indiquer si les extractions peuvent passer par le pool"""
+    return _AVAILABLE
+
+def idle_workers() -> int:
+    """Workers prêts sans tâche en cours ni en attente (une nouvelle tâche démarrerait aussitôt)"""
+    if not _AVAILABLE or _JOB_QUEUE is None:
+        return 0
+    ready = sum(
+        1 for slot in _SLOTS
+        if not slot["busy"] and slot["process"] is not None and slot["process"].returncode is None
+    )
+    return max(0, ready - _JOB_QUEUE.qsize())
+
+async def extract(query: str, options: Dict[str, Any], timeout: float, priority: int = 0,
+                  on_start: Optional[Callable[[], None]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Extraire les informations d'une requête dans un worker du pool
+
+    Les tâches sont servies par priorité (la plus petite d'abord), puis dans l'ordre
+    d'arrivée ; on_start est appelé quand un worker prend la tâche.
+
+    Retourne les champs WORKER_FIELDS (None si yt-dlp ne trouve rien).
+    Lève ExtractionFailed si yt-dlp signale une erreur, asyncio.TimeoutError si le
+    worker dépasse timeout secondes une fois la tâche prise en charge (il est alors
+    tué puis relancé), PoolUnavailable si le pool ne peut pas être utilisé.
+    L'attente dans la file n'est bornée que par l'appelant.
+    """
+    global _NEXT_JOB_ID
+
+    if not _AVAILABLE or _JOB_QUEUE is None:
+        raise PoolUnavailable("pool non démarré")
+
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+    _NEXT_JOB_ID += 1
+    await _JOB_QUEUE.put((priority, _NEXT_JOB_ID, query, options, future, timeout, on_start))
+    # Une annulation (perdant d'une course) annule la future : le slot tue alors son worker
+    return await future
+
+def shutdown_pool() -> None:
+    """Arrêter le pool et tuer les workers"""
+    global _AVAILABLE, _JOB_QUEUE
+
+    _AVAILABLE = False
+    for slot in _SLOTS:
+        try:
+            if slot["task"] is not None:
+                slot["task"].cancel()
+            _kill(slot["process"])
+        except RuntimeError:
+            # Event loop déjà fermée : les workers s'arrêtent seuls à la fermeture de leur stdin
+            pass
+    _SLOTS.clear()
+    _JOB_QUEUE = None
+
+def pool_status() -> Dict[str, Any]:
+    """État du pool pour /debug"""
+    return {
+        "available": _AVAILABLE,
+        "workers": sum(1 for slot in _SLOTS if slot["process"] is not None and slot["process"].returncode is None),
+        "size": len(_SLOTS),
+        "queued": _JOB_QUEUE.qsize() if _JOB_QUEUE is not None else 0,
+        **_STATS
+    }
+
+if __name__ == "__main__":
+    _worker_main()